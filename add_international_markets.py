@@ -2,6 +2,8 @@
 """
 Add ALL major international markets to the database
 Europe, Asia, Australia, Canada, Latin America, Middle East, Africa
+
+Superseded by the concurrent, resumable pipeline: python3 -m core.pipeline
 """
 
 import json
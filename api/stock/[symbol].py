@@ -1,13 +1,15 @@
 """
 Vercel serverless function to fetch stock data.
-Endpoint: /api/stock/[symbol]?interval=1d&period=1mo
+Endpoint: /api/stock/[symbol]?interval=1d&period=1mo[&format=json|columnar|binary]
 """
 
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
-import yfinance as yf
 import json
 
+from core import serialize
+from core.market_data import get_bars_with_age
+
 class handler(BaseHTTPRequestHandler):
     """Serverless function handler for Vercel."""
 
@@ -24,6 +26,18 @@ class handler(BaseHTTPRequestHandler):
             # Get parameters from query string
             interval = query_params.get('interval', ['1d'])[0]
             period = query_params.get('period', ['1mo'])[0]
+            fmt = query_params.get('format', ['json'])[0]
+
+            if fmt not in serialize.RESPONSE_FORMATS:
+                self.send_response(400)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                self.wfile.write(json.dumps({
+                    'error': True,
+                    'message': f'Unknown format: {fmt}'
+                }).encode())
+                return
 
             if not symbol:
                 self.send_response(400)
@@ -38,14 +52,14 @@ class handler(BaseHTTPRequestHandler):
 
             print(f"Fetching {symbol} with interval={interval}, period={period}")
 
-            # Fetch data using yfinance
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period=period, interval=interval)
+            # Fetch bars through the lightweight Yahoo client (cached per warm instance)
+            data, age = get_bars_with_age(symbol, interval, period)
 
-            if df.empty:
+            if not len(data):
                 self.send_response(404)
                 self.send_header('Content-type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('X-Data-Age', str(int(age)))
                 self.end_headers()
                 self.wfile.write(json.dumps({
                     'error': True,
@@ -53,17 +67,17 @@ class handler(BaseHTTPRequestHandler):
                 }).encode())
                 return
 
-            # Convert DataFrame to format expected by TradingView Lightweight Charts
-            data = []
-            for index, row in df.iterrows():
-                data.append({
-                    'time': int(index.timestamp()),
-                    'open': float(row['Open']),
-                    'high': float(row['High']),
-                    'low': float(row['Low']),
-                    'close': float(row['Close']),
-                    'volume': int(row['Volume']) if 'Volume' in row else 0
-                })
+            if fmt == 'binary':
+                precision = query_params.get('precision', ['64'])[0]
+                body = data.to_binary(float32=precision == '32')
+                self.send_response(200)
+                self.send_header('Content-type', serialize.BINARY_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('X-Data-Age', str(int(age)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
 
             response = {
                 'success': True,
@@ -73,12 +87,16 @@ class handler(BaseHTTPRequestHandler):
                 'data': data,
                 'count': len(data)
             }
+            if fmt == 'columnar':
+                response['format'] = 'columnar'
+                response['data'] = data.to_columnar()
 
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('X-Data-Age', str(int(age)))
             self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(serialize.dumps(response).encode())
 
         except Exception as e:
             print(f"Error fetching stock data: {str(e)}")
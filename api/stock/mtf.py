@@ -0,0 +1,96 @@
+"""
+Vercel serverless function for multi-timeframe bars.
+Endpoint: /api/stock/[symbol]/mtf?timeframes=15m,1h,1d,1wk[&format=json|columnar]
+Every timeframe is resampled from one base series (see core.resample).
+"""
+
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import json
+
+from core import resample, serialize
+from core.market_data import get_history
+
+class handler(BaseHTTPRequestHandler):
+    """Serverless function handler for Vercel."""
+
+    def send_json(self, status, payload):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(serialize.dumps(payload).encode())
+
+    def do_GET(self):
+        try:
+            parsed_url = urlparse(self.path)
+            query_params = parse_qs(parsed_url.query)
+
+            # Symbol comes from the rewrite (/api/stock/<symbol>/mtf) or ?symbol=
+            path_parts = [p for p in parsed_url.path.split('/') if p]
+            symbol = query_params.get('symbol', [''])[0]
+            if not symbol and len(path_parts) >= 2 and path_parts[-1] == 'mtf':
+                symbol = path_parts[-2]
+            fmt = query_params.get('format', ['json'])[0]
+
+            if fmt not in ('json', 'columnar'):
+                self.send_json(400, {'error': True, 'message': f'Unknown format: {fmt}'})
+                return
+            if not symbol or symbol == 'stock':
+                self.send_json(400, {'error': True, 'message': 'Symbol parameter is required'})
+                return
+
+            try:
+                timeframes = resample.parse_timeframes(query_params.get('timeframes', ['1d'])[0])
+            except resample.UnknownTimeframe as e:
+                self.send_json(400, {'error': True, 'message': str(e)})
+                return
+            if not timeframes:
+                self.send_json(400, {'error': True, 'message': 'timeframes parameter required'})
+                return
+
+            print(f"Fetching {symbol} timeframes={','.join(timeframes)}")
+
+            results = resample.multi_timeframe(symbol, timeframes, get_history)
+            if not any(len(bars) for _, _, bars in results.values()):
+                self.send_json(404, {'error': True, 'message': f'No data found for {symbol}'})
+                return
+
+            panels = {}
+            for tf, (interval, period, bars) in results.items():
+                panels[tf] = {
+                    'base': interval,
+                    'period': period,
+                    'data': bars.to_columnar() if fmt == 'columnar' else bars,
+                    'count': len(bars)
+                }
+
+            response = {
+                'success': True,
+                'symbol': symbol,
+                'timeframes': panels,
+                'count': len(panels)
+            }
+            if fmt == 'columnar':
+                response['format'] = 'columnar'
+
+            self.send_json(200, response)
+
+        except Exception as e:
+            print(f"Error fetching multi-timeframe data: {str(e)}")
+            self.send_response(500)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(json.dumps({
+                'error': True,
+                'message': str(e)
+            }).encode())
+
+    def do_OPTIONS(self):
+        """Handle CORS preflight requests."""
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -1,58 +1,50 @@
 """
 Vercel serverless function to serve stock database.
-Returns stock database JSON directly.
+Returns the stock database JSON, pre-compressed (br/gzip) with an ETag,
+one page of it with ?exchange=, ?prefix=, ?cursor= and ?limit=, or only
+the changes since a build with ?since=<version>.
 
 🌍 GLOBAL DATABASE: 25,188 stocks from around the world
 """
 
 from http.server import BaseHTTPRequestHandler
 import json
-import os
-import sys
+from urllib.parse import urlparse, parse_qs
+
+from core.stock_db import stock_database
 
 class handler(BaseHTTPRequestHandler):
     """Serverless function handler for Vercel."""
 
     def do_GET(self):
         try:
-            # Try multiple paths to find the JSON file
-            possible_paths = [
-                '/var/task/public/stocks-database.json',  # Vercel standard
-                'public/stocks-database.json',  # Relative
-                '../../public/stocks-database.json',  # From api/stocks/
-                '/stocks-database.json',  # Root
-            ]
-            
-            stock_data = None
-            used_path = None
-            
-            for path in possible_paths:
-                if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        stock_data = f.read()
-                    used_path = path
-                    print(f"✅ Found file at: {path}")
-                    break
-            
-            if stock_data is None:
-                # Log debug info
-                cwd = os.getcwd()
-                files = os.listdir(cwd) if os.path.exists(cwd) else []
-                raise FileNotFoundError(f"Stock database not found. CWD: {cwd}, Files: {files[:10]}")
-            
-            # Send JSON response
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
+            query_params = parse_qs(urlparse(self.path).query, keep_blank_values=True)
+            params = {key: values[0] for key, values in query_params.items()}
+
+            # The full database is parsed and compressed once per warm instance
+            try:
+                status, body, headers = stock_database.list_parts(
+                    params,
+                    self.headers.get('Accept-Encoding', ''),
+                    self.headers.get('If-None-Match', '')
+                )
+            except ValueError as e:
+                status, body = 400, json.dumps({'success': False, 'error': str(e)}).encode()
+                headers = {'Content-Type': 'application/json', 'Content-Length': str(len(body))}
+
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
             self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Cache-Control', 'public, max-age=86400')
             self.end_headers()
-            self.wfile.write(stock_data.encode('utf-8'))
+            if body:
+                self.wfile.write(body)
 
         except Exception as e:
             print(f"❌ Error: {str(e)}")
             import traceback
             traceback.print_exc()
-            
+
             self.send_response(500)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
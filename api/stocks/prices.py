@@ -6,9 +6,10 @@ Returns: JSON object with current prices
 
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
-import yfinance as yf
 import json
 
+from core.quotes import get_quotes, parse_symbols
+
 class handler(BaseHTTPRequestHandler):
     """Serverless function handler for Vercel."""
 
@@ -31,35 +32,13 @@ class handler(BaseHTTPRequestHandler):
                 }).encode())
                 return
 
-            # Split symbols and limit to 10
-            symbols = [s.strip().upper() for s in symbols_param.split(',')][:10]
-            
+            # Split symbols (deduplicated, up to MAX_SYMBOLS)
+            symbols = parse_symbols(symbols_param, upper=True)
+
             print(f"Fetching prices for: {symbols}")
-            
-            # Fetch current prices using yfinance
-            prices = {}
-            for symbol in symbols:
-                try:
-                    ticker = yf.Ticker(symbol)
-                    # Get latest price from info
-                    info = ticker.info
-                    
-                    # Try different price fields
-                    current_price = info.get('currentPrice') or info.get('regularMarketPrice') or info.get('previousClose')
-                    
-                    if current_price:
-                        prices[symbol] = {
-                            'price': float(current_price),
-                            'currency': info.get('currency', 'USD'),
-                            'marketCap': info.get('marketCap'),
-                            'volume': info.get('volume')
-                        }
-                    else:
-                        prices[symbol] = {'error': 'Price not available'}
-                        
-                except Exception as e:
-                    print(f"Error fetching {symbol}: {str(e)}")
-                    prices[symbol] = {'error': str(e)}
+
+            # Fetch uncached quotes in parallel; failures only affect their own symbol
+            prices = get_quotes(symbols)
 
             response = {
                 'success': True,
@@ -0,0 +1,49 @@
+"""
+Vercel serverless function for symbol search.
+Returns the best matches for ?q= (up to ?limit=), ranked like the
+symbol picker in public/index.html.
+"""
+
+from http.server import BaseHTTPRequestHandler
+import json
+from urllib.parse import urlparse, parse_qs
+
+from core.search import search_response
+from core.stock_db import stock_database
+
+class handler(BaseHTTPRequestHandler):
+    """Serverless function handler for Vercel."""
+
+    def do_GET(self):
+        try:
+            query_params = parse_qs(urlparse(self.path).query)
+            params = {key: values[0] for key, values in query_params.items()}
+
+            # The index is built once per warm instance
+            status, payload = search_response(stock_database.snapshot().search_index, params)
+            self.send_json(status, payload)
+
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            self.send_json(500, {'success': False, 'error': str(e)})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if status == 200:
+            self.send_header('Cache-Control', 'public, max-age=300')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        """Handle CORS preflight."""
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -0,0 +1,221 @@
+"""
+ASGI entry point serving the main API routes with async handlers.
+
+Same routes and response bodies as main.py, but requests wait on upstream
+calls without holding a server thread: blocking yfinance work runs on one
+bounded executor (UPSTREAM_WORKERS threads), so a single process can keep
+hundreds of requests in flight while upstream concurrency stays capped.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 8080
+"""
+
+import asyncio
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from core import live, screener_store
+from core.bar_store import bar_store
+from core.cache import bar_cache
+from core.live import live_hub
+from core.market_data import get_history_with_age
+from core.quotes import get_quotes, parse_symbols, quote_cache
+from core.ratelimit import rate_governor
+from core.search import search_response
+from core.serialize import BINARY_CONTENT_TYPE, RESPONSE_FORMATS, Bars, dumps
+from core.singleflight import upstream_flight
+from core.stock_db import stock_database
+
+UPSTREAM_WORKERS = int(os.environ.get('UPSTREAM_WORKERS', 64))
+PUBLIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public')
+
+upstream_executor = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix='upstream')
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking call (upstream, disk or CPU-heavy) on the bounded executor"""
+    return await asyncio.get_running_loop().run_in_executor(upstream_executor, fn, *args)
+
+
+def json_response(payload, status=200, headers=None):
+    """Same bytes as Flask's jsonify (sorted keys, compact, trailing newline)"""
+    body = dumps(payload, sort_keys=True, separators=(',', ':')) + '\n'
+    return Response(body, status_code=status, headers=headers, media_type='application/json')
+
+
+async def get_stock(request):
+    symbol = request.path_params['symbol']
+    try:
+        interval = request.query_params.get('interval', '1d')
+        period = request.query_params.get('period', '1mo')
+        fmt = request.query_params.get('format', 'json')
+
+        if fmt not in RESPONSE_FORMATS:
+            return json_response({'error': True, 'message': f'Unknown format: {fmt}'}, 400)
+
+        df, age = await run_blocking(get_history_with_age, symbol, interval, period)
+        headers = {'X-Data-Age': str(int(age))}
+
+        if df.empty:
+            return json_response({'error': True, 'message': f'No data found for {symbol}'}, 404, headers)
+
+        data = Bars.from_frame(df)
+
+        if fmt == 'binary':
+            body = data.to_binary(float32=request.query_params.get('precision') == '32')
+            return Response(body, media_type=BINARY_CONTENT_TYPE, headers=headers)
+
+        response = {
+            'success': True,
+            'symbol': symbol,
+            'interval': interval,
+            'period': period,
+            'data': data,
+            'count': len(data)
+        }
+        if fmt == 'columnar':
+            response['format'] = 'columnar'
+            response['data'] = data.to_columnar()
+
+        return json_response(response, headers=headers)
+    except Exception as e:
+        return json_response({'error': True, 'message': str(e)}, 500)
+
+
+async def get_stock_list(request):
+    try:
+        # A database reload or a page build must not stall the event loop
+        status, body, headers = await run_blocking(
+            stock_database.list_parts,
+            request.query_params,
+            request.headers.get('Accept-Encoding', ''),
+            request.headers.get('If-None-Match', '')
+        )
+        return Response(body, status_code=status, headers=headers)
+    except ValueError as e:
+        return json_response({'success': False, 'error': str(e)}, 400)
+    except Exception as e:
+        return json_response({'success': False, 'error': str(e)}, 500)
+
+
+async def search_stocks(request):
+    try:
+        status, payload = await run_blocking(
+            lambda: search_response(stock_database.snapshot().search_index, request.query_params))
+        return json_response(payload, status)
+    except Exception as e:
+        return json_response({'success': False, 'error': str(e)}, 500)
+
+
+async def get_stock_prices(request):
+    try:
+        symbols_param = request.query_params.get('symbols', '')
+        if not symbols_param:
+            return json_response({'error': True, 'message': 'symbols parameter required'}, 400)
+
+        symbols = parse_symbols(symbols_param, upper=True)
+        prices = await run_blocking(get_quotes, symbols)
+
+        return json_response({'success': True, 'prices': prices})
+    except Exception as e:
+        return json_response({'success': False, 'error': str(e)}, 500)
+
+
+async def momentum_screener(request):
+    try:
+        status, payload, headers = await run_blocking(screener_store.screen, request.query_params)
+        return json_response(payload, status, headers)
+    except ValueError as e:
+        return json_response({'success': False, 'error': str(e)}, 400)
+    except Exception as e:
+        print(f"Screener error: {traceback.format_exc()}")
+        return json_response({'success': False, 'error': str(e)}, 500)
+
+
+async def stream_bars(request):
+    try:
+        symbols, interval = live.parse_stream_params(request.query_params)
+    except ValueError as e:
+        return json_response({'error': True, 'message': str(e)}, 400)
+
+    async def events():
+        # Subscribed only once the stream runs, so a client gone before the first
+        # chunk leaves no subscriber behind
+        subscriber = live_hub.subscribe(symbols, interval, live.AsyncQueueSubscriber(
+            [(symbol, interval) for symbol in symbols], asyncio.get_running_loop()
+        ))
+        deadline = time.time() + live.MAX_STREAM_SECONDS
+        try:
+            yield 'retry: 5000\n\n'
+            while time.time() < deadline and not subscriber.dropped:
+                event = await subscriber.get()
+                yield live.format_sse(event) if event is not None else ': ping\n\n'
+        finally:
+            live_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+async def health(request):
+    return json_response({'status': 'healthy'})
+
+
+async def stats(request):
+    return json_response({
+        'cache': bar_cache.stats(),
+        'quotes': quote_cache.stats(),
+        'singleflight': upstream_flight.stats(),
+        'bar_store': bar_store.stats() if bar_store is not None else None,
+        'live': live_hub.stats(),
+        'rate_limit': rate_governor.stats()
+    })
+
+
+async def serve_static(request):
+    # Files from public/, falling back to index.html like the Flask app
+    path = os.path.normpath(os.path.join(PUBLIC_DIR, request.path_params.get('path', '')))
+    if path.startswith(PUBLIC_DIR + os.sep) and os.path.isfile(path):
+        return FileResponse(path)
+    return FileResponse(os.path.join(PUBLIC_DIR, 'index.html'))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    screener_store.start_scheduler()
+    try:
+        await run_blocking(stock_database.warm)
+    except Exception as e:
+        print(f"Stock database not preloaded: {e}")
+    yield
+    screener_store.stop_scheduler()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/stock/{symbol}', get_stock),
+        Route('/api/stocks/list', get_stock_list),
+        Route('/stocks-database.json', get_stock_list),
+        Route('/api/stocks/search', search_stocks),
+        Route('/api/stocks/prices', get_stock_prices),
+        Route('/api/screener/momentum', momentum_screener),
+        Route('/api/stream', stream_bars),
+        Route('/health', health),
+        Route('/stats', stats),
+        Route('/', serve_static),
+        Route('/{path:path}', serve_static),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'])],
+    lifespan=lifespan,
+)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-worker memory with the stock database preloaded before fork, the way
+gunicorn.conf.py runs main.py.
+
+The parent loads the database, registry and search index, freezes the GC and
+forks N workers. Each runs the same mix of searches, symbol lookups and list
+pages and reports, from /proc/self/smaps_rollup, how much of the shared
+memory it had to copy (Private_Dirty) and its proportional share (Pss).
+
+Run: python3 benchmarks/bench_fork_memory.py [max workers]
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.stock_db import StockDatabase  # noqa: E402
+
+QUERIES = ['AAPL', 'bank', 'tech', 'HK', '0700', 'japan', 'energy', 'SA', 'gold', 'BBCA', 'pharma', 'X']
+LOOKUPS = 5000
+EXCHANGES = ['NASDAQ', 'NYSE', 'HKEX', 'TSE', 'IDX']
+
+
+def smaps_kb():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields
+
+
+def workload(snapshot):
+    registry = snapshot.registry
+    index = snapshot.search_index
+    for _ in range(3):
+        for query in QUERIES:
+            index.search(query, 30)
+        step = max(1, len(registry) // LOOKUPS)
+        for row in range(0, len(registry), step):
+            registry.get(registry.symbols[row])
+        for exchange in EXCHANGES:
+            snapshot.page(exchange=exchange, limit=1000)
+
+
+def worker(snapshot, write_fd):
+    before = smaps_kb()
+    start = time.perf_counter()
+    workload(snapshot)
+    elapsed = time.perf_counter() - start
+    after = smaps_kb()
+    os.write(write_fd, json.dumps({
+        'copied_mb': (after['Private_Dirty'] - before['Private_Dirty']) / 1024,
+        'pss_mb': after['Pss'] / 1024,
+        'seconds': elapsed,
+    }).encode())
+    os._exit(0)
+
+
+def run(snapshot, workers):
+    results = []
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            worker(snapshot, write_fd)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+    for pid, read_fd in pipes:
+        with os.fdopen(read_fd) as f:
+            results.append(json.loads(f.read()))
+        os.waitpid(pid, 0)
+    return results
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    db = StockDatabase()
+    start = time.perf_counter()
+    snapshot = db.snapshot()
+    snapshot.registry
+    snapshot.search_index
+    print(f"Preloaded {len(snapshot.registry):,} stocks in {time.perf_counter() - start:.2f}s, "
+          f"parent RSS {smaps_kb()['Rss'] / 1024:.1f} MB")
+    gc.freeze()
+
+    print(f"{'workers':>7} {'copied MB/worker':>17} {'Pss MB/worker':>14} {'seconds':>8}")
+    workers = 1
+    while workers <= max_workers:
+        results = run(snapshot, workers)
+        copied = sum(r['copied_mb'] for r in results) / len(results)
+        pss = sum(r['pss_mb'] for r in results) / len(results)
+        seconds = max(r['seconds'] for r in results)
+        print(f"{workers:>7} {copied:>17.1f} {pss:>14.1f} {seconds:>8.2f}")
+        workers *= 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
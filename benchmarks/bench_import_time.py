@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Cold-start import cost of every serverless handler under api/.
+
+Each handler is imported the way the Vercel runtime loads it, in a fresh
+interpreter with `python -X importtime`, several times. The report gives the
+median import time (interpreter startup excluded), which heavy libraries got
+loaded and the slowest top-level imports.
+
+Results are tracked in benchmarks/import_times.json: a run compares against
+it and exits 1 when a handler got more than TOLERANCE slower or started
+importing a heavy library it did not before. --save records a new baseline.
+
+Run: python3 benchmarks/bench_import_time.py [--save] [--runs N] [handler ...]
+"""
+
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'benchmarks', 'import_times.json')
+
+HEAVY = ('yfinance', 'pandas', 'numpy', 'requests')
+RUNS = 5
+TOLERANCE = 0.25
+# Differences below this are noise on a fresh interpreter
+MIN_REGRESSION_MS = 20
+TOP = 5
+
+LOADER = (
+    "import importlib.util, sys; sys.path.insert(0, {root!r}); "
+    "spec = importlib.util.spec_from_file_location('handler', {path!r}); "
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))"
+)
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def import_profile(code):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def measure(path, startup, runs):
+    totals = []
+    for _ in range(runs):
+        imports = [item for item in import_profile(LOADER.format(root=ROOT, path=path))
+                   if item[0] not in startup]
+        totals.append(sum(self_us for _, self_us, _, _ in imports) / 1000)
+
+    modules = {name for name, _, _, _ in imports}
+    top_level = sorted((item for item in imports if item[3] == 0), key=lambda item: -item[2])
+    return {
+        'ms': round(statistics.median(totals), 1),
+        'modules': len(modules),
+        'heavy': [lib for lib in HEAVY if lib in modules],
+        'top': [[name, round(cumulative_us / 1000, 1)] for name, _, cumulative_us, _ in top_level[:TOP]],
+    }
+
+
+def handlers(selected):
+    paths = sorted(glob.glob(os.path.join(ROOT, 'api', '**', '*.py'), recursive=True))
+    names = {os.path.relpath(path, ROOT): path for path in paths}
+    if selected:
+        return {name: path for name, path in names.items() if name in selected or os.path.basename(name) in selected}
+    return names
+
+
+def load_baseline():
+    try:
+        with open(BASELINE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main(argv):
+    save = '--save' in argv
+    runs = RUNS
+    if '--runs' in argv:
+        runs = int(argv[argv.index('--runs') + 1])
+    selected = [arg for i, arg in enumerate(argv)
+                if not arg.startswith('--') and (i == 0 or argv[i - 1] != '--runs')]
+
+    startup = {name for name, _, _, _ in import_profile('pass')}
+    baseline = load_baseline()
+    results = {}
+    regressions = []
+
+    print(f"{'handler':<28} {'import ms':>10} {'baseline':>9} {'modules':>8}  heavy")
+    for name, path in handlers(selected).items():
+        result = measure(path, startup, runs)
+        results[name] = result
+        before = baseline.get(name)
+        before_ms = f"{before['ms']:.1f}" if before else '-'
+        print(f"{name:<28} {result['ms']:>10.1f} {before_ms:>9} {result['modules']:>8}  "
+              f"{', '.join(result['heavy']) or '-'}")
+        for module, ms in result['top']:
+            print(f"    {module:<40} {ms:>8.1f} ms")
+
+        if before:
+            slower = result['ms'] - before['ms']
+            if slower > MIN_REGRESSION_MS and slower > before['ms'] * TOLERANCE:
+                regressions.append(f"{name}: {before['ms']:.1f} -> {result['ms']:.1f} ms")
+            for lib in result['heavy']:
+                if lib not in before['heavy']:
+                    regressions.append(f"{name}: now imports {lib}")
+
+    if save:
+        for name, result in results.items():
+            baseline[name] = {key: result[key] for key in ('ms', 'modules', 'heavy')}
+        with open(BASELINE, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"✅ Saved baseline for {len(results)} handlers to {os.path.relpath(BASELINE, ROOT)}")
+        return 0
+
+    if regressions:
+        print('❌ Import time regressions:')
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
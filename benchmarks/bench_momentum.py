@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Parity check + benchmark: scalar core.momentum vs vectorized core.momentum_np
+Run: python3 benchmarks/bench_momentum.py [--check]
+
+--check only runs the parity check (exit status 1 on a mismatch).
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import momentum, momentum_np
+
+# Rounded outputs may differ by one cent from float summation order
+TOLERANCE = 0.011
+
+
+def make_universe(n, seed=7):
+    """Random-walk closes of mixed lengths, including some degenerate series"""
+    rng = np.random.default_rng(seed)
+    universe = {}
+    for i in range(n):
+        days = int(rng.choice([252, 251, 250, 180, 126, 90, 63, 61, 60, 45]))
+        drift = rng.normal(0.002, 0.004)
+        closes = 50 * np.exp(np.cumsum(rng.normal(drift, 0.02, days)))
+        if i % 97 == 0:
+            closes[rng.integers(0, days)] = 0.0
+        if i % 89 == 0:
+            closes[:] = closes[0]
+        universe[f"S{i:05d}"] = closes.tolist()
+    return universe
+
+
+def scalar_batch(universe):
+    results = []
+    # The scalar code prints on the zero-price series; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for symbol, prices in universe.items():
+            score = momentum.analyze_prices(symbol, prices)
+            if score:
+                results.append(score)
+    return results
+
+
+def check_parity(universe):
+    scalar = {r['symbol']: r for r in scalar_batch(universe)}
+    vector = {r['symbol']: r for r in momentum_np.analyze_batch(universe)}
+
+    # Stocks right at the inclusion cutoff may land on either side of it
+    for symbol in set(scalar) ^ set(vector):
+        r = scalar.get(symbol) or vector.get(symbol)
+        assert abs(r['final_score'] - momentum.MIN_FINAL_SCORE) < TOLERANCE, symbol
+
+    for symbol in set(scalar) & set(vector):
+        a, b = scalar[symbol], vector[symbol]
+        for key in ('pattern_score', 'potential_return', 'final_score', 'current_price'):
+            assert abs(a[key] - b[key]) < TOLERANCE, (symbol, key, a[key], b[key])
+        assert a['timeframe_scores'].keys() == b['timeframe_scores'].keys(), symbol
+        for tf, value in a['timeframe_scores'].items():
+            assert abs(value - b['timeframe_scores'][tf]) < TOLERANCE, (symbol, tf)
+    return len(scalar)
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv):
+    try:
+        matched = check_parity(make_universe(3000))
+    except AssertionError as e:
+        print(f"❌ Parity FAILED: {e}")
+        return 1
+    print(f"✅ Parity OK ({matched} scored stocks)")
+    if '--check' in argv:
+        return 0
+
+    print(f"{'stocks':>8} {'scalar':>12} {'numpy':>12} {'speedup':>9}")
+    for n in (100, 1_000, 5_000):
+        universe = make_universe(n, seed=n)
+        old = best_of(lambda: scalar_batch(universe))
+        new = best_of(lambda: momentum_np.analyze_batch(universe))
+        print(f"{n:>8,} {old * 1000:>10.1f}ms {new * 1000:>10.1f}ms {old / new:>8.1f}x")
+
+    # A one-year daily screen: every row the same length, already a matrix
+    rng = np.random.default_rng(1)
+    for n in (1_000, 10_000):
+        matrix = 50 * np.exp(np.cumsum(rng.normal(0.002, 0.02, (n, 252)), axis=1))
+        rows = {f"S{i:05d}": row.tolist() for i, row in enumerate(matrix)}
+        old = best_of(lambda: scalar_batch(rows), repeat=1)
+        new = best_of(lambda: momentum_np.score_matrix(matrix))
+        print(f"{n:>8,} x 252 matrix: scalar {old * 1000:.1f}ms, score_matrix {new * 1000:.1f}ms "
+              f"({old / new:.0f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: iterrows bar serialization vs core.serialize
+Run: python3 benchmarks/bench_serialize.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.serialize import Bars, dumps
+
+
+def make_frame(n):
+    """Synthetic yfinance-shaped 1m history"""
+    rng = np.random.default_rng(42)
+    index = pd.date_range('2024-01-02 09:30', periods=n, freq='1min', tz='America/New_York')
+    close = 100 + rng.standard_normal(n).cumsum()
+    return pd.DataFrame({
+        'Open': close + rng.random(n),
+        'High': close + 1 + rng.random(n),
+        'Low': close - 1 - rng.random(n),
+        'Close': close,
+        'Volume': rng.integers(0, 10_000_000, n),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
+
+
+def serialize_iterrows(df, meta):
+    data = []
+    for index, row in df.iterrows():
+        data.append({
+            'time': int(index.timestamp()),
+            'open': float(row['Open']),
+            'high': float(row['High']),
+            'low': float(row['Low']),
+            'close': float(row['Close']),
+            'volume': int(row['Volume']) if 'Volume' in row else 0
+        })
+    return json.dumps(dict(meta, data=data, count=len(data)))
+
+
+def serialize_columns(df, meta):
+    data = Bars.from_frame(df)
+    return dumps(dict(meta, data=data, count=len(data)))
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    meta = {'success': True, 'symbol': 'BENCH', 'interval': '1m', 'period': '5d'}
+
+    print(f"{'bars':>8} {'iterrows':>12} {'columnar':>12} {'speedup':>9}")
+    for n in (1_000, 10_000, 100_000):
+        df = make_frame(n)
+        assert serialize_iterrows(df, meta) == serialize_columns(df, meta)
+
+        repeat = 5 if n < 100_000 else 2
+        old = best_of(lambda: serialize_iterrows(df, meta), repeat)
+        new = best_of(lambda: serialize_columns(df, meta), repeat)
+        print(f"{n:>8,} {old * 1000:>10.1f}ms {new * 1000:>10.1f}ms {old / new:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
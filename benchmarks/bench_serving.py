@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Load test: Flask on gunicorn (1 worker, 8 threads, as deployed) vs the ASGI
+app on uvicorn, for concurrent cold /api/stock loads.
+
+Each server runs in a subprocess whose upstream fetch is replaced by a
+fixed-latency synthetic history, so the comparison measures how many slow
+upstream calls each setup can overlap (not Yahoo's speed).
+
+Run: python3 benchmarks/bench_serving.py [upstream_latency_seconds]
+"""
+
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CONCURRENCY = (8, 64, 256)
+PORTS = {'flask': 8101, 'asgi': 8102}
+
+
+def serve(kind, port, latency):
+    """Subprocess body: patch the upstream fetch, then run one server"""
+    os.environ['SCREENER_SCHEDULER'] = '0'
+    os.environ.pop('BAR_STORE_DIR', None)
+
+    import numpy as np
+    import pandas as pd
+    from core import market_data
+
+    index = pd.date_range('2024-01-01', periods=21, freq='B', tz='America/New_York')
+    closes = np.linspace(100, 110, len(index))
+    frame = pd.DataFrame({'Open': closes, 'High': closes + 1, 'Low': closes - 1,
+                          'Close': closes, 'Volume': np.full(len(index), 1000.0)}, index=index)
+
+    def slow_fetch(symbol, interval, period=None, start=None):
+        time.sleep(latency)
+        return frame.copy()
+
+    market_data.fetch_history = slow_fetch
+
+    if kind == 'flask':
+        from gunicorn.app.base import BaseApplication
+        from main import app
+
+        class Server(BaseApplication):
+            def load_config(self):
+                for key, value in {'bind': f'127.0.0.1:{port}', 'workers': 1, 'threads': 8,
+                                   'timeout': 120, 'backlog': 2048, 'loglevel': 'warning'}.items():
+                    self.cfg.set(key, value)
+
+            def load(self):
+                return app
+
+        Server().run()
+    else:
+        import uvicorn
+        from asgi import app
+
+        uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning', backlog=2048)
+
+
+def wait_ready(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+def request(port, path):
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+    conn.request('GET', path)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.status, time.perf_counter() - start
+
+
+def load(port, concurrency, run):
+    """concurrency simultaneous requests for distinct (uncached) symbols"""
+    paths = [f'/api/stock/R{run}S{i}?interval=1d&period=1mo' for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda p: request(port, p), paths))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    ok = sum(1 for status, _ in results if status == 200)
+    return {
+        'ok': ok,
+        'wall': wall,
+        'rps': concurrency / wall,
+        'p50': statistics.median(latencies),
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    print(f"Upstream latency {latency:.2f}s per cold symbol")
+    print(f"{'server':>8} {'clients':>8} {'ok':>5} {'wall':>8} {'req/s':>8} {'p50':>8} {'p99':>8}")
+
+    for kind, port in PORTS.items():
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), 'serve', kind,
+                                   str(port), str(latency)], cwd=ROOT)
+        try:
+            wait_ready(port)
+            for run, concurrency in enumerate(CONCURRENCY):
+                r = load(port, concurrency, run)
+                print(f"{kind:>8} {concurrency:>8} {r['ok']:>5} {r['wall']:>7.2f}s {r['rps']:>8.1f} "
+                      f"{r['p50']:>7.2f}s {r['p99']:>7.2f}s")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['serve']:
+        serve(sys.argv[2], int(sys.argv[3]), float(sys.argv[4]))
+    else:
+        main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Stock database load time and resident memory: JSON (json.load) vs the
+memory-mapped .pack, each measured in a fresh subprocess.
+
+Stages: load (what main.py does at import), +search (the preloaded search
+index), +list (first /api/stocks/list response, encodes the blobs).
+
+Run: python3 benchmarks/bench_stock_db.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SOURCES = {
+    'json': os.path.join(ROOT, 'public', 'stocks-database.json.gz'),
+    'pack': os.path.join(ROOT, 'public', 'stocks-database.pack'),
+}
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def measure(path):
+    """Subprocess body: print one JSON line of per-stage timings and RSS growth"""
+    import core.search
+    import core.stock_pack
+    from core.stock_db import StockDatabase
+
+    base = rss_mb()
+    db = StockDatabase([path])
+    result = {}
+
+    start = time.perf_counter()
+    snapshot = db.snapshot()
+    result['load'] = (time.perf_counter() - start, rss_mb() - base)
+
+    start = time.perf_counter()
+    snapshot.search_index.search('bank', 30)
+    result['+search'] = (time.perf_counter() - start, rss_mb() - base)
+
+    start = time.perf_counter()
+    db.response_parts('gzip, br', '')
+    result['+list'] = (time.perf_counter() - start, rss_mb() - base)
+
+    print(json.dumps(result))
+
+
+def main():
+    if not os.path.exists(SOURCES['pack']):
+        print('Build the pack first: python3 -m core.stock_pack public/stocks-database.json.gz '
+              'public/stocks-database.pack')
+        return 1
+
+    print(f"{'source':>6} {'stage':>8} {'seconds':>9} {'rss MB':>8}")
+    for kind, path in SOURCES.items():
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), 'measure', path],
+                                cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        for stage, (seconds, rss) in result.items():
+            print(f"{kind:>6} {stage:>8} {seconds:>9.3f} {rss:>8.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['measure']:
+        measure(sys.argv[2])
+    else:
+        sys.exit(main())
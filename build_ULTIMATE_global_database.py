@@ -7,6 +7,8 @@ Strategy:
 1. Download from official exchange FTP/API (no rate limits!)
 2. Use comprehensive pre-compiled lists
 3. Validate format only (no Yahoo Finance validation to avoid rate limits)
+
+Superseded by the concurrent, resumable pipeline: python3 -m core.pipeline
 """
 
 import pandas as pd
@@ -15,6 +17,8 @@ import requests
 from io import StringIO
 import time
 
+from core.ratelimit import BACKGROUND, rate_governor
+
 def download_us_stocks():
     """Download all US stocks from official sources"""
     print("\n📊 Downloading US Stocks...")
@@ -33,7 +37,9 @@ def download_us_stocks():
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=30)
+            response = rate_governor.call(
+                'api.nasdaq.com', lambda: requests.get(url, headers=headers, timeout=30), lane=BACKGROUND
+            )
             data = response.json()
 
             if 'data' in data and 'rows' in data['data']:
@@ -47,7 +53,6 @@ def download_us_stocks():
                         'industry': row.get('industry', '')
                     })
                 print(f"    ✅ {len(rows):,} stocks from {exchange}")
-            time.sleep(1)
         except Exception as e:
             print(f"    ❌ Error downloading {exchange}: {e}")
 
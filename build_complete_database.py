@@ -2,12 +2,16 @@
 """
 Build COMPLETE stock database from official ticker lists
 NO Yahoo Finance validation needed - validate on-demand when loading charts!
+
+Superseded by the concurrent, resumable pipeline: python3 -m core.pipeline
 """
 
 import pandas as pd
 import json
 import brotli
 
+from core.registry import get_registry
+
 def get_nasdaq_all():
     """Get ALL NASDAQ stocks from official FTP"""
     print("📊 Downloading ALL NASDAQ stocks...")
@@ -84,26 +88,7 @@ def get_idx_stocks():
     """Get IDX stocks from current database"""
     print("📊 Loading IDX stocks from current database...")
     try:
-        with open('api/stocks/list.py', 'r') as f:
-            import re
-            content = f.read()
-            matches = re.findall(
-                r'\["([^"]+)",\s*"([^"]+)",\s*"([^"]*)",\s*"([^"]*)"\]',
-                content
-            )
-
-            stocks = []
-            for match in matches:
-                # Only get IDX stocks (those with .JK)
-                if '.JK' in match[0]:
-                    stocks.append({
-                        'symbol': match[0],
-                        'name': match[1],
-                        'exchange': 'IDX',
-                        'sector': match[2],
-                        'industry': match[3]
-                    })
-
+        stocks = get_registry().stocks(exchange='IDX')
         print(f"✅ Got {len(stocks)} IDX stocks")
         return stocks
     except Exception as e:
@@ -199,7 +184,7 @@ def build_database():
 
     if len(brotli_compressed) > 4_500_000:
         print(f"\n⚠️  WARNING: {len(brotli_compressed)//1024//1024:.1f}MB exceeds Vercel 4.5MB limit!")
-        print("   Consider reducing stock count or implementing pagination")
+        print("   Serve pages (/api/stocks/list?exchange=&prefix=&cursor=&limit=) or the shards in public/stocks/")
     elif len(brotli_compressed) > 1_000_000:
         print(f"\n⚠️  Large: {len(brotli_compressed)//1024}KB - may affect page load")
     else:
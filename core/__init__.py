@@ -0,0 +1,4 @@
+"""
+Shared building blocks for the API servers (main.py, server.py and the
+Vercel handlers under api/).
+"""
@@ -0,0 +1,305 @@
+"""
+Persistent local OHLCV store with incremental tail updates.
+
+Bars live in one SQLite file per symbol and interval
+(BAR_STORE_DIR/<interval>/<SYMBOL>.sqlite). When a history is requested the
+store only downloads the tail since its last stored bar and merges it in;
+the full period is only downloaded when the store does not cover it yet.
+
+yfinance histories are split- and dividend-adjusted, so a new split or
+dividend rescales every earlier bar. A tail request therefore starts at the
+last complete stored bar (the last bar may have been partial) and compares
+it with the re-fetched one: when they differ, the history was re-adjusted
+and the whole period is downloaded again instead of appending bars on a
+different basis.
+
+Compact every file (drop bars past retention, VACUUM):
+    python3 -m core.bar_store compact
+"""
+
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+DAY = 86400
+
+# Approximate calendar length of each stored yfinance period (None = everything).
+# '1d'/'5d' count trading days upstream and are cheap, so they bypass the store.
+PERIOD_DAYS = {
+    '1mo': 31, '3mo': 92, '6mo': 183,
+    '1y': 366, '2y': 731, '5y': 1827, '10y': 3653, 'max': None,
+}
+
+# Intervals the store persists, and how far back Yahoo serves each one
+RETENTION_DAYS = {
+    '1m': 30, '2m': 60, '5m': 60, '15m': 60, '30m': 60,
+    '60m': 730, '90m': 60, '1h': 730,
+    '1d': None, '5d': None, '1wk': None, '1mo': None, '3mo': None,
+}
+
+INTRADAY_INTERVALS = {interval for interval, days in RETENTION_DAYS.items() if days is not None}
+
+# Longest gap a single tail request can cover, per interval (Yahoo's limits):
+# 1m bars come at most 7 days per request, the rest as far back as they are kept
+MAX_TAIL_DAYS = {interval: RETENTION_DAYS[interval] for interval in INTRADAY_INTERVALS}
+MAX_TAIL_DAYS['1m'] = 7
+
+# Relative difference in a re-fetched close that means the series was re-adjusted
+ADJUSTMENT_TOLERANCE = 1e-6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    time INTEGER PRIMARY KEY,
+    open REAL, high REAL, low REAL, close REAL, volume INTEGER
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def period_start(period, now=None):
+    """Epoch seconds where a yfinance period begins (None for 'max')"""
+    now = now if now is not None else time.time()
+    if period == 'ytd':
+        year = datetime.fromtimestamp(now, timezone.utc).year
+        return datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()
+    days = PERIOD_DAYS.get(period)
+    if days is None:
+        return None
+    return now - days * DAY
+
+
+def frame_to_rows(df):
+    """(time, open, high, low, close, volume) tuples from a yfinance history"""
+    from core.serialize import frame_to_arrays
+
+    arrays = frame_to_arrays(df)
+    return list(zip(arrays['time'].tolist(), arrays['open'].tolist(), arrays['high'].tolist(),
+                    arrays['low'].tolist(), arrays['close'].tolist(), arrays['volume'].tolist()))
+
+
+def rows_to_frame(rows, tz_name, intraday=False):
+    """Rebuild a yfinance-shaped DataFrame (exchange-tz index) from stored rows"""
+    import pandas as pd
+
+    frame = pd.DataFrame(rows, columns=['time', 'Open', 'High', 'Low', 'Close', 'Volume'])
+    index = pd.to_datetime(frame.pop('time'), unit='s', utc=True)
+    if tz_name:
+        index = index.dt.tz_convert(tz_name)
+    frame.index = pd.DatetimeIndex(index, name='Datetime' if intraday else 'Date')
+    return frame
+
+
+def same_basis(rows, anchor_time, anchor_close):
+    """Whether re-fetched rows still carry the stored close for the anchor bar"""
+    for row in rows:
+        if row[0] == anchor_time:
+            return math.isclose(row[4], anchor_close, rel_tol=ADJUSTMENT_TOLERANCE)
+    # The anchor bar is gone upstream; the stored series can't be trusted to line up
+    return False
+
+
+class BarStore:
+    """One SQLite file per (symbol, interval) under a base directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.upstream_full = 0
+        self.upstream_tail = 0
+        self.readjusted = 0
+        self.bars_fetched = 0
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def supports(self, interval, period):
+        return interval in RETENTION_DAYS and (period in PERIOD_DAYS or period == 'ytd')
+
+    def path(self, symbol, interval):
+        safe = ''.join(c if c.isalnum() or c in '.-_=' else '_' for c in symbol.upper())
+        return os.path.join(self.directory, interval, f"{safe}.sqlite")
+
+    def _lock(self, symbol, interval):
+        key = (symbol.upper(), interval)
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _connect(self, symbol, interval, create=False):
+        """Open a symbol's file (None if it does not exist and create is False)"""
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            if not create:
+                return None
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.executescript(SCHEMA)
+        return conn
+
+    @staticmethod
+    def _meta(conn):
+        return dict(conn.execute('SELECT key, value FROM meta'))
+
+    @staticmethod
+    def _merge(conn, rows, meta):
+        conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?)', rows)
+        conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                         [(k, str(v)) for k, v in meta.items()])
+
+    def read(self, symbol, interval, start=None):
+        """Stored bars at or after start as a DataFrame (empty if none)"""
+        conn = self._connect(symbol, interval)
+        if conn is None:
+            return rows_to_frame([], None, interval in INTRADAY_INTERVALS)
+        try:
+            meta = self._meta(conn)
+            if start is None:
+                rows = conn.execute('SELECT * FROM bars ORDER BY time').fetchall()
+            else:
+                rows = conn.execute('SELECT * FROM bars WHERE time >= ? ORDER BY time',
+                                    (int(start),)).fetchall()
+        finally:
+            conn.close()
+        return rows_to_frame(rows, meta.get('tz'), interval in INTRADAY_INTERVALS)
+
+    def sync(self, symbol, interval, period, fetch):
+        """Bring the store up to date for (interval, period) and return that slice
+
+        fetch(symbol, interval, period=None, start=None) downloads a yfinance
+        history, either for a whole period or from a start datetime onward.
+        """
+        now = time.time()
+        start = period_start(period, now)
+
+        with self._lock(symbol, interval):
+            # Symbols with no data upstream never get a file
+            conn = self._connect(symbol, interval)
+            try:
+                meta = self._meta(conn) if conn else {}
+                # Newest two bars, newest first: the last may be partial, the one before is final
+                tail = []
+                if conn:
+                    tail = conn.execute('SELECT time, close FROM bars ORDER BY time DESC LIMIT 2').fetchall()
+                last = tail[0][0] if tail else None
+                # Earliest time the stored series is complete from ('max' = all history)
+                covered_from = meta.get('covered_from')
+                covered = covered_from == 'max' or (
+                    covered_from is not None and start is not None and float(covered_from) <= start
+                )
+                max_gap = MAX_TAIL_DAYS.get(interval)
+                gap_ok = last is not None and (max_gap is None or now - last < max_gap * DAY)
+
+                replace = False
+                if covered and gap_ok:
+                    # Only the missing tail, from the last complete bar on
+                    anchor_time, anchor_close = tail[-1]
+                    df = fetch(symbol, interval, start=datetime.fromtimestamp(anchor_time, timezone.utc))
+                    self.upstream_tail += 1
+                    rows = frame_to_rows(df) if df is not None and not df.empty else []
+                    if not rows:
+                        # The anchor bar itself should come back; nothing means the
+                        # tail request failed, so re-fetch rather than serve stale bars
+                        covered = False
+                    elif not same_basis(rows, anchor_time, anchor_close):
+                        # A split or dividend re-adjusted the history since it was stored
+                        self.readjusted += 1
+                        covered = False
+                        replace = True
+
+                if not (covered and gap_ok):
+                    df = fetch(symbol, interval, period=period)
+                    self.upstream_full += 1
+                    # Anything stored before the new period may be separated by a gap
+                    covered_from = 'max' if start is None else start
+                    rows = frame_to_rows(df) if df is not None and not df.empty else []
+
+                if not rows:
+                    if conn is None:
+                        return df
+                else:
+                    conn = conn or self._connect(symbol, interval, create=True)
+                    self.bars_fetched += len(rows)
+                    tz = getattr(df.index, 'tz', None)
+                    updates = {'covered_from': covered_from, 'updated_at': now}
+                    if tz is not None:
+                        updates['tz'] = str(tz)
+                    with conn:
+                        if replace:
+                            conn.execute('DELETE FROM bars')
+                        self._merge(conn, rows, updates)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+        return self.read(symbol, interval, start)
+
+    def files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.sqlite'):
+                    yield os.path.join(root, name)
+
+    def compact(self, now=None):
+        """Drop bars older than each interval's retention and VACUUM every file"""
+        now = now if now is not None else time.time()
+        before = after = removed = 0
+        for path in self.files():
+            interval = os.path.basename(os.path.dirname(path))
+            before += os.path.getsize(path)
+            conn = sqlite3.connect(path, timeout=30)
+            try:
+                retention = RETENTION_DAYS.get(interval)
+                if retention is not None:
+                    with conn:
+                        cursor = conn.execute('DELETE FROM bars WHERE time < ?',
+                                              (int(now - retention * DAY),))
+                        removed += cursor.rowcount
+                        # Older history is gone, so the store no longer covers it
+                        conn.execute("UPDATE meta SET value = ? WHERE key = 'covered_from' "
+                                     "AND (value = 'max' OR CAST(value AS REAL) < ?)",
+                                     (str(now - retention * DAY), now - retention * DAY))
+                conn.execute('VACUUM')
+            finally:
+                conn.close()
+            after += os.path.getsize(path)
+        return {'bytes_before': before, 'bytes_after': after, 'bars_removed': removed}
+
+    def stats(self):
+        files = list(self.files())
+        return {
+            'directory': self.directory,
+            'files': len(files),
+            'bytes': sum(os.path.getsize(p) for p in files),
+            'upstream_full': self.upstream_full,
+            'upstream_tail': self.upstream_tail,
+            'readjusted': self.readjusted,
+            'bars_fetched': self.bars_fetched,
+        }
+
+
+def _build_default_store():
+    directory = os.environ.get('BAR_STORE_DIR')
+    return BarStore(directory) if directory else None
+
+
+# Enabled by setting BAR_STORE_DIR
+bar_store = _build_default_store()
+
+
+def main(argv):
+    if argv[:1] != ['compact']:
+        print('Usage: python3 -m core.bar_store compact [directory]')
+        return 1
+    directory = argv[1] if len(argv) > 1 else os.environ.get('BAR_STORE_DIR')
+    if not directory:
+        print('Set BAR_STORE_DIR or pass the store directory')
+        return 1
+    result = BarStore(directory).compact()
+    print(f"Compacted {directory}: {result['bars_removed']:,} old bars removed, "
+          f"{result['bytes_before']:,} -> {result['bytes_after']:,} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
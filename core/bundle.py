@@ -0,0 +1,211 @@
+"""
+Multi-panel bundles for /api/stock/<symbol>/bundle.
+
+A bundle is a list of "interval:period" panels (e.g. 1m:1d,15m:5d,1d:1y).
+Each panel is mapped to the upstream (interval, period) fetch it needs,
+fetches that another requested fetch can be resampled from are dropped
+(5m:1d comes from 1m:5d, 1wk:1y from 1d:max, ...), the remaining distinct
+fetches run concurrently and every panel is cut and resampled from its
+base. Panels can be collected into one response or yielded as each base
+arrives (for NDJSON streaming).
+"""
+
+import gzip
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from core import resample
+from core.bar_store import period_start
+from core.serialize import dumps
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+MAX_PANELS = 12
+MAX_WORKERS = 6
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Intervals Yahoo serves directly (everything else is resampled)
+NATIVE_INTERVALS = ('1m', '2m', '5m', '15m', '30m', '1h', '1d', '1wk', '1mo', '3mo')
+
+# Rough calendar span of each period, for "does this fetch cover that one"
+PERIOD_SPAN = {
+    '1d': 1, '5d': 7, '1mo': 31, '3mo': 92, '6mo': 183,
+    '1y': 366, '2y': 731, '5y': 1827, '10y': 3653, 'max': float('inf'),
+}
+
+# '1d'/'5d' mean trading sessions upstream, not calendar days
+SESSION_PERIODS = {'1d': 1, '5d': 5}
+
+
+class BundleError(ValueError):
+    pass
+
+
+def period_span(period, now=None):
+    """Approximate length of a period in days"""
+    if period == 'ytd':
+        return ((time.time() if now is None else now) - period_start('ytd', now)) / 86400
+    if period not in PERIOD_SPAN:
+        raise BundleError(f'Unknown period: {period}')
+    return PERIOD_SPAN[period]
+
+
+def parse_panels(param):
+    """[(panel_key, timeframe, period)] from 'interval:period,...' (order kept, duplicates dropped)"""
+    panels = []
+    seen = set()
+    for part in (param or '').split(','):
+        key = part.strip()
+        if not key or key in seen:
+            continue
+        interval, sep, period = key.partition(':')
+        if not sep:
+            raise BundleError(f'Panel must be interval:period, got {key}')
+        try:
+            timeframe = resample.normalize(interval)
+        except resample.UnknownTimeframe as e:
+            raise BundleError(str(e))
+        period_span(period)
+        seen.add(key)
+        panels.append((key, timeframe, period))
+    if len(panels) > MAX_PANELS:
+        raise BundleError(f'At most {MAX_PANELS} panels per bundle')
+    return panels
+
+
+def native_fetch(timeframe, period):
+    """The upstream (interval, period) a panel would need on its own"""
+    if timeframe in NATIVE_INTERVALS:
+        return (timeframe, period)
+    kind = resample.TIMEFRAMES[timeframe][0]
+    if kind == 'intraday':
+        return (resample.intraday_base([timeframe]), period)
+    return ('1mo', period)
+
+
+def can_derive(base, target):
+    """True when the target timeframe can be resampled from base bars"""
+    base_kind, base_size = resample.TIMEFRAMES[base]
+    kind, size = resample.TIMEFRAMES[target]
+    if base_kind == 'intraday':
+        return kind == 'intraday' and size % base_size == 0
+    if base == '1d':
+        return kind != 'intraday'
+    if base_kind == 'month':
+        return kind == 'month' and size % base_size == 0
+    return base == target
+
+
+def base_width(interval):
+    """Approximate bar length in seconds, to prefer the coarsest usable base"""
+    kind, size = resample.TIMEFRAMES[interval]
+    return {'intraday': size, 'day': 86400, 'week': 7 * 86400, 'month': size * 31 * 86400}[kind]
+
+
+def plan(panels, now=None):
+    """{panel_key: (interval, period)} assigning every panel to a deduplicated fetch"""
+    needed = {key: native_fetch(tf, period) for key, tf, period in panels}
+    fetches = set(needed.values())
+
+    def serves(a, b):
+        return can_derive(a[0], b[0]) and period_span(a[1], now) >= period_span(b[1], now)
+
+    # Drop any fetch another requested fetch can stand in for
+    kept = [f for f in fetches if not any(o != f and serves(o, f) for o in fetches)]
+
+    assignment = {}
+    for key, tf, period in panels:
+        options = [f for f in kept if serves(f, needed[key])]
+        # The coarsest/shortest base that works keeps resampling cheap
+        assignment[key] = min(options, key=lambda f: (-base_width(f[0]), period_span(f[1], now)))
+    return assignment
+
+
+def slice_period(df, period, now=None):
+    """Rows of a history that fall inside a (shorter) period, as Yahoo would return it"""
+    if df.empty or period == 'max':
+        return df
+    if period in SESSION_PERIODS:
+        dates = df.index.normalize()
+        sessions = dates.unique()[-SESSION_PERIODS[period]:]
+        return df[dates.isin(sessions)]
+    start = pd.Timestamp(period_start(period, now), unit='s', tz='UTC')
+    if getattr(df.index, 'tz', None) is None:
+        start = start.tz_localize(None)
+    return df[df.index >= start]
+
+
+def build_panel(key, timeframe, period, base, df, now=None):
+    """Response entry for one panel resampled from its base history"""
+    interval, base_period = base
+    bars = resample.resample(slice_period(df, period, now), timeframe)
+    panel = {
+        'panel': key,
+        'interval': timeframe,
+        'period': period,
+        'base': f'{interval}:{base_period}',
+        'data': bars,
+        'count': len(bars),
+    }
+    if not len(bars):
+        panel['error'] = True
+        panel['message'] = 'No data available for this symbol/timeframe'
+    return panel
+
+
+def iter_panels(symbol, panels, get_history, workers=MAX_WORKERS):
+    """Yield panel entries as soon as each base fetch completes"""
+    now = time.time()
+    assignment = plan(panels, now)
+    bases = sorted(set(assignment.values()))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(bases)))) as executor:
+        futures = {executor.submit(get_history, symbol, *base): base for base in bases}
+        for future in as_completed(futures):
+            base = futures[future]
+            served = [(key, tf, period) for key, tf, period in panels if assignment[key] == base]
+            try:
+                df = future.result()
+            except Exception as e:
+                for key, tf, period in served:
+                    yield {'panel': key, 'interval': tf, 'period': period,
+                           'error': True, 'message': str(e)}
+                continue
+            for key, tf, period in served:
+                yield build_panel(key, tf, period, base, df, now)
+
+
+def collect(symbol, panels, get_history, workers=MAX_WORKERS):
+    """All panels keyed by panel string, plus the number of upstream fetches"""
+    results = {entry['panel']: entry for entry in iter_panels(symbol, panels, get_history, workers)}
+    return {key: results[key] for key, _, _ in panels}, len(set(plan(panels).values()))
+
+
+def ndjson_lines(entries, sort_keys=True):
+    """One compact JSON document per panel entry, newline terminated"""
+    for entry in entries:
+        yield dumps(entry, sort_keys=sort_keys, separators=(',', ':')) + '\n'
+
+
+def compress(body, encoding):
+    """Encode a complete response body with gzip or br (identity passes through)"""
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(body, quality=5)
+    return body
+
+
+def gzip_stream(chunks, level=6):
+    """gzip a stream of byte chunks, flushing after each so lines arrive immediately"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
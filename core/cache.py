@@ -0,0 +1,359 @@
+"""
+OHLCV bar cache shared by every /api/stock/<symbol> handler.
+
+Entries are keyed by (symbol, interval, period) and expire after an
+interval-aware TTL: 1m bars go stale within seconds, daily and weekly bars
+are good for hours. The in-memory backend is a single LRU guarded by a lock
+so all gunicorn threads share it; set BAR_CACHE_DIR to add an on-disk tier
+that survives restarts.
+
+Entries outlive their TTL by a stale window (BAR_CACHE_STALE_SECONDS) so a
+caller can serve the old bars while a refresh runs, or when upstream is
+down. Empty results are cached too, as negative entries: for
+BAR_CACHE_NEGATIVE_TTL when the symbol is known not to exist, so unknown
+symbols don't hit upstream every time, and only for BAR_CACHE_EMPTY_TTL
+otherwise, since a throttled or timed-out fetch comes back empty as well.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Seconds a cached history stays fresh, by bar interval
+INTERVAL_TTLS = {
+    '1m': 30,
+    '2m': 60,
+    '5m': 120,
+    '15m': 300,
+    '30m': 600,
+    '60m': 900,
+    '90m': 900,
+    '1h': 900,
+    '1d': 4 * 3600,
+    '5d': 6 * 3600,
+    '1wk': 12 * 3600,
+    '1mo': 24 * 3600,
+    '3mo': 24 * 3600,
+}
+DEFAULT_TTL = 300
+
+# How long past its TTL an entry may still be served as stale
+STALE_SECONDS = int(os.environ.get('BAR_CACHE_STALE_SECONDS', 24 * 3600))
+# How long an empty result is remembered for a symbol confirmed unknown
+NEGATIVE_TTL = int(os.environ.get('BAR_CACHE_NEGATIVE_TTL', 3600))
+# ... and for any other empty result (yfinance returns one on 429s and timeouts)
+EMPTY_TTL = int(os.environ.get('BAR_CACHE_EMPTY_TTL', 60))
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_DISK_MAX_BYTES = 1024 * 1024 * 1024
+
+
+# What BarCache stores in its backends: the value plus when it was fetched
+CacheEntry = namedtuple('CacheEntry', 'value stored_at fresh_until negative')
+
+
+def ttl_for_interval(interval):
+    """Return the freshness window (seconds) for bars of the given interval"""
+    return INTERVAL_TTLS.get(interval, DEFAULT_TTL)
+
+
+def estimate_size(value):
+    """Rough byte size of a cached value (DataFrames and Bars report their own usage)"""
+    try:
+        return int(value.memory_usage(index=True, deep=True).sum())
+    except AttributeError:
+        return getattr(value, 'nbytes', None) or sys.getsizeof(value)
+
+
+class MemoryBackend:
+    """Thread-safe LRU store bounded by an approximate memory budget"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, expires_at, value, size):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+            # Never let one oversized history flush the whole cache
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (expires_at, size, value)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+        }
+
+
+class DiskBackend:
+    """Pickle-per-entry store under a directory, pruned oldest-first by size"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, expires_at, size, value = pickle.load(f)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+        if stored_key != key:
+            return None
+        # Touch so pruning treats this as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return (expires_at, size, value)
+
+    def set(self, key, expires_at, value, size):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, expires_at, size, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Bar cache disk write failed: {e}")
+            return
+        self._prune()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _files(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _prune(self):
+        with self._lock:
+            files = self._files()
+            total = sum(size for _, size, _ in files)
+            if total <= self.max_bytes:
+                return
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    self.evictions += 1
+                except OSError:
+                    pass
+
+    def clear(self):
+        for _, _, path in self._files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        files = self._files()
+        return {
+            'entries': len(files),
+            'bytes': sum(size for _, size, _ in files),
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+            'directory': self.directory,
+        }
+
+
+class BarCache:
+    """Two-tier (memory, optional disk) cache of bar histories with per-interval TTLs"""
+
+    def __init__(self, memory=None, disk=None, clock=time.time, stale_seconds=STALE_SECONDS,
+                 negative_ttl=NEGATIVE_TTL):
+        self.memory = memory if memory is not None else MemoryBackend()
+        self.disk = disk
+        self.clock = clock
+        self.stale_seconds = stale_seconds
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(symbol, interval, period):
+        return (symbol.upper(), interval, period)
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def _find(self, key, now):
+        """The stored CacheEntry (fresh or stale) for key, or None"""
+        entry = self.memory.get(key)
+        if entry is not None and entry[0] > now and isinstance(entry[2], CacheEntry):
+            return entry[2]
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            # Entries written before CacheEntry existed are ignored
+            if entry is not None and entry[0] > now and isinstance(entry[2], CacheEntry):
+                expires_at, size, value = entry
+                self.memory.set(key, expires_at, value, size)
+                self._count('disk_hits')
+                return value
+        return None
+
+    def lookup(self, symbol, interval, period):
+        """Return the CacheEntry even when stale (None when missing or past the stale window)"""
+        now = self.clock()
+        entry = self._find(self.make_key(symbol, interval, period), now)
+        if entry is None:
+            self._count('misses')
+        elif entry.fresh_until > now:
+            self._count('hits')
+            if entry.negative:
+                self._count('negative_hits')
+        else:
+            self._count('stale_hits')
+        return entry
+
+    def get(self, symbol, interval, period):
+        """Return the cached value or None when missing/expired"""
+        now = self.clock()
+        entry = self._find(self.make_key(symbol, interval, period), now)
+        if entry is None or entry.fresh_until <= now:
+            self._count('misses')
+            return None
+        self._count('hits')
+        if entry.negative:
+            self._count('negative_hits')
+        return entry.value
+
+    def set(self, symbol, interval, period, value, ttl=None, negative=False):
+        """Store a value; negative entries (empty results) use the negative TTL and never go stale"""
+        key = self.make_key(symbol, interval, period)
+        if ttl is None:
+            ttl = self.negative_ttl if negative else ttl_for_interval(interval)
+        now = self.clock()
+        entry = CacheEntry(value, now, now + ttl, negative)
+        expires_at = entry.fresh_until + (0 if negative else self.stale_seconds)
+        size = estimate_size(value)
+
+        self.memory.set(key, expires_at, entry, size)
+        if self.disk is not None:
+            self.disk.set(key, expires_at, entry, size)
+
+    def set_negative(self, symbol, interval, period, value, ttl=None):
+        """Remember an empty result so the next lookups skip upstream"""
+        self.set(symbol, interval, period, value, ttl=ttl, negative=True)
+
+    def get_or_fetch(self, symbol, interval, period, fetch):
+        """Return the cached value, calling fetch() and storing the result on a miss"""
+        value = self.get(symbol, interval, period)
+        if value is not None:
+            return value
+        value = fetch()
+        if value is not None:
+            self.set(symbol, interval, period, value)
+        return value
+
+    def invalidate(self, symbol, interval, period):
+        key = self.make_key(symbol, interval, period)
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'disk_hits': self.disk_hits,
+            'stale_hits': self.stale_hits,
+            'negative_hits': self.negative_hits,
+            'evictions': self.memory.evictions + (self.disk.evictions if self.disk else 0),
+            'memory': self.memory.stats(),
+            'disk': self.disk.stats() if self.disk is not None else None,
+        }
+
+
+def _build_default_cache():
+    max_bytes = int(os.environ.get('BAR_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+    disk = None
+    cache_dir = os.environ.get('BAR_CACHE_DIR')
+    if cache_dir:
+        disk_max = int(os.environ.get('BAR_CACHE_DISK_MAX_BYTES', DEFAULT_DISK_MAX_BYTES))
+        disk = DiskBackend(cache_dir, max_bytes=disk_max)
+    return BarCache(memory=MemoryBackend(max_bytes=max_bytes), disk=disk)
+
+
+# Process-wide instance shared by every request thread
+bar_cache = _build_default_cache()
@@ -0,0 +1,51 @@
+"""
+Flat string columns for data shared by forked workers.
+
+A list of N strings is N separately reference-counted objects, and reading
+any of them writes its refcount. After a fork (gunicorn --preload) every
+worker therefore slowly copies each page of the list it touches. A
+StringColumn holds the strings in one bytes blob plus an offsets array, a
+handful of objects however many strings. Reads slice and decode a new str
+and never write to the shared pages.
+
+Each value is stored followed by a NUL byte, so a substring search can run
+over the whole blob at C speed (find) without matching across values.
+"""
+
+from array import array
+from bisect import bisect_right
+
+
+class StringColumn:
+    """Immutable sequence of strings stored as one UTF-8 blob"""
+
+    def __init__(self, values):
+        encoded = [value.encode('utf-8') + b'\0' for value in values]
+        offsets = array('q', [0])
+        total = 0
+        for item in encoded:
+            total += len(item)
+            offsets.append(total)
+        self.offsets = offsets
+        self.blob = b''.join(encoded)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1] - 1].decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def find(self, text):
+        """Indexes (ascending) of the values containing text"""
+        needle = text.encode('utf-8')
+        if not needle or b'\0' in needle:
+            return
+        blob, offsets = self.blob, self.offsets
+        pos = blob.find(needle)
+        while pos != -1:
+            i = bisect_right(offsets, pos) - 1
+            yield i
+            pos = blob.find(needle, offsets[i + 1])
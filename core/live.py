@@ -0,0 +1,248 @@
+"""
+Live bar updates for /api/stream.
+
+Every (symbol, interval) that has at least one subscriber gets a single
+polling thread (a LiveFeed). Each tick it downloads a short recent window,
+diffs it against the bars it already published and fans out only the
+changed last bar and any new bars to every subscriber. 500 viewers of one
+symbol therefore cost one upstream poll per tick. A feed stops once its
+last subscriber leaves.
+
+Subscribers receive events through push(); QueueSubscriber buffers them for
+a blocking consumer such as a Server-Sent Events generator, and
+AsyncQueueSubscriber hands them to an asyncio consumer (asgi.py).
+"""
+
+import asyncio
+import json
+import math
+import os
+import queue
+import threading
+import time
+
+from core.serialize import Bars
+
+POLL_SECONDS = float(os.environ.get('LIVE_POLL_SECONDS', 15))
+HEARTBEAT_SECONDS = 15
+# Streams close after this long; EventSource reconnects on its own
+MAX_STREAM_SECONDS = float(os.environ.get('LIVE_MAX_STREAM_SECONDS', 600))
+# A main.py stream pins a worker thread for its whole life; past this many per
+# process it answers 503 (asgi.py streams cost no thread and are not capped)
+MAX_SYNC_STREAMS = int(os.environ.get('LIVE_MAX_SYNC_STREAMS', 2))
+MAX_SYMBOLS = 20
+SNAPSHOT_BARS = 2
+SUBSCRIBER_QUEUE = 256
+
+# Short upstream window polled for each streamable interval
+POLL_PERIODS = {
+    '1m': '1d', '2m': '1d', '5m': '1d', '15m': '5d', '30m': '5d',
+    '60m': '5d', '90m': '5d', '1h': '5d', '1d': '5d',
+}
+
+
+def fetch_recent(symbol, interval):
+    """Most recent bars for a feed, straight from upstream (no cache)"""
+    from core.market_data import fetch_history
+
+    df = fetch_history(symbol, interval, POLL_PERIODS[interval])
+    if df.empty:
+        return []
+    return Bars.from_frame(df.tail(SNAPSHOT_BARS + 8)).records()
+
+
+def parse_stream_params(params):
+    """(symbols, interval) for a stream request; raises ValueError"""
+    from core.quotes import parse_symbols
+
+    symbols = parse_symbols(params.get('symbols', ''), upper=True)[:MAX_SYMBOLS]
+    interval = params.get('interval', '1m')
+    if not symbols:
+        raise ValueError('symbols parameter required')
+    if interval not in POLL_PERIODS:
+        raise ValueError(f'Interval not streamable: {interval}')
+    return symbols, interval
+
+
+def clean_bars(bars):
+    """Bars with NaN prices as None: NaN != NaN would republish them every tick"""
+    return [
+        {key: None if isinstance(value, float) and math.isnan(value) else value
+         for key, value in bar.items()}
+        for bar in bars
+    ]
+
+
+def format_sse(event):
+    """One Server-Sent Events message for an event dict"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class QueueSubscriber:
+    """Buffers pushed events for one blocking consumer"""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.dropped = False
+        self._queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE)
+
+    def push(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # A consumer this far behind is disconnected rather than buffered forever
+            self.dropped = True
+
+    def get(self, timeout=HEARTBEAT_SECONDS):
+        """Next event, or None after timeout (time for a heartbeat)"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncQueueSubscriber:
+    """Buffers pushed events (from feed threads) for one asyncio consumer"""
+
+    def __init__(self, keys, loop):
+        self.keys = keys
+        self.dropped = False
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+
+    def push(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:  # event loop already closed
+            self.dropped = True
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+
+    async def get(self, timeout=HEARTBEAT_SECONDS):
+        """Next event, or None after timeout (time for a heartbeat)"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LiveFeed:
+    """One shared polling loop for a (symbol, interval)"""
+
+    def __init__(self, hub, symbol, interval):
+        self.hub = hub
+        self.symbol = symbol
+        self.interval = interval
+        self.subscribers = set()
+        self.latest = []
+        self.polls = 0
+        self.events = 0
+        self.thread = None
+
+    def diff(self, bars):
+        """Bars that are new or changed since the last published tick"""
+        known = {bar['time']: bar for bar in self.latest}
+        last_time = self.latest[-1]['time'] if self.latest else None
+        changed = []
+        for bar in bars:
+            previous = known.get(bar['time'])
+            if previous is not None:
+                if previous != bar:
+                    changed.append(bar)
+            elif last_time is None or bar['time'] > last_time:
+                changed.append(bar)
+        return changed
+
+    def event(self, kind, bars):
+        return {'type': kind, 'symbol': self.symbol, 'interval': self.interval, 'bars': bars}
+
+    def run(self):
+        while True:
+            started = time.time()
+            try:
+                bars = clean_bars(self.hub.fetch(self.symbol, self.interval))
+                self.polls += 1
+                if not self.latest:
+                    changed, kind = bars[-SNAPSHOT_BARS:], 'snapshot'
+                else:
+                    changed, kind = self.diff(bars), 'bar'
+                # Joiners see either the old latest plus this event, or only the new latest
+                with self.hub._lock:
+                    if bars:
+                        self.latest = bars[-SNAPSHOT_BARS:]
+                    subscribers = list(self.subscribers)
+                if changed:
+                    self.events += 1
+                    event = self.event(kind, changed)
+                    for subscriber in subscribers:
+                        subscriber.push(event)
+            except Exception as e:
+                print(f"Live poll {self.symbol} {self.interval} failed: {e}")
+
+            time.sleep(max(0.0, self.hub.poll_seconds - (time.time() - started)))
+            if not self.hub.keep_running(self):
+                return
+
+
+class LiveHub:
+    """Registry of live feeds; starts one polling thread per subscribed key"""
+
+    def __init__(self, fetch=fetch_recent, poll_seconds=POLL_SECONDS):
+        self.fetch = fetch
+        self.poll_seconds = poll_seconds
+        self._feeds = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, symbols, interval, subscriber=None):
+        """Register a subscriber for every symbol; returns it with snapshots queued"""
+        if interval not in POLL_PERIODS:
+            raise ValueError(f'Interval not streamable: {interval}')
+        keys = [(symbol.upper(), interval) for symbol in symbols]
+        subscriber = subscriber or QueueSubscriber(keys)
+
+        with self._lock:
+            for symbol, interval in keys:
+                feed = self._feeds.get((symbol, interval))
+                if feed is None:
+                    feed = self._feeds[(symbol, interval)] = LiveFeed(self, symbol, interval)
+                    feed.thread = threading.Thread(target=feed.run, name=f'live-{symbol}-{interval}',
+                                                   daemon=True)
+                    feed.thread.start()
+                feed.subscribers.add(subscriber)
+                # Late joiners start from the last published bars
+                if feed.latest:
+                    subscriber.push(feed.event('snapshot', list(feed.latest)))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            for key in subscriber.keys:
+                feed = self._feeds.get(key)
+                if feed is not None:
+                    feed.subscribers.discard(subscriber)
+
+    def keep_running(self, feed):
+        """Called by a feed after each tick; retires it once nobody listens"""
+        with self._lock:
+            if feed.subscribers:
+                return True
+            if self._feeds.get((feed.symbol, feed.interval)) is feed:
+                del self._feeds[(feed.symbol, feed.interval)]
+            return False
+
+    def stats(self):
+        with self._lock:
+            feeds = list(self._feeds.values())
+        return {
+            'feeds': len(feeds),
+            'subscribers': sum(len(feed.subscribers) for feed in feeds),
+            'polls': sum(feed.polls for feed in feeds),
+            'events': sum(feed.events for feed in feeds),
+        }
+
+
+live_hub = LiveHub()
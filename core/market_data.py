@@ -0,0 +1,187 @@
+"""
+Upstream market data access used by the API handlers.
+All OHLCV history requests go through get_history so they share the bar cache,
+and concurrent identical fetches are coalesced into a single upstream call.
+When BAR_STORE_DIR is set, histories are read from the persistent bar store,
+which only downloads the bars added since its last update. Every Yahoo call
+is paced by the shared rate governor, in the caller's lane.
+
+Expired cache entries are served stale while one background refresh runs
+(and whenever upstream fails), and empty results are cached as negative
+entries (briefly, unless the symbol is confirmed unknown: a Yahoo 404 or
+not in the stock database); get_history_with_age reports how old the
+returned bars are.
+
+get_bars_with_age is the same path for callers that only serialize the bars
+(the serverless chart handler): it fetches through the dependency-free
+core.yahoo client into serialize.Bars, so neither yfinance nor pandas is
+imported. yfinance itself is only imported on first use.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core import yahoo
+from core.bar_store import bar_store
+from core.cache import EMPTY_TTL, BarCache, MemoryBackend, bar_cache
+from core.ratelimit import BULK, YAHOO, rate_governor
+from core.serialize import Bars
+from core.singleflight import upstream_flight
+
+REVALIDATE_WORKERS = 4
+
+revalidate_executor = ThreadPoolExecutor(max_workers=REVALIDATE_WORKERS, thread_name_prefix='revalidate')
+# Bars fetched through core.yahoo (same keys as bar_cache, different value type)
+chart_cache = BarCache(memory=MemoryBackend(max_bytes=64 * 1024 * 1024))
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+
+def fetch_history(symbol, interval, period=None, start=None):
+    """Download bar history for a period, or from start onward, from Yahoo Finance (no caching)"""
+    import yfinance as yf
+
+    ticker = yf.Ticker(symbol)
+    if start is not None:
+        return rate_governor.call(YAHOO, lambda: ticker.history(start=start, interval=interval))
+    return rate_governor.call(YAHOO, lambda: ticker.history(period=period, interval=interval))
+
+
+def fetch_info(symbol):
+    """Download the ticker.info quote/profile dict from Yahoo Finance"""
+    import yfinance as yf
+
+    return rate_governor.call(YAHOO, lambda: yf.Ticker(symbol).info)
+
+
+def fetch_bars(symbol, interval, period):
+    """Download bars as serialize.Bars through the lightweight client (no caching)"""
+    return Bars.from_columns(rate_governor.call(YAHOO, lambda: yahoo.chart(symbol, interval, period)))
+
+
+def fetch_quotes(symbols):
+    """{SYMBOL: quote dict} for many symbols, one upstream request when Yahoo grants a crumb"""
+    try:
+        return rate_governor.call(YAHOO, lambda: yahoo.quotes(symbols))
+    except yahoo.CrumbUnavailable:
+        pass
+    # Without a crumb, fall back to one chart request per symbol (no market cap)
+    quotes = {}
+    for symbol in symbols:
+        quote = rate_governor.call(YAHOO, lambda: yahoo.chart_quote(symbol))
+        if quote is not None:
+            quotes[symbol.upper()] = quote
+    return quotes
+
+
+def is_unlisted(symbol):
+    """True when the stock database does not list symbol"""
+    from core.registry import get_registry
+
+    try:
+        return symbol not in get_registry()
+    except Exception as e:
+        print(f"Stock registry unavailable: {e}")
+        return False
+
+
+def _store(cache, symbol, interval, period, value, empty, stale, not_found=False):
+    """Cache a fetched value (negative when empty) and return what to serve"""
+    if not empty:
+        cache.set(symbol, interval, period, value)
+    elif stale is not None and not stale.negative:
+        # A symbol that had bars is more likely throttled than gone: keep serving them
+        return stale.value
+    elif not_found or is_unlisted(symbol):
+        cache.set_negative(symbol, interval, period, value)
+    else:
+        # Could be a 429 or a timeout that yfinance turned into an empty history
+        cache.set_negative(symbol, interval, period, value, ttl=EMPTY_TTL)
+    return value
+
+
+def load_history(symbol, interval, period, stale=None):
+    """Fetch history upstream (one call per key at a time) and update the cache"""
+    def load():
+        if bar_store is not None and bar_store.supports(interval, period):
+            df = bar_store.sync(symbol, interval, period, fetch_history)
+        else:
+            df = fetch_history(symbol, interval, period)
+        return _store(bar_cache, symbol, interval, period, df, df.empty, stale)
+
+    key = ('history',) + bar_cache.make_key(symbol, interval, period)
+    return upstream_flight.do(key, load)
+
+
+def load_bars(symbol, interval, period, stale=None):
+    """load_history for the lightweight client: fetch Bars and update chart_cache"""
+    def load():
+        try:
+            bars, not_found = fetch_bars(symbol, interval, period), False
+        except yahoo.SymbolNotFound:
+            bars, not_found = Bars.from_columns(yahoo.empty_columns()), True
+        return _store(chart_cache, symbol, interval, period, bars, not len(bars), stale, not_found)
+
+    key = ('bars',) + chart_cache.make_key(symbol, interval, period)
+    return upstream_flight.do(key, load)
+
+
+def revalidate(symbol, interval, period, stale, load=load_history):
+    """Refresh a stale entry in the background (at most one refresh per key)"""
+    key = (load.__name__,) + bar_cache.make_key(symbol, interval, period)
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+
+    def run():
+        try:
+            with rate_governor.lane(BULK):
+                load(symbol, interval, period, stale)
+        except Exception as e:
+            print(f"Background refresh of {symbol} {interval} {period} failed: {e}")
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+
+    revalidate_executor.submit(run)
+
+
+def _get_with_age(cache, load, symbol, interval, period):
+    entry = cache.lookup(symbol, interval, period)
+    if entry is not None:
+        now = cache.clock()
+        if entry.fresh_until <= now:
+            revalidate(symbol, interval, period, entry, load)
+        return entry.value, max(0.0, now - entry.stored_at)
+
+    return load(symbol, interval, period), 0.0
+
+
+def get_history_with_age(symbol, interval='1d', period='1mo'):
+    """Return (bar history, age in seconds), serving stale bars while a refresh runs"""
+    return _get_with_age(bar_cache, load_history, symbol, interval, period)
+
+
+def get_bars_with_age(symbol, interval='1d', period='1mo'):
+    """Return (serialize.Bars, age in seconds) like get_history_with_age, without pandas
+
+    Intervals the chart endpoint can't serve as-is, and histories kept in
+    the bar store, still go through the DataFrame path.
+    """
+    if interval not in yahoo.CHART_INTERVALS or (bar_store is not None and bar_store.supports(interval, period)):
+        df, age = get_history_with_age(symbol, interval, period)
+        if df.empty:
+            return Bars.from_columns(yahoo.empty_columns()), age
+        return Bars.from_frame(df), age
+    return _get_with_age(chart_cache, load_bars, symbol, interval, period)
+
+
+def get_history(symbol, interval='1d', period='1mo'):
+    """Return bar history for symbol, served from the shared bar cache (stale while refreshing)"""
+    return get_history_with_age(symbol, interval, period)[0]
+
+
+def get_info(symbol):
+    """Return ticker.info for symbol, sharing one upstream call among concurrent callers"""
+    return upstream_flight.do(('info', symbol.upper()), lambda: fetch_info(symbol))
@@ -0,0 +1,165 @@
+"""
+Momentum scoring shared by the screeners.
+Finds stocks in early exponential breakout phase with high return potential.
+
+Pure Python (no yfinance/pandas/numpy) so the lightweight Vercel screener
+can import it.
+"""
+
+# Lookback windows scored for every stock (trading days)
+TIMEFRAMES = {
+    '1M': 21,
+    '2M': 42,
+    '3M': 63,
+    '6M': 126,
+    '1Y': 252,
+}
+
+MIN_HISTORY = 60
+MIN_FINAL_SCORE = 20
+
+
+def mean(values):
+    """Calculate mean"""
+    return sum(values) / len(values) if values else 0
+
+
+def calculate_exponential_score(prices):
+    """Calculate exponential growth score (0-100)"""
+    if len(prices) < 20:
+        return 0
+
+    try:
+        # Calculate percentage gains over time
+        gains = []
+        for i in range(5, len(prices), 5):
+            if prices[i-5] > 0:
+                gain = ((prices[i] - prices[i-5]) / prices[i-5]) * 100
+                gains.append(gain)
+
+        if not gains or len(gains) < 2:
+            return 0
+
+        # Exponential pattern: gains should be accelerating
+        mid = len(gains) // 2
+        avg_early = mean(gains[:mid])
+        avg_late = mean(gains[mid:])
+
+        # Check if recent gains are higher (acceleration)
+        acceleration = avg_late - avg_early
+
+        # Check consistency
+        positive_count = sum(1 for g in gains if g > 0)
+        consistency = (positive_count / len(gains)) * 100
+
+        # Calculate recent slope
+        recent_prices = prices[-20:]
+        if len(recent_prices) > 1:
+            slope = (recent_prices[-1] - recent_prices[0]) / len(recent_prices)
+            slope_score = min(100, max(0, slope * 10))
+        else:
+            slope_score = 0
+
+        # Final exponential score
+        score = (consistency * 0.4) + (min(100, max(0, acceleration * 5)) * 0.3) + (slope_score * 0.3)
+
+        return min(100, max(0, score))
+
+    except Exception as e:
+        print(f"Error calculating exponential score: {e}")
+        return 0
+
+
+def calculate_potential_return(prices, pattern_scores):
+    """Calculate potential return percentage (0-500+)"""
+    try:
+        if len(prices) < 60:
+            return 0
+
+        current_price = prices[-1]
+
+        # Find 52-week low
+        low_52w = min(prices)
+        distance_from_low = ((current_price - low_52w) / low_52w) * 100
+
+        # Calculate recent momentum (3 months)
+        if len(prices) >= 63:
+            price_3m_ago = prices[-63]
+            recent_gain = ((current_price - price_3m_ago) / price_3m_ago) * 100
+        else:
+            recent_gain = 0
+
+        # Calculate monthly velocity
+        monthly_gains = []
+        for months_back in range(1, min(7, len(prices) // 21)):
+            lookback = months_back * 21
+            if lookback < len(prices):
+                old_price = prices[-lookback]
+                if old_price > 0:
+                    gain = ((current_price - old_price) / old_price) * 100
+                    monthly_gains.append(gain / months_back)
+
+        avg_monthly_gain = mean(monthly_gains) if monthly_gains else 0
+
+        # Project forward 6 months
+        potential = avg_monthly_gain * 6
+
+        # Bonus for early stage
+        if distance_from_low < 200:
+            potential *= 1.5
+
+        # Bonus for acceleration
+        if recent_gain > avg_monthly_gain:
+            potential *= 1.2
+
+        # Average with pattern scores
+        avg_pattern = mean(list(pattern_scores.values())) if pattern_scores else 0
+        potential = (potential * 0.7) + (avg_pattern * 0.3)
+
+        return min(500, max(0, potential))
+
+    except Exception as e:
+        print(f"Error calculating potential return: {e}")
+        return 0
+
+
+def analyze_prices(symbol, prices):
+    """Score one stock's daily closes; None if it has too little data or scores too low"""
+    # Missing closes (NaN) are skipped rather than scored
+    prices = [price for price in prices or [] if price == price]
+    if len(prices) < MIN_HISTORY:
+        return None
+
+    # Analyze multiple timeframes (1Y uses whatever history is available)
+    pattern_scores = {}
+    for tf_name, days in TIMEFRAMES.items():
+        if tf_name == '1Y':
+            days = min(days, len(prices))
+        if days <= len(prices):
+            data = prices[-days:]
+            pattern_scores[tf_name] = calculate_exponential_score(data)
+
+    if not pattern_scores:
+        return None
+
+    # Calculate average pattern score
+    avg_pattern = mean(list(pattern_scores.values()))
+
+    # Calculate potential return
+    potential_return = calculate_potential_return(prices, pattern_scores)
+
+    # Final score: 30% pattern quality + 70% return potential
+    final_score = (avg_pattern * 0.3) + (potential_return * 0.7)
+
+    # Only include stocks with decent scores
+    if final_score < MIN_FINAL_SCORE:
+        return None
+
+    return {
+        'symbol': symbol,
+        'pattern_score': round(avg_pattern, 2),
+        'potential_return': round(potential_return, 2),
+        'final_score': round(final_score, 2),
+        'timeframe_scores': {k: round(v, 2) for k, v in pattern_scores.items()},
+        'current_price': round(prices[-1], 2)
+    }
@@ -0,0 +1,155 @@
+"""
+Vectorized (NumPy) version of the momentum scoring in core.momentum.
+
+score_matrix() takes a 2-D array of daily closes (stocks x days, all rows the
+same length) and computes every timeframe's exponential score, the potential
+return and the final score for every row with whole-array operations.
+analyze_batch() groups series of different lengths and returns the same
+result dicts as momentum.analyze_prices, up to float summation order.
+"""
+
+import numpy as np
+
+from core.momentum import MIN_FINAL_SCORE, MIN_HISTORY, TIMEFRAMES
+
+
+def _masked_mean(values, mask):
+    """Row means over masked entries (0 where a row has no entries)"""
+    count = mask.sum(axis=1)
+    total = np.where(mask, values, 0.0).sum(axis=1)
+    return np.divide(total, count, out=np.zeros(len(values)), where=count > 0)
+
+
+def exponential_scores(window):
+    """calculate_exponential_score for every row of a (stocks x n) window"""
+    rows, n = window.shape
+    if n < 20:
+        return np.zeros(rows)
+
+    # 5-bar gains at i = 5, 10, ... measured from i - 5
+    base = window[:, 0:n - 5:5]
+    later = window[:, 5:n:5]
+    valid = base > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gains = np.where(valid, (later - base) / np.where(valid, base, 1.0) * 100, 0.0)
+
+    # Early half = first k // 2 valid gains, late half = the rest
+    count = valid.sum(axis=1)
+    position = np.cumsum(valid, axis=1)
+    mid = count // 2
+    early = valid & (position <= mid[:, None])
+    late = valid & ~early
+
+    acceleration = _masked_mean(gains, late) - _masked_mean(gains, early)
+    positive = (valid & (gains > 0)).sum(axis=1)
+    consistency = np.divide(positive, count, out=np.zeros(rows), where=count > 0) * 100
+
+    recent = window[:, -20:]
+    slope = (recent[:, -1] - recent[:, 0]) / recent.shape[1]
+    slope_score = np.clip(slope * 10, 0, 100)
+
+    score = (consistency * 0.4) + (np.clip(acceleration * 5, 0, 100) * 0.3) + (slope_score * 0.3)
+    score = np.clip(score, 0, 100)
+
+    # Fewer than two gains scores 0, as does anything that went NaN
+    score[count < 2] = 0.0
+    return np.nan_to_num(score, nan=0.0)
+
+
+def potential_returns(closes, avg_pattern):
+    """calculate_potential_return for every row of a (stocks x days) matrix"""
+    rows, days = closes.shape
+    if days < 60:
+        return np.zeros(rows)
+
+    current = closes[:, -1]
+    low = closes.min(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distance_from_low = (current - low) / low * 100
+
+        if days >= 63:
+            price_3m_ago = closes[:, -63]
+            recent_gain = (current - price_3m_ago) / price_3m_ago * 100
+        else:
+            price_3m_ago = np.ones(rows)
+            recent_gain = np.zeros(rows)
+
+        # Monthly velocity over the lookbacks that fit in the history
+        months = np.array([m for m in range(1, min(7, days // 21)) if m * 21 < days], dtype=int)
+        if len(months):
+            old = closes[:, days - months * 21]
+            valid = old > 0
+            velocity = (current[:, None] - old) / np.where(valid, old, 1.0) * 100 / months
+            avg_monthly_gain = _masked_mean(velocity, valid)
+        else:
+            avg_monthly_gain = np.zeros(rows)
+
+    potential = avg_monthly_gain * 6
+    potential = np.where(distance_from_low < 200, potential * 1.5, potential)
+    potential = np.where(recent_gain > avg_monthly_gain, potential * 1.2, potential)
+    potential = (potential * 0.7) + (avg_pattern * 0.3)
+    potential = np.clip(potential, 0, 500)
+
+    # The scalar version returns 0 when it divides by a zero price
+    failed = (low == 0) | (price_3m_ago == 0) | ~np.isfinite(potential)
+    potential[failed] = 0.0
+    return potential
+
+
+def score_matrix(closes):
+    """Score equal-length rows of closes; returns a dict of per-row arrays"""
+    closes = np.asarray(closes, dtype=np.float64)
+    days = closes.shape[1]
+
+    timeframe_scores = {}
+    for tf_name, window in TIMEFRAMES.items():
+        if tf_name == '1Y':
+            window = min(window, days)
+        if window <= days:
+            timeframe_scores[tf_name] = exponential_scores(closes[:, -window:])
+
+    avg_pattern = np.mean(list(timeframe_scores.values()), axis=0)
+    potential = potential_returns(closes, avg_pattern)
+    final = (avg_pattern * 0.3) + (potential * 0.7)
+
+    return {
+        'timeframe_scores': timeframe_scores,
+        'pattern_score': avg_pattern,
+        'potential_return': potential,
+        'final_score': final,
+    }
+
+
+def analyze_batch(closes_by_symbol):
+    """Vectorized momentum.analyze_prices over {symbol: closes}; returns result dicts"""
+    groups = {}
+    series = {}
+    for symbol, prices in closes_by_symbol.items():
+        if prices is None:
+            continue
+        # Missing closes (NaN) are skipped, like momentum.analyze_prices does
+        prices = np.asarray(prices, dtype=np.float64)
+        prices = prices[~np.isnan(prices)]
+        if len(prices) >= MIN_HISTORY:
+            series[symbol] = prices
+            groups.setdefault(len(prices), []).append(symbol)
+
+    results = []
+    for symbols in groups.values():
+        matrix = np.array([series[s] for s in symbols], dtype=np.float64)
+        scores = score_matrix(matrix)
+
+        keep = np.nonzero(scores['final_score'] >= MIN_FINAL_SCORE)[0]
+        for row in keep:
+            results.append({
+                'symbol': symbols[row],
+                'pattern_score': round(float(scores['pattern_score'][row]), 2),
+                'potential_return': round(float(scores['potential_return'][row]), 2),
+                'final_score': round(float(scores['final_score'][row]), 2),
+                'timeframe_scores': {
+                    tf: round(float(values[row]), 2) for tf, values in scores['timeframe_scores'].items()
+                },
+                'current_price': round(float(matrix[row, -1]), 2)
+            })
+    return results
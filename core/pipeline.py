@@ -0,0 +1,279 @@
+"""
+Stock database build pipeline.
+
+Runs fetch -> normalize -> dedupe -> emit over the source modules in
+core/sources. Every source is fetched concurrently and its raw output is
+checkpointed to CHECKPOINT_DIR/<source>.json as soon as it arrives, so a run
+that fails part-way only re-fetches the sources that did not finish. The
+database is written (compact JSON, a columnar .pack and per-exchange shards
+with a manifest, each atomically) only when every source made it. A build
+that changes anything gets the next version number, and its diff against the
+previous build is kept in public/stocks-deltas (core/stock_deltas.py).
+
+Rebuild public/stocks-database.json.gz, public/stocks-database.pack and
+public/stocks/:
+    python3 -m core.pipeline
+    python3 -m core.pipeline --sources tse,hkex --output /tmp/db.json --fresh
+
+Re-emit an existing build through normalize/dedupe without fetching anything:
+    python3 -m core.pipeline --from public/stocks-database.json.gz
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core import sources, stock_deltas, stock_pack, stock_shards
+from core.stock_db import read_database
+
+CHECKPOINT_DIR = os.environ.get('PIPELINE_CHECKPOINT_DIR', os.path.join('data', 'pipeline'))
+DEFAULT_OUTPUT = os.path.join('public', 'stocks-database.json.gz')
+DEFAULT_PACK = os.path.join('public', 'stocks-database.pack')
+DEFAULT_SHARDS = os.path.join('public', 'stocks')
+DEFAULT_DELTAS = stock_deltas.DELTA_DIR
+
+# Checkpoints older than this are fetched again
+MAX_CHECKPOINT_AGE = 24 * 3600
+
+FIELDS = ('symbol', 'name', 'exchange', 'sector', 'industry')
+
+
+def write_atomic(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class Checkpoints:
+    """Raw source output saved per source, reused while younger than max_age"""
+
+    def __init__(self, directory=CHECKPOINT_DIR, max_age=MAX_CHECKPOINT_AGE):
+        self.directory = directory
+        self.max_age = max_age
+
+    def path(self, name):
+        return os.path.join(self.directory, f'{name}.json')
+
+    def load(self, name, now=None):
+        """The checkpointed raw output, or None when missing or too old"""
+        now = now if now is not None else time.time()
+        try:
+            with open(self.path(name), 'rb') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if now - checkpoint.get('fetched_at', 0) > self.max_age:
+            return None
+        return checkpoint['raw']
+
+    def save(self, name, raw):
+        body = json.dumps({'source': name, 'fetched_at': time.time(), 'raw': raw},
+                          separators=(',', ':'))
+        write_atomic(self.path(name), body.encode('utf-8'))
+
+    def clear(self, names):
+        for name in names:
+            try:
+                os.remove(self.path(name))
+            except OSError:
+                pass
+
+
+def fetch_all(names, checkpoints, workers=None):
+    """{source: raw} for every source, fetching concurrently what is not checkpointed
+
+    Returns (raw_by_source, errors_by_source).
+    """
+    raw, errors = {}, {}
+    pending = []
+    for name in names:
+        cached = checkpoints.load(name)
+        if cached is not None:
+            print(f"  ↺ {name}: checkpoint")
+            raw[name] = cached
+        else:
+            pending.append(name)
+
+    if not pending:
+        return raw, errors
+
+    def fetch(name):
+        start = time.time()
+        data = sources.load(name).fetch()
+        checkpoints.save(name, data)
+        return data, time.time() - start
+
+    with ThreadPoolExecutor(max_workers=workers or len(pending)) as executor:
+        futures = {executor.submit(fetch, name): name for name in pending}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                raw[name], elapsed = future.result()
+                print(f"  ✅ {name}: fetched in {elapsed:.1f}s")
+            except Exception as e:
+                errors[name] = e
+                print(f"  ❌ {name}: {e}")
+    return raw, errors
+
+
+def clean_field(value):
+    """Field text; None and NaN (a pandas-read "NA" symbol) become ''"""
+    if value is None or value != value:
+        return ''
+    return str(value).strip()
+
+
+def clean_stocks(records):
+    """Stock dicts with every field cleaned, dropping those without a symbol or exchange"""
+    stocks = []
+    for record in records:
+        stock = {field: clean_field(record.get(field)) for field in FIELDS}
+        if stock['symbol'] and stock['exchange']:
+            stocks.append(stock)
+    return stocks
+
+
+def normalize(name, raw):
+    """Clean stock dicts from one source's raw output"""
+    return clean_stocks(sources.load(name).normalize(raw))
+
+
+def dedupe(groups):
+    """One record per symbol: the first source wins, later ones fill its empty fields"""
+    by_symbol = {}
+    for stocks in groups:
+        for stock in stocks:
+            existing = by_symbol.get(stock['symbol'])
+            if existing is None:
+                by_symbol[stock['symbol']] = stock
+                continue
+            for field in FIELDS:
+                if not existing[field] and stock[field]:
+                    existing[field] = stock[field]
+    return list(by_symbol.values())
+
+
+def emit(stocks, output, version=None):
+    """Write the database (gzip when output ends in .gz); returns bytes written"""
+    data = {'success': True, 'count': len(stocks), 'stocks': stocks}
+    if version is not None:
+        data['version'] = version
+    body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    if output.endswith('.gz'):
+        body = gzip.compress(body, compresslevel=9, mtime=0)
+    write_atomic(output, body)
+    return len(body)
+
+
+def previous_build(paths):
+    """The database the last build wrote (first readable path), or None"""
+    for path in paths:
+        if path and os.path.exists(path):
+            try:
+                return read_database(path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not read previous build {path}: {e}")
+    return None
+
+
+def build(names=None, output=DEFAULT_OUTPUT, checkpoints=None, workers=None, pack=DEFAULT_PACK,
+          shards=DEFAULT_SHARDS, deltas=DEFAULT_DELTAS, source_database=None):
+    """Run every stage; returns the stock list, or None when a source failed
+
+    With source_database, the stocks of that existing build replace the fetch.
+    """
+    names = names or sources.SOURCES
+    checkpoints = checkpoints or Checkpoints()
+    start = time.time()
+
+    if source_database:
+        print(f"📥 Reading {source_database}...")
+        stocks = dedupe([clean_stocks(read_database(source_database).get('stocks', []))])
+    else:
+        print(f"📥 Fetching {len(names)} sources...")
+        raw, errors = fetch_all(names, checkpoints, workers)
+        if errors:
+            print(f"❌ {len(errors)} source(s) failed: {', '.join(sorted(errors))}. "
+                  f"Re-run to resume; finished sources are checkpointed in {checkpoints.directory}")
+            return None
+
+        # Normalize in SOURCES order so dedupe priority does not depend on fetch timing
+        stocks = dedupe(normalize(name, raw[name]) for name in names)
+
+    version, changes = stock_deltas.next_version(previous_build([pack, output]), stocks)
+    if changes is not None and deltas:
+        if stock_deltas.change_count(changes):
+            # Deltas first: a server that sees the new version can always find its diff
+            stock_deltas.write(deltas, version, changes)
+        print(f"🔀 Version {version}: {len(changes['added']):,} added, {len(changes['removed']):,} removed, "
+              f"{len(changes['modified']):,} modified")
+    else:
+        print(f"🔀 Version {version}: no versioned previous build to diff against")
+    if deltas and stock_deltas.load_index(deltas)['version'] != version:
+        # First build of a chain (or a log left by another one): ?since= starts from here
+        stock_deltas.reset(deltas, version)
+
+    size = emit(stocks, output, version)
+    if pack:
+        pack_size = stock_pack.write(stocks, pack, version)
+    if shards:
+        manifest = stock_shards.write(stocks, shards, version)
+
+    exchanges = {}
+    for stock in stocks:
+        exchanges[stock['exchange']] = exchanges.get(stock['exchange'], 0) + 1
+    print("📊 By exchange:")
+    for exchange, count in sorted(exchanges.items(), key=lambda x: -x[1]):
+        print(f"   {exchange:15} {count:>8,}")
+    print(f"💾 {len(stocks):,} stocks -> {output} ({size:,} bytes)")
+    if pack:
+        print(f"💾 {len(stocks):,} stocks -> {pack} ({pack_size:,} bytes)")
+    if shards:
+        largest = max(entry['bytes'] for entry in manifest['shards'])
+        print(f"💾 {len(manifest['shards'])} shards -> {shards} (largest {largest:,} bytes)")
+    print(f"✅ Built in {time.time() - start:.1f}s")
+    return stocks
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python3 -m core.pipeline', description='Build the stock database')
+    parser.add_argument('--sources', default=','.join(sources.SOURCES),
+                        help='comma-separated source modules, in priority order')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='.json or .json.gz file to write')
+    parser.add_argument('--pack', default=DEFAULT_PACK, help="columnar .pack to write ('' to skip)")
+    parser.add_argument('--shards', default=DEFAULT_SHARDS, help="shard directory ('' to skip)")
+    parser.add_argument('--deltas', default=DEFAULT_DELTAS, help="delta directory ('' to skip)")
+    parser.add_argument('--from', dest='source_database', default=None,
+                        help='existing database (.pack or .json[.gz]) to re-emit instead of fetching')
+    parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR)
+    parser.add_argument('--max-age', type=float, default=MAX_CHECKPOINT_AGE,
+                        help='seconds a checkpoint stays reusable')
+    parser.add_argument('--fresh', action='store_true', help='ignore existing checkpoints')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.sources.split(',') if name.strip()]
+    for name in names:
+        try:
+            sources.load(name)
+        except ValueError as e:
+            print(e)
+            return 1
+
+    checkpoints = Checkpoints(args.checkpoint_dir, args.max_age)
+    if args.fresh:
+        checkpoints.clear(names)
+    return 0 if build(names, args.output, checkpoints, args.workers, args.pack,
+                        args.shards, args.deltas, args.source_database) is not None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,111 @@
+"""
+Multi-symbol quote lookups for /api/stocks/prices.
+
+Uncached symbols are fetched in batches of QUOTE_BATCH through the
+lightweight Yahoo client (one quote request per batch, batches in parallel)
+and cached per symbol for QUOTE_TTL seconds. A failing batch only fails its
+own symbols.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from core.cache import BarCache, MemoryBackend
+from core.market_data import fetch_quotes
+from core.registry import get_registry
+from core.singleflight import upstream_flight
+
+QUOTE_TTL = int(os.environ.get('QUOTE_TTL', 60))
+MAX_SYMBOLS = 200
+QUOTE_BATCH = 50
+MAX_WORKERS = 4
+
+# Quotes are tiny; a separate cache keeps them from evicting bar histories
+quote_cache = BarCache(memory=MemoryBackend(max_bytes=16 * 1024 * 1024))
+
+
+def parse_symbols(symbols_param, upper=False):
+    """Split a comma-separated symbols parameter, dropping blanks and duplicates"""
+    symbols = []
+    seen = set()
+    for symbol in symbols_param.split(','):
+        symbol = symbol.strip()
+        if upper:
+            symbol = symbol.upper()
+        if symbol and symbol not in seen:
+            seen.add(symbol)
+            symbols.append(symbol)
+    return symbols[:MAX_SYMBOLS]
+
+
+def quote_from_info(info, currency='USD'):
+    """Reduce a ticker.info or quote-endpoint dict to the fields the price endpoint returns
+
+    Without a live price the previous close is returned, as the endpoint always
+    did. marketCap/volume default to 0, as the endpoint always returned.
+    currency is used when Yahoo leaves it out.
+    """
+    current_price = (info.get('currentPrice') or info.get('regularMarketPrice')
+                     or info.get('previousClose') or info.get('regularMarketPreviousClose'))
+    if not current_price:
+        return {'error': 'Price not available'}
+    return {
+        'price': float(current_price),
+        'currency': info.get('currency') or currency,
+        'marketCap': info.get('marketCap') or 0,
+        'volume': info.get('volume') or info.get('regularMarketVolume') or 0
+    }
+
+
+def fetch_batch(symbols):
+    """Fetch quotes for symbols in one upstream call and cache the good ones"""
+    key = ('quotes',) + tuple(symbol.upper() for symbol in symbols)
+    infos = upstream_flight.do(key, lambda: fetch_quotes(symbols))
+    registry = get_registry()
+
+    quotes = {}
+    for symbol in symbols:
+        info = infos.get(symbol.upper())
+        if info is None:
+            quotes[symbol] = {'error': 'Price not available'}
+            continue
+        quotes[symbol] = quote_from_info(info, registry.currency_of(symbol))
+        if 'error' not in quotes[symbol]:
+            quote_cache.set(symbol, 'quote', 'info', quotes[symbol], ttl=QUOTE_TTL)
+    return quotes
+
+
+def fetch_quote(symbol):
+    """Return the cached quote for symbol, fetching it upstream on a miss"""
+    cached = quote_cache.get(symbol, 'quote', 'info')
+    if cached is not None:
+        return cached
+    return fetch_batch([symbol])[symbol]
+
+
+def get_quotes(symbols, max_workers=MAX_WORKERS):
+    """Return {symbol: quote-or-error} for every requested symbol"""
+    prices = {}
+    missing = []
+    for symbol in symbols:
+        cached = quote_cache.get(symbol, 'quote', 'info')
+        if cached is not None:
+            prices[symbol] = cached
+        else:
+            missing.append(symbol)
+
+    if missing:
+        batches = [missing[i:i + QUOTE_BATCH] for i in range(0, len(missing), QUOTE_BATCH)]
+        workers = max(1, min(max_workers, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(batch, executor.submit(fetch_batch, batch)) for batch in batches]
+            for batch, future in futures:
+                try:
+                    prices.update(future.result())
+                except Exception as e:
+                    print(f"Error fetching {', '.join(batch)}: {str(e)}")
+                    for symbol in batch:
+                        prices[symbol] = {'error': str(e)}
+
+    # Preserve the requested order
+    return {symbol: prices[symbol] for symbol in symbols}
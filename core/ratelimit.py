@@ -0,0 +1,240 @@
+"""
+Shared upstream rate governor.
+
+Every upstream call (API handlers, screener, build/validation scripts) goes
+through rate_governor.call(host, fn). Each host has a token bucket, and so
+does all traffic together. Rates adapt AIMD-style: a 429 or 5xx halves the
+host's rate and pauses it (Retry-After when given); every success adds a
+little back, up to the configured ceiling.
+
+Waiting callers are served strictly by lane, so interactive chart requests
+go ahead of bulk screener fetches, which go ahead of background validation.
+The lane is taken from the caller's context:
+
+    with rate_governor.lane(BULK):
+        get_history(...)
+"""
+
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+
+INTERACTIVE = 0
+BULK = 1
+BACKGROUND = 2
+LANE_NAMES = {INTERACTIVE: 'interactive', BULK: 'bulk', BACKGROUND: 'background'}
+
+# Logical host for everything yfinance talks to (query1/query2.finance.yahoo.com)
+YAHOO = 'yahoo'
+
+GLOBAL_RATE = float(os.environ.get('RATE_LIMIT_GLOBAL', 25))
+
+# host -> (requests per second, burst)
+HOST_LIMITS = {
+    YAHOO: (float(os.environ.get('RATE_LIMIT_YAHOO', 10)), 20),
+    'api.nasdaq.com': (1.0, 1),
+}
+DEFAULT_HOST_LIMIT = (5.0, 5)
+
+MIN_RATE = 0.2
+DECREASE_FACTOR = 0.5
+INCREASE_STEP = 0.05
+BACKOFF_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 120.0
+
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+_lane = contextvars.ContextVar('rate_lane', default=INTERACTIVE)
+
+
+class RateLimited(Exception):
+    """Raised when a caller's wait for a token exceeds its timeout"""
+
+
+def current_lane():
+    return _lane.get()
+
+
+def status_of(value):
+    """HTTP status carried by a response or exception (None if unknown)"""
+    for candidate in (value, getattr(value, 'response', None)):
+        for attr in ('status_code', 'status', 'code'):
+            status = getattr(candidate, attr, None)
+            if isinstance(status, int):
+                return status
+    if isinstance(value, Exception):
+        text = str(value)
+        if '429' in text or 'Too Many Requests' in text or 'Rate limit' in text:
+            return 429
+    return None
+
+
+def retry_after_of(value):
+    """Seconds from a Retry-After header, when the response carries one"""
+    for candidate in (value, getattr(value, 'response', None)):
+        headers = getattr(candidate, 'headers', None)
+        if headers is None:
+            continue
+        try:
+            return float(headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class TokenBucket:
+    """Token bucket whose waiters are served in (lane, arrival) order"""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.granted = 0
+        self.waited = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, lane=INTERACTIVE, timeout=None):
+        """Block until this caller's turn and a token are both available"""
+        with self._cond:
+            start = self.clock()
+            ticket = (lane, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = self.clock()
+                    self._refill(now)
+                    if self._waiters[0] == ticket and self.tokens >= 1 and now >= self.paused_until:
+                        heapq.heappop(self._waiters)
+                        self.tokens -= 1
+                        self.granted += 1
+                        self.waited += now - start
+                        return now - start
+
+                    if self._waiters[0] == ticket:
+                        wait = max(self.paused_until - now, (1 - self.tokens) / self.rate, 0.001)
+                    else:
+                        wait = None  # woken when the head of the queue is served
+                    if timeout is not None:
+                        remaining = start + timeout - now
+                        if remaining <= 0:
+                            raise RateLimited(f'Waited {timeout}s for an upstream slot')
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def success(self):
+        """Additive increase after a successful call"""
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + INCREASE_STEP)
+
+    def throttle(self, retry_after=None):
+        """Multiplicative decrease plus a pause after a 429/5xx"""
+        with self._cond:
+            now = self.clock()
+            self._refill(now)
+            self.throttled += 1
+            self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+            self.tokens = min(self.tokens, 0.0)
+            pause = retry_after if retry_after is not None else BACKOFF_SECONDS * self.max_rate / self.rate
+            self.paused_until = max(self.paused_until, now + min(pause, MAX_BACKOFF_SECONDS))
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'rate': round(self.rate, 3),
+                'max_rate': self.max_rate,
+                'tokens': round(self.tokens, 2),
+                'waiting': len(self._waiters),
+                'granted': self.granted,
+                'throttled': self.throttled,
+                'avg_wait': round(self.waited / self.granted, 4) if self.granted else 0.0,
+                'paused_for': round(max(0.0, self.paused_until - self.clock()), 2),
+            }
+
+
+class RateGovernor:
+    """Per-host token buckets behind one global bucket, with lanes and AIMD"""
+
+    def __init__(self, global_rate=GLOBAL_RATE, host_limits=None, clock=time.monotonic):
+        self.clock = clock
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.global_bucket = TokenBucket(global_rate, max(1, int(global_rate)), clock)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.lane_calls = {lane: 0 for lane in LANE_NAMES}
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_limits.get(host, DEFAULT_HOST_LIMIT)
+                bucket = self._buckets[host] = TokenBucket(rate, burst, self.clock)
+            return bucket
+
+    @contextlib.contextmanager
+    def lane(self, lane):
+        """Run the enclosed upstream calls in a priority lane"""
+        token = _lane.set(lane)
+        try:
+            yield
+        finally:
+            _lane.reset(token)
+
+    def acquire(self, host, lane=None, timeout=None):
+        lane = current_lane() if lane is None else lane
+        with self._lock:
+            self.lane_calls[lane] += 1
+        # Host first, so a paused host never holds global tokens
+        self.bucket(host).acquire(lane, timeout)
+        self.global_bucket.acquire(lane, timeout)
+
+    def report(self, host, outcome):
+        """Feed a response or exception back into the host's rate"""
+        status = status_of(outcome)
+        if status in THROTTLE_STATUSES:
+            self.bucket(host).throttle(retry_after_of(outcome))
+        elif not isinstance(outcome, Exception):
+            self.bucket(host).success()
+
+    def call(self, host, fn, lane=None, timeout=None):
+        """Run fn() once a token is granted, adapting the host rate to the outcome"""
+        self.acquire(host, lane, timeout)
+        try:
+            result = fn()
+        except Exception as e:
+            self.report(host, e)
+            raise
+        self.report(host, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {
+            'global': self.global_bucket.stats(),
+            'hosts': {host: bucket.stats() for host, bucket in buckets.items()},
+            'lanes': {LANE_NAMES[lane]: calls for lane, calls in self.lane_calls.items()},
+        }
+
+
+rate_governor = RateGovernor()
@@ -0,0 +1,195 @@
+"""
+In-process stock metadata registry.
+
+One StockRegistry per loaded stock database (DatabaseSnapshot.registry)
+answers every metadata question the endpoints and scripts have:
+
+- get(symbol): the stock dict, by hash lookup (case-insensitive)
+- rows(exchange=..., sector=...): precomputed index lists in symbol order
+- exchange_of(symbol) / currency_of(symbol): from the database, falling back
+  to the symbol suffix (.JK -> IDX, .HK -> HKEX, ...) for unlisted symbols
+
+Fields are stored as per-field columns in symbol order: symbols and names in
+flat string blobs, exchange/sector/industry as codes into interned
+dictionaries, so the few hundred distinct values exist once however many
+stocks share them.
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+
+from core.columns import StringColumn
+
+# Yahoo symbol suffix -> exchange name used in the stock database
+SUFFIX_EXCHANGES = {
+    '.HK': 'HKEX', '.T': 'TSE', '.SS': 'SSE', '.SZ': 'SZSE', '.BO': 'BSE', '.NS': 'NSE',
+    '.TO': 'TSX', '.KS': 'KRX', '.AX': 'ASX', '.L': 'LSE', '.PA': 'EPA', '.DE': 'FRA',
+    '.TW': 'TWSE', '.KL': 'MYX', '.JK': 'IDX', '.SI': 'SGX', '.BK': 'SET', '.TA': 'TASE',
+    '.MI': 'BIT', '.MC': 'BME', '.SA': 'BVMF', '.JO': 'JSE', '.SW': 'SWX', '.PS': 'PSE',
+    '.MX': 'BMV',
+}
+
+# Quote currency per exchange, as Yahoo reports it (GBp/ZAc/ILA are minor units)
+EXCHANGE_CURRENCIES = {
+    'NASDAQ': 'USD', 'NYSE': 'USD', 'AMEX': 'USD', 'ARCA': 'USD', 'BATS': 'USD', 'CRYPTO': 'USD',
+    'HKEX': 'HKD', 'TSE': 'JPY', 'SSE': 'CNY', 'SZSE': 'CNY', 'BSE': 'INR', 'NSE': 'INR',
+    'TSX': 'CAD', 'KRX': 'KRW', 'ASX': 'AUD', 'LSE': 'GBp', 'EPA': 'EUR', 'FRA': 'EUR',
+    'BIT': 'EUR', 'BME': 'EUR', 'TWSE': 'TWD', 'MYX': 'MYR', 'IDX': 'IDR', 'SGX': 'SGD',
+    'SET': 'THB', 'TASE': 'ILA', 'BVMF': 'BRL', 'JSE': 'ZAc', 'SWX': 'CHF', 'PSE': 'PHP',
+    'BMV': 'MXN',
+}
+
+FIELDS = ('symbol', 'name', 'exchange', 'sector', 'industry')
+
+
+def suffix_exchange(symbol):
+    """Exchange implied by a symbol's form (suffix, ^index, -USD, =F), or ''"""
+    if symbol.startswith('^'):
+        return 'INDEX'
+    if symbol.endswith('-USD'):
+        return 'CRYPTO'
+    if symbol.endswith('=F'):
+        return 'FUTURES'
+    if '.' in symbol:
+        return SUFFIX_EXCHANGES.get('.' + symbol.rsplit('.', 1)[1].upper(), '')
+    return ''
+
+
+def _text(value):
+    # Old builder output has NaN symbols (pandas read "NA" as missing)
+    return value if isinstance(value, str) else ''
+
+
+class StockRegistry:
+    """Immutable metadata for every stock in a database, row i in symbol order
+
+    Built once (in the gunicorn master when preloaded) in a fork-friendly
+    layout: symbols and names are StringColumns, exchange/sector/industry are
+    integer codes into small interned dictionaries, and the symbol lookup is
+    an open-addressing table of row numbers, so no Python object exists per
+    stock and reads never write to pages shared with the master.
+    """
+
+    def __init__(self, stocks):
+        rows = sorted(
+            tuple(_text(stock.get(field)) for field in FIELDS)
+            for stock in stocks
+            if isinstance(stock.get('symbol'), str) and stock.get('symbol')
+        )
+        self.symbols = StringColumn(row[0] for row in rows)
+        self.names = StringColumn(row[1] for row in rows)
+
+        self.dictionaries = {}
+        self.codes = {}
+        for field, column in (('exchange', 2), ('sector', 3), ('industry', 4)):
+            values = sorted({row[column] for row in rows})
+            index = {value: i for i, value in enumerate(values)}
+            self.dictionaries[field] = [sys.intern(value) for value in values]
+            self.codes[field] = array('H', (index[row[column]] for row in rows))
+
+        # Power-of-two table at most half full; slots hold row numbers, -1 when empty
+        size = 1 << max(4, (2 * len(rows)).bit_length())
+        self._mask = size - 1
+        self._slots = array('i', [-1]) * size
+        for i, row in enumerate(rows):
+            key = row[0].upper()
+            slot = hash(key) & self._mask
+            while self._slots[slot] != -1:
+                # First row wins for duplicate symbols, like a scan of the database would
+                if rows[self._slots[slot]][0].upper() == key:
+                    break
+                slot = (slot + 1) & self._mask
+            else:
+                self._slots[slot] = i
+
+        self._by_exchange = self._group('exchange')
+        self._by_sector = self._group('sector')
+        self._all = array('i', range(len(rows)))
+
+    def _group(self, field):
+        """{upper-case value: rows in symbol order}"""
+        groups = {}
+        dictionary = self.dictionaries[field]
+        for i, code in enumerate(self.codes[field]):
+            groups.setdefault(dictionary[code].upper(), array('i')).append(i)
+        return groups
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return self.row(symbol) is not None
+
+    def _find(self, key):
+        slot = hash(key) & self._mask
+        while True:
+            row = self._slots[slot]
+            if row == -1 or self.symbols[row].upper() == key:
+                return row if row != -1 else None
+            slot = (slot + 1) & self._mask
+
+    def row(self, symbol):
+        """Row of symbol, or None
+
+        Yahoo writes US share classes with a dash (BRK-B), the listings with a dot (BRK.B).
+        """
+        key = symbol.upper()
+        row = self._find(key)
+        if row is None and '-' in key:
+            row = self._find(key.replace('-', '.'))
+        return row
+
+    def category(self, field, row):
+        return self.dictionaries[field][self.codes[field][row]]
+
+    def record(self, row):
+        return {
+            'symbol': self.symbols[row],
+            'name': self.names[row],
+            'exchange': self.category('exchange', row),
+            'sector': self.category('sector', row),
+            'industry': self.category('industry', row),
+        }
+
+    def get(self, symbol, default=None):
+        """Stock dict for symbol, or default"""
+        row = self.row(symbol)
+        return self.record(row) if row is not None else default
+
+    def rows(self, exchange='', sector=''):
+        """Rows in symbol order for an exchange and/or sector ('' matches all)"""
+        if exchange and sector:
+            sector_rows = set(self._by_sector.get(sector.upper(), ()))
+            return array('i', (i for i in self._by_exchange.get(exchange.upper(), ()) if i in sector_rows))
+        if exchange:
+            return self._by_exchange.get(exchange.upper(), array('i'))
+        if sector:
+            return self._by_sector.get(sector.upper(), array('i'))
+        return self._all
+
+    def stocks(self, exchange='', sector=''):
+        """Stock dicts in symbol order for an exchange and/or sector"""
+        return [self.record(i) for i in self.rows(exchange, sector)]
+
+    def prefix_range(self, rows, prefix):
+        """[lo, hi) of rows whose symbol starts with prefix"""
+        lo = bisect_left(rows, prefix, key=self.symbols.__getitem__)
+        hi = bisect_left(rows, prefix + '\uffff', lo, key=self.symbols.__getitem__) if prefix else len(rows)
+        return lo, hi
+
+    def exchange_of(self, symbol):
+        """Exchange from the database, else from the symbol's suffix, else ''"""
+        row = self.row(symbol)
+        if row is not None and self.category('exchange', row):
+            return self.category('exchange', row)
+        return suffix_exchange(symbol.upper())
+
+    def currency_of(self, symbol, default='USD'):
+        return EXCHANGE_CURRENCIES.get(self.exchange_of(symbol), default)
+
+
+def get_registry():
+    """Registry of the current stock database (rebuilt when the database file changes)"""
+    from core.stock_db import stock_database
+    return stock_database.snapshot().registry
@@ -0,0 +1,178 @@
+"""
+Multi-timeframe resampling of OHLCV bars.
+
+The finest base series a request needs is fetched once and every requested
+timeframe is derived from it with calendar/session bucketing (open = first, high = max,
+low = min, close = last, volume = sum):
+
+- intraday timeframes (5m ... 4h) bucket from the session open of each day,
+  so 1h bars on a 09:30 open start at 09:30, 10:30, ...
+- 1wk buckets are Monday-based calendar weeks
+- month multiples (1mo, 3mo, 6mo, 12mo, 24mo, 36mo) are calendar aligned
+  (3mo = quarters, 12mo = calendar years)
+
+Bars are labelled with their bucket's start time. Yahoo keeps only weeks of
+fine intraday history, so intraday timeframes come from the coarsest common
+intraday base and daily-and-above from '1d' history.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.serialize import BAR_FIELDS, Bars, frame_to_arrays
+
+DAY = 86400
+
+# Canonical timeframe -> ('intraday', seconds) / ('day', 1) / ('week', 1) / ('month', n)
+TIMEFRAMES = {
+    '1m': ('intraday', 60),
+    '2m': ('intraday', 120),
+    '5m': ('intraday', 300),
+    '15m': ('intraday', 900),
+    '30m': ('intraday', 1800),
+    '1h': ('intraday', 3600),
+    '2h': ('intraday', 7200),
+    '4h': ('intraday', 14400),
+    '1d': ('day', 1),
+    '1wk': ('week', 1),
+    '1mo': ('month', 1),
+    '3mo': ('month', 3),
+    '6mo': ('month', 6),
+    '12mo': ('month', 12),
+    '24mo': ('month', 24),
+    '36mo': ('month', 36),
+}
+
+# Front end labels (TIMEFRAME_CONFIG keys) and yfinance spellings; note 1m != 1M
+ALIASES = {
+    '60m': '1h', '1H': '1h', '4H': '4h', '1D': '1d', '1W': '1wk', '1w': '1wk',
+    '1M': '1mo', '3M': '3mo', '6M': '6mo', '12M': '12mo', '24M': '24mo', '36M': '36mo',
+}
+
+# Yahoo intraday intervals usable as a base, and the period fetched for each
+INTRADAY_BASES = {'1m': '5d', '2m': '1mo', '5m': '1mo', '15m': '1mo', '30m': '1mo', '1h': '2y'}
+DAILY_BASE = ('1d', 'max')
+
+MAX_TIMEFRAMES = 12
+
+
+class UnknownTimeframe(ValueError):
+    pass
+
+
+def normalize(timeframe):
+    """Canonical name for a timeframe, or raise UnknownTimeframe"""
+    name = ALIASES.get(timeframe, timeframe)
+    if name not in TIMEFRAMES:
+        raise UnknownTimeframe(f'Unknown timeframe: {timeframe}')
+    return name
+
+
+def parse_timeframes(param):
+    """Ordered, de-duplicated canonical timeframes from a comma-separated string"""
+    timeframes = []
+    for part in (param or '').split(','):
+        part = part.strip()
+        if part:
+            name = normalize(part)
+            if name not in timeframes:
+                timeframes.append(name)
+    return timeframes[:MAX_TIMEFRAMES]
+
+
+def intraday_base(timeframes):
+    """Coarsest Yahoo intraday interval that evenly divides every intraday timeframe"""
+    widths = [TIMEFRAMES[tf][1] for tf in timeframes if TIMEFRAMES[tf][0] == 'intraday']
+    if not widths:
+        return None
+    candidates = [b for b in INTRADAY_BASES if all(w % TIMEFRAMES[b][1] == 0 for w in widths)]
+    return max(candidates, key=lambda b: TIMEFRAMES[b][1])
+
+
+def plan(timeframes):
+    """{(base_interval, period): [timeframes derived from it]} for a set of timeframes"""
+    base = intraday_base(timeframes)
+    groups = {}
+    for tf in timeframes:
+        if TIMEFRAMES[tf][0] == 'intraday':
+            key = (base, INTRADAY_BASES[base])
+        else:
+            key = DAILY_BASE
+        groups.setdefault(key, []).append(tf)
+    return groups
+
+
+def _local_seconds(index):
+    """Exchange wall-clock epoch seconds for a (possibly tz-aware) DatetimeIndex"""
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_localize(None)
+    return np.asarray(index.values).astype('datetime64[s]').view(np.int64)
+
+
+def bucket_starts(local, timeframe):
+    """Local start time of the bucket each bar falls in"""
+    kind, size = TIMEFRAMES[timeframe]
+    if kind == 'intraday':
+        day = local // DAY * DAY
+        time_of_day = local - day
+        # The session opens at the earliest time of day seen in the series
+        session_open = time_of_day.min() if len(local) else 0
+        return day + session_open + (time_of_day - session_open) // size * size
+    if kind == 'day':
+        return local // DAY * DAY
+    if kind == 'week':
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return ((local // DAY + 3) // 7 * 7 - 3) * DAY
+    months = local.astype('datetime64[s]').astype('datetime64[M]').view(np.int64)
+    start = (months // size * size).astype('datetime64[M]')
+    return start.astype('datetime64[s]').view(np.int64)
+
+
+def resample_arrays(arrays, local, timeframe):
+    """Aggregate bar arrays (sorted by time) into timeframe buckets"""
+    keep = ~np.isnan(arrays['close'])
+    if not keep.all():
+        arrays = {name: values[keep] for name, values in arrays.items()}
+        local = local[keep]
+    if not len(local):
+        return {name: values[:0] for name, values in arrays.items()}
+
+    starts = bucket_starts(local, timeframe)
+    first = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+    last = np.concatenate((first[1:] - 1, [len(starts) - 1]))
+
+    # Label with the bucket start, converted back with the first bar's UTC offset
+    offset = local[first] - arrays['time'][first]
+    return {
+        'time': starts[first] - offset,
+        'open': arrays['open'][first],
+        'high': np.fmax.reduceat(arrays['high'], first),
+        'low': np.fmin.reduceat(arrays['low'], first),
+        'close': arrays['close'][last],
+        'volume': np.add.reduceat(arrays['volume'], first),
+    }
+
+
+def resample(df, timeframe):
+    """Bars for one timeframe derived from a yfinance history DataFrame"""
+    if df.empty:
+        return Bars({name: np.zeros(0, dtype=np.int64 if name in ('time', 'volume') else np.float64)
+                     for name in BAR_FIELDS})
+    arrays = frame_to_arrays(df)
+    local = _local_seconds(df.index)
+    return Bars(resample_arrays(arrays, local, timeframe))
+
+
+def multi_timeframe(symbol, timeframes, get_history):
+    """{timeframe: (base_interval, base_period, Bars)}, one fetch per base series"""
+    groups = plan(timeframes)
+    with ThreadPoolExecutor(max_workers=max(1, len(groups))) as executor:
+        frames = dict(zip(groups, executor.map(lambda key: get_history(symbol, *key), groups)))
+
+    results = {}
+    for (interval, period), derived in groups.items():
+        df = frames[(interval, period)]
+        for tf in derived:
+            results[tf] = (interval, period, resample(df, tf))
+    return results
@@ -0,0 +1,178 @@
+"""
+Momentum screener engine.
+
+Draws a universe from the stock registry (by exchange, sector or an explicit
+symbol list), fetches one year of daily closes per symbol with bounded
+concurrency (through the shared bar cache by default), then scores the whole
+batch and ranks it.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core import momentum
+from core.ratelimit import BULK, rate_governor
+
+# Liquid large caps screened when no universe filter is given (metadata from the registry)
+DEFAULT_SYMBOLS = [
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'BRK-B', 'V', 'JNJ',
+    'WMT', 'JPM', 'MA', 'PG', 'UNH', 'HD', 'DIS', 'BAC', 'ADBE', 'CRM',
+]
+
+DEFAULT_WORKERS = 16
+MAX_UNIVERSE = 5000
+TOP_N = 50
+# Below this many series the scalar scorer is faster than NumPy's setup cost
+# (benchmarks/bench_momentum.py: break-even around 150)
+VECTOR_MIN_BATCH = 200
+# Ad-hoc screens fetch every symbol inside one request; bigger universes use snapshots
+ADHOC_LIMIT = 200
+
+
+def _split(param):
+    return [p.strip() for p in (param or '').split(',') if p.strip()]
+
+
+def select_universe(registry, exchanges=None, sectors=None, symbols=None, limit=MAX_UNIVERSE):
+    """Stock records from a StockRegistry by exchange/sector/symbol list (all case-insensitive)
+
+    limit=None returns every match.
+    """
+    exchanges = {e.upper() for e in exchanges or []}
+    sectors = {s.upper() for s in sectors or []}
+    wanted = [s.upper() for s in symbols or []]
+
+    if not (exchanges or sectors or wanted):
+        wanted = DEFAULT_SYMBOLS
+
+    if wanted:
+        candidates = []
+        for symbol in wanted:
+            # Symbols missing from the database are still screened by name = symbol
+            stock = registry.get(symbol) or {'name': symbol, 'exchange': registry.exchange_of(symbol)}
+            # Keep the requested spelling (BRK-B) for the upstream fetch
+            stock['symbol'] = symbol
+            candidates.append(stock)
+    elif exchanges:
+        rows = sorted(set().union(*(registry.rows(exchange) for exchange in exchanges)))
+        candidates = (registry.record(i) for i in rows)
+    else:
+        candidates = (registry.record(i) for i in registry.rows())
+
+    universe = []
+    for stock in candidates:
+        if exchanges and stock['exchange'].upper() not in exchanges:
+            continue
+        if sectors and stock.get('sector', '').upper() not in sectors:
+            continue
+        universe.append(stock)
+        if limit is not None and len(universe) >= limit:
+            break
+    return universe
+
+
+def parse_int(params, name, default, minimum, maximum):
+    """Integer query parameter clamped to [minimum, maximum]; raises ValueError"""
+    value = params.get(name)
+    if value is None or value == '':
+        value = default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+    return max(minimum, min(value, maximum))
+
+
+def universe_from_params(registry, exchange='', sector='', symbols='', limit=MAX_UNIVERSE):
+    """select_universe for comma-separated query-string values"""
+    return select_universe(registry, _split(exchange), _split(sector), _split(symbols), limit)
+
+
+def fetch_daily_closes(symbol):
+    """One year of daily closes through the shared (cached, coalesced) history path"""
+    from core.market_data import get_history
+
+    # Screens queue behind interactive chart requests for upstream slots
+    with rate_governor.lane(BULK):
+        df = get_history(symbol, '1d', '1y')
+    if df.empty:
+        return None
+    return [float(p) for p in df['Close'].dropna().values]
+
+
+def fetch_universe(universe, fetch=fetch_daily_closes, workers=DEFAULT_WORKERS):
+    """Fetch closes for every symbol concurrently; returns {symbol: closes}"""
+    closes = {}
+
+    def fetch_one(symbol):
+        try:
+            return fetch(symbol)
+        except Exception as e:
+            print(f"Error fetching {symbol}: {e}")
+            return None
+
+    symbols = [stock['symbol'] for stock in universe]
+    if not symbols:
+        return closes
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(symbols)))) as executor:
+        for symbol, prices in zip(symbols, executor.map(fetch_one, symbols)):
+            if prices:
+                closes[symbol] = prices
+    return closes
+
+
+def score_batch(closes):
+    """Score every fetched series; returns unranked result dicts"""
+    if len(closes) >= VECTOR_MIN_BATCH:
+        # Imported here so small screens (the serverless handler) never load NumPy
+        try:
+            from core import momentum_np
+        except ImportError:  # NumPy is optional; the pure Python scorer is always available
+            momentum_np = None
+        if momentum_np is not None:
+            return momentum_np.analyze_batch(closes)
+
+    results = []
+    for symbol, prices in closes.items():
+        try:
+            score = momentum.analyze_prices(symbol, prices)
+        except Exception as e:
+            print(f"Error analyzing {symbol}: {e}")
+            continue
+        if score:
+            results.append(score)
+    return results
+
+
+def rank(results, top=TOP_N):
+    """Sort by final score and attach 1-based ranks"""
+    results.sort(key=lambda x: x['final_score'], reverse=True)
+    ranked = results[:top] if top else results
+    for i, stock in enumerate(ranked):
+        stock['rank'] = i + 1
+    return ranked
+
+
+def run_screener(universe, fetch=fetch_daily_closes, workers=DEFAULT_WORKERS, top=TOP_N):
+    """Fetch, score and rank a universe of stock records"""
+    start = time.time()
+    print(f"Analyzing {len(universe)} stocks with {workers} workers...")
+
+    closes = fetch_universe(universe, fetch=fetch, workers=workers)
+    results = score_batch(closes)
+
+    info = {stock['symbol']: stock for stock in universe}
+    for result in results:
+        stock = info.get(result['symbol'], {})
+        result['name'] = stock.get('name', result['symbol'])
+        result['exchange'] = stock.get('exchange', '')
+
+    ranked = rank(results, top)
+    return {
+        'stocks': ranked,
+        'count': len(ranked),
+        'analyzed': len(universe),
+        'fetched': len(closes),
+        'elapsed': round(time.time() - start, 2)
+    }
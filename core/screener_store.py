@@ -0,0 +1,285 @@
+"""
+Precomputed momentum screener snapshots.
+
+Each scheduled universe is screened by a background job after its exchange's
+daily close and the full ranking is written (atomically) to
+SCREENER_STORE_DIR/<universe>.json with a generated-at timestamp.
+/api/screener/momentum serves the latest snapshot instantly, paginated.
+
+Only the 20-stock 'default' universe is scheduled unless SCREENER_UNIVERSES
+lists more: a whole exchange costs thousands of Yahoo requests per refresh.
+SCREENER_SCHEDULER=0 turns the background job off.
+
+Run one refresh by hand (e.g. from cron):
+    python3 -m core.screener_store nasdaq nyse
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from core import screener
+
+STORE_DIR = os.environ.get('SCREENER_STORE_DIR', os.path.join('data', 'screener'))
+
+# Universes the scheduler refreshes unless SCREENER_UNIVERSES says otherwise
+DEFAULT_SCHEDULED = 'default'
+
+# Named universes and the local time after which each exchange's bars are final
+UNIVERSES = {
+    'default': {'exchanges': [], 'timezone': 'America/New_York', 'close': (16, 30), 'weekdays': True},
+    'nasdaq': {'exchanges': ['NASDAQ'], 'timezone': 'America/New_York', 'close': (16, 30), 'weekdays': True},
+    'nyse': {'exchanges': ['NYSE'], 'timezone': 'America/New_York', 'close': (16, 30), 'weekdays': True},
+    'idx': {'exchanges': ['IDX'], 'timezone': 'Asia/Jakarta', 'close': (16, 30), 'weekdays': True},
+    'crypto': {'exchanges': ['CRYPTO'], 'timezone': 'UTC', 'close': (0, 15), 'weekdays': False},
+}
+
+CHECK_INTERVAL = 60
+RETRY_AFTER = 15 * 60
+MAX_PAGE = 500
+
+# This process's scheduler (start_scheduler); None when another process runs it
+scheduler = None
+
+
+def last_close(universe, now=None):
+    """Epoch seconds of the most recent scheduled close for a universe"""
+    config = UNIVERSES[universe]
+    tz = ZoneInfo(config['timezone'])
+    local = datetime.fromtimestamp(now if now is not None else time.time(), tz)
+    hour, minute = config['close']
+
+    close = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if close > local:
+        close -= timedelta(days=1)
+    if config['weekdays']:
+        while close.weekday() >= 5:
+            close -= timedelta(days=1)
+    return close.timestamp()
+
+
+def snapshot_path(universe, store_dir=None):
+    return os.path.join(store_dir or STORE_DIR, f"{universe}.json")
+
+
+def load_snapshot(universe, store_dir=None):
+    """Latest stored snapshot for a universe, or None"""
+    try:
+        with open(snapshot_path(universe, store_dir), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_snapshot(universe, result, store_dir=None):
+    """Atomically write a screener result as the universe's latest snapshot"""
+    path = snapshot_path(universe, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    snapshot = {
+        'universe': universe,
+        'generated_at': time.time(),
+        'analyzed': result['analyzed'],
+        'fetched': result['fetched'],
+        'elapsed': result['elapsed'],
+        'stocks': result['stocks'],
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return snapshot
+
+
+def scheduled_universes():
+    """Universes a ScreenerScheduler keeps fresh (none when SCREENER_SCHEDULER=0)"""
+    if os.environ.get('SCREENER_SCHEDULER', '1') == '0':
+        return []
+    configured = os.environ.get('SCREENER_UNIVERSES', DEFAULT_SCHEDULED).split(',')
+    return [u.strip() for u in configured if u.strip() in UNIVERSES]
+
+
+def universe_stocks(universe):
+    """Stock records making up a named universe (the whole exchange, uncapped)"""
+    from core.registry import get_registry
+
+    return screener.select_universe(get_registry(), exchanges=UNIVERSES[universe]['exchanges'], limit=None)
+
+
+def refresh(universe, store_dir=None):
+    """Screen a named universe now and store the full ranking"""
+    result = screener.run_screener(universe_stocks(universe), top=None)
+    snapshot = save_snapshot(universe, result, store_dir)
+    print(f"Screener snapshot '{universe}': {len(snapshot['stocks'])} ranked "
+          f"of {snapshot['analyzed']} in {snapshot['elapsed']}s")
+    return snapshot
+
+
+def is_stale(snapshot, universe, now=None):
+    return snapshot is None or snapshot['generated_at'] < last_close(universe, now)
+
+
+def page(snapshot, universe, limit, offset, now=None):
+    """API response body for one page of a stored snapshot"""
+    now = now if now is not None else time.time()
+    stocks = snapshot['stocks']
+    window = stocks[offset:offset + limit]
+    return {
+        'success': True,
+        'universe': universe,
+        'stocks': window,
+        'count': len(window),
+        'total': len(stocks),
+        'offset': offset,
+        'limit': limit,
+        'analyzed': snapshot['analyzed'],
+        'generated_at': datetime.fromtimestamp(snapshot['generated_at']).astimezone().isoformat(),
+        'age_seconds': round(now - snapshot['generated_at'], 1),
+        'stale': is_stale(snapshot, universe, now),
+    }
+
+
+class ScreenerScheduler:
+    """Daemon thread that refreshes each universe once after every close"""
+
+    def __init__(self, universes=None, store_dir=None, interval=CHECK_INTERVAL):
+        self.universes = list(universes or UNIVERSES)
+        self.store_dir = store_dir
+        self.interval = interval
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._requested = set()
+        self._failed_at = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='screener-scheduler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def request(self, universe):
+        """Ask for an out-of-schedule refresh (e.g. no snapshot exists yet)"""
+        with self._lock:
+            self._requested.add(universe)
+        self._wake.set()
+
+    def _due(self):
+        with self._lock:
+            requested = set(self._requested)
+            self._requested.clear()
+
+        now = time.time()
+        due = []
+        extra = sorted(u for u in requested if u not in self.universes)
+        for universe in self.universes + extra:
+            if universe in requested:
+                due.append(universe)
+            elif now - self._failed_at.get(universe, 0) < RETRY_AFTER:
+                continue
+            elif is_stale(load_snapshot(universe, self.store_dir), universe, now):
+                due.append(universe)
+        return due
+
+    def _run(self):
+        while not self._stop.is_set():
+            # One universe at a time keeps upstream load bounded
+            for universe in self._due():
+                if self._stop.is_set():
+                    break
+                try:
+                    refresh(universe, self.store_dir)
+                    self._failed_at.pop(universe, None)
+                except Exception as e:
+                    self._failed_at[universe] = time.time()
+                    print(f"Screener refresh '{universe}' failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+def start_scheduler():
+    """Start this process's ScreenerScheduler for scheduled_universes() (once); returns it or None"""
+    global scheduler
+    universes = scheduled_universes()
+    if scheduler is None and universes:
+        scheduler = ScreenerScheduler(universes).start()
+    return scheduler
+
+
+def stop_scheduler():
+    if scheduler is not None:
+        scheduler.stop()
+
+
+def screen(params):
+    """(status, payload, headers) of /api/screener/momentum; raises ValueError on bad paging"""
+    exchange = params.get('exchange', '')
+    sector = params.get('sector', '')
+    symbols = params.get('symbols', '')
+
+    # Ad-hoc universes are screened live
+    if exchange or sector or symbols:
+        from core.registry import get_registry
+
+        limit = screener.parse_int(params, 'limit', screener.ADHOC_LIMIT, 1, screener.ADHOC_LIMIT)
+        universe = screener.universe_from_params(get_registry(), exchange, sector, symbols, limit)
+        return 200, dict(screener.run_screener(universe), success=True), None
+
+    # Named universes are served from the precomputed snapshot
+    universe = params.get('universe', 'default')
+    if universe not in UNIVERSES:
+        return 400, {
+            'success': False,
+            'error': f'Unknown universe: {universe}',
+            'universes': list(UNIVERSES)
+        }, None
+
+    limit = screener.parse_int(params, 'limit', screener.TOP_N, 1, MAX_PAGE)
+    offset = screener.parse_int(params, 'offset', 0, 0, sys.maxsize)
+
+    snapshot = load_snapshot(universe)
+    if snapshot is None and universe == 'default':
+        # Small enough to build inside the request
+        snapshot = refresh(universe)
+    if snapshot is None and universe not in scheduled_universes():
+        return 404, {
+            'success': False,
+            'universe': universe,
+            'error': f"No snapshot for '{universe}' and no screener scheduler builds it "
+                     f"(add it to SCREENER_UNIVERSES or run: python3 -m core.screener_store {universe})"
+        }, None
+    if snapshot is None:
+        # The scheduler (in this or another worker) builds missing snapshots on its next check
+        if scheduler is not None:
+            scheduler.request(universe)
+        return 503, {
+            'success': False,
+            'pending': True,
+            'universe': universe,
+            'error': 'Screener snapshot is being generated, retry shortly'
+        }, {'Retry-After': '60'}
+
+    return 200, page(snapshot, universe, limit, offset), None
+
+
+def main(argv):
+    universes = argv or list(UNIVERSES)
+    for universe in universes:
+        if universe not in UNIVERSES:
+            print(f"Unknown universe: {universe} (choose from {', '.join(UNIVERSES)})")
+            return 1
+        refresh(universe)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,189 @@
+"""
+Server-side symbol search over the stock database.
+
+Reproduces the relevance tiers of searchStocks() in public/index.html:
+
+    exact symbol (or symbol + '.JK')   10000
+    symbol starts with query            1000
+    symbol contains query                500
+    name starts with query               100
+    name contains query                   50
+    sector or industry contains query     10
+
+Ties are broken alphabetically by symbol. Tiers are resolved best-first and
+the search stops as soon as `limit` results are collected, so a query only
+touches the candidates it can return:
+
+- symbol/name prefixes come from sorted arrays via binary search
+- symbol/name substrings come from trigram posting lists (verified with `in`)
+- sector/industry match against the few hundred distinct values
+"""
+
+from array import array
+from bisect import bisect_left
+
+from core.columns import StringColumn
+
+SCORE_EXACT = 10000
+SCORE_SYMBOL_PREFIX = 1000
+SCORE_SYMBOL_CONTAINS = 500
+SCORE_NAME_PREFIX = 100
+SCORE_NAME_CONTAINS = 50
+SCORE_SECTOR_INDUSTRY = 10
+
+DEFAULT_LIMIT = 30
+MAX_LIMIT = 200
+
+
+def _text(value):
+    # Builder output has stray NaN symbols (pandas read "NA" as missing)
+    return value if isinstance(value, str) else ''
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _prefix_range(sorted_keys, prefix):
+    """[lo, hi) slice of sorted_keys whose entries start with prefix"""
+    lo = bisect_left(sorted_keys, prefix)
+    hi = bisect_left(sorted_keys, prefix + '\uffff', lo)
+    return lo, hi
+
+
+class SearchIndex:
+    """Immutable search index over a list of stock records
+
+    Records are renumbered in symbol order, so every posting list and id
+    scan is already in tie-break order and can stop at the first `limit` hits.
+    Only positions into `stocks` are kept; results are read from it on demand,
+    so a lazily decoded sequence (a stock pack) is never materialized. Strings
+    live in StringColumns, so the index can be shared by forked workers.
+    """
+
+    def __init__(self, stocks):
+        self.source = stocks
+        # One pass over the records: (symbol, position, name, sector, industry)
+        rows = []
+        for i, s in enumerate(stocks):
+            symbol = _text(s.get('symbol'))
+            if symbol:
+                rows.append((symbol, i, _text(s.get('name')), _text(s.get('sector')), _text(s.get('industry'))))
+        rows.sort()
+        self.positions = array('i', (row[1] for row in rows))
+
+        symbols_upper = [row[0].upper() for row in rows]
+        names_upper = [row[2].upper() for row in rows]
+
+        by_symbol = sorted(range(len(rows)), key=symbols_upper.__getitem__)
+        self.symbol_keys = StringColumn(symbols_upper[i] for i in by_symbol)
+        self.symbol_ids = array('i', by_symbol)
+
+        by_name = sorted(range(len(rows)), key=names_upper.__getitem__)
+        self.name_keys = StringColumn(names_upper[i] for i in by_name)
+        self.name_ids = array('i', by_name)
+
+        self.symbol_grams = self._build_trigrams(symbols_upper)
+        self.name_grams = self._build_trigrams(names_upper)
+        self.symbols_upper = StringColumn(symbols_upper)
+        self.names_upper = StringColumn(names_upper)
+
+        # Distinct sector/industry strings -> record ids
+        self.categories = {}
+        for i, row in enumerate(rows):
+            for value in (row[3].upper(), row[4].upper()):
+                if value:
+                    self.categories.setdefault(value, array('i')).append(i)
+
+    @staticmethod
+    def _build_trigrams(values):
+        postings = {}
+        for i, text in enumerate(values):
+            for gram in _trigrams(text):
+                bucket = postings.get(gram)
+                if bucket is None:
+                    postings[gram] = bucket = array('i')
+                bucket.append(i)
+        return postings
+
+    def _contains(self, query, values, postings):
+        """Ids (ascending) whose value contains query, trigram-filtered when possible"""
+        if len(query) < 3:
+            return values.find(query)
+
+        smallest = None
+        for gram in _trigrams(query):
+            bucket = postings.get(gram)
+            if bucket is None:
+                return ()
+            if smallest is None or len(bucket) < len(smallest):
+                smallest = bucket
+        return (i for i in smallest if query in values[i])
+
+    def _exact(self, query):
+        ids = []
+        for key in (query, query + '.JK'):
+            lo, hi = _prefix_range(self.symbol_keys, key)
+            ids.extend(self.symbol_ids[j] for j in range(lo, hi) if self.symbol_keys[j] == key)
+        return sorted(ids)
+
+    def _symbol_prefix(self, query):
+        lo, hi = _prefix_range(self.symbol_keys, query)
+        return sorted(self.symbol_ids[lo:hi])
+
+    def _name_prefix(self, query):
+        lo, hi = _prefix_range(self.name_keys, query)
+        return sorted(self.name_ids[lo:hi])
+
+    def _sector_industry(self, query):
+        ids = set()
+        for value, members in self.categories.items():
+            if query in value:
+                ids.update(members)
+        return sorted(ids)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Return [(score, stock), ...] best first, at most limit entries"""
+        query = (query or '').upper()
+        if not query or limit <= 0:
+            return []
+
+        tiers = (
+            (SCORE_EXACT, self._exact),
+            (SCORE_SYMBOL_PREFIX, self._symbol_prefix),
+            (SCORE_SYMBOL_CONTAINS, lambda q: self._contains(q, self.symbols_upper, self.symbol_grams)),
+            (SCORE_NAME_PREFIX, self._name_prefix),
+            (SCORE_NAME_CONTAINS, lambda q: self._contains(q, self.names_upper, self.name_grams)),
+            (SCORE_SECTOR_INDUSTRY, self._sector_industry),
+        )
+
+        results = []
+        seen = set()
+        for score, candidates in tiers:
+            # Each tier yields ids in symbol order; a record keeps its best tier
+            for i in candidates(query):
+                if i in seen:
+                    continue
+                seen.add(i)
+                results.append((score, self.source[self.positions[i]]))
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+def search_response(index, params):
+    """(status, payload) of /api/stocks/search for ?q= and ?limit="""
+    query = (params.get('q') or '').strip()
+    try:
+        limit = int(params.get('limit') or DEFAULT_LIMIT)
+    except ValueError:
+        return 400, {'error': True, 'message': 'limit must be an integer'}
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    results = index.search(query, limit)
+    return 200, {
+        'success': True,
+        'query': query,
+        'stocks': [dict(stock, score=score) for score, stock in results],
+        'count': len(results)
+    }
@@ -0,0 +1,260 @@
+"""
+Bar serialization for the /api/stock/<symbol> responses.
+
+Converts a yfinance history DataFrame to column arrays in bulk (no iterrows),
+or wraps the plain column lists from core.yahoo, and writes the response
+straight from those columns. NumPy is only imported by the paths that need
+it (DataFrames, binary output), so list-backed Bars serialize to JSON without
+it. Three formats:
+
+- json (default): byte-identical to json.dumps / Flask's jsonify over the old
+  list of {'time', 'open', 'high', 'low', 'close', 'volume'} dicts
+- columnar: struct-of-arrays {t:[], o:[], h:[], l:[], c:[], v:[]}
+- binary: little-endian packed buffer (BINARY_CONTENT_TYPE)
+
+Binary layout: a 16-byte header followed by six arrays of `count` values:
+
+    magic      4s   b'OHLC'
+    version    u16  1
+    price_size u16  4 (float32 prices) or 8 (float64 prices)
+    count      u64  number of bars
+    time       int64[count]   epoch seconds
+    open, high, low, close    float32/float64[count]
+    volume     int64[count]
+"""
+
+import json
+import math
+import struct
+
+BINARY_CONTENT_TYPE = 'application/x-ohlcv'
+BINARY_MAGIC = b'OHLC'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sHHQ')
+
+RESPONSE_FORMATS = ('json', 'columnar', 'binary')
+COLUMNAR_KEYS = (('t', 'time'), ('o', 'open'), ('h', 'high'),
+                 ('l', 'low'), ('c', 'close'), ('v', 'volume'))
+
+BAR_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+FLOAT_FIELDS = ('open', 'high', 'low', 'close')
+INT_FIELDS = ('time', 'volume')
+
+
+def _index_to_epoch_seconds(index):
+    """int(ts.timestamp()) for every entry of a DatetimeIndex, in one pass"""
+    import numpy as np
+
+    # .values is UTC for tz-aware indexes; force ns since newer pandas may use us
+    ns = np.asarray(index.values).astype('datetime64[ns]').view(np.int64)
+    seconds = ns // 1_000_000_000
+    # int() truncates toward zero; floor division rounds pre-1970 values down
+    seconds[(ns < 0) & (ns % 1_000_000_000 != 0)] += 1
+    return seconds
+
+
+def frame_to_arrays(df):
+    """Return {'time': int64[], 'open': float64[], ...} NumPy columns"""
+    import numpy as np
+
+    # iterrows upcast every row to float64, so volume went float -> int
+    if 'Volume' in df.columns:
+        volume = df['Volume'].to_numpy(dtype=np.float64).astype(np.int64)
+    else:
+        volume = np.zeros(len(df), dtype=np.int64)
+
+    return {
+        'time': _index_to_epoch_seconds(df.index),
+        'open': df['Open'].to_numpy(dtype=np.float64),
+        'high': df['High'].to_numpy(dtype=np.float64),
+        'low': df['Low'].to_numpy(dtype=np.float64),
+        'close': df['Close'].to_numpy(dtype=np.float64),
+        'volume': volume,
+    }
+
+
+def frame_to_columns(df):
+    """Return {'time': [...], 'open': [...], ...} as plain Python lists"""
+    return {name: values.tolist() for name, values in frame_to_arrays(df).items()}
+
+
+def _float_text(value):
+    # Same spelling as the json module, including non-finite values
+    if value != value:
+        return 'NaN'
+    if value == math.inf:
+        return 'Infinity'
+    if value == -math.inf:
+        return '-Infinity'
+    return repr(value)
+
+
+class Bars:
+    """Column-oriented bar series that encodes itself as a JSON array of bar objects"""
+
+    __slots__ = ('_arrays', '_columns')
+
+    def __init__(self, arrays=None, columns=None):
+        self._arrays = arrays
+        self._columns = columns
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(frame_to_arrays(df))
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Bars over plain lists ({'time': [...], ...}, e.g. yahoo.chart output)"""
+        return cls(columns=columns)
+
+    @property
+    def arrays(self):
+        """The columns as NumPy arrays (built once, on first use)"""
+        if self._arrays is None:
+            import numpy as np
+
+            self._arrays = {
+                name: np.asarray(values, dtype=np.int64 if name in INT_FIELDS else np.float64)
+                for name, values in self._columns.items()
+            }
+        return self._arrays
+
+    @property
+    def columns(self):
+        """The arrays as plain Python lists (built once, on first use)"""
+        if self._columns is None:
+            self._columns = {name: values.tolist() for name, values in self._arrays.items()}
+        return self._columns
+
+    @property
+    def nbytes(self):
+        """Approximate memory footprint, for cache budgeting"""
+        return len(self) * 8 * len(BAR_FIELDS)
+
+    def __len__(self):
+        if self._arrays is None:
+            return len(self._columns['time'])
+        return len(self._arrays['time'])
+
+    def _all_finite(self, name):
+        if self._arrays is None:
+            return all(map(math.isfinite, self._columns[name]))
+        import numpy as np
+
+        return bool(np.isfinite(self._arrays[name]).all())
+
+    def records(self):
+        """List of bar dicts (the old iterrows output)"""
+        cols = self.columns
+        return [
+            {'time': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for t, o, h, l, c, v in zip(cols['time'], cols['open'], cols['high'],
+                                        cols['low'], cols['close'], cols['volume'])
+        ]
+
+    def to_json(self, sort_keys=False, separators=(', ', ': ')):
+        """JSON array text for the bars, matching json.dumps(self.records(), ...)"""
+        if not len(self):
+            return '[]'
+
+        item_sep, key_sep = separators
+        fields = sorted(BAR_FIELDS) if sort_keys else BAR_FIELDS
+        template = '{' + item_sep.join(
+            f'"{name}"{key_sep}' + ('%d' if name in INT_FIELDS else '%s') for name in fields
+        ) + '}'
+
+        cols = self.columns
+        float_cols = {}
+        for name in FLOAT_FIELDS:
+            values = cols[name]
+            if self._all_finite(name):
+                float_cols[name] = map(repr, values)
+            else:
+                float_cols[name] = map(_float_text, values)
+
+        ordered = [cols[name] if name in INT_FIELDS else float_cols[name] for name in fields]
+        return '[' + item_sep.join([template % row for row in zip(*ordered)]) + ']'
+
+    def to_columnar(self):
+        """Struct-of-arrays form: {'t': [...], 'o': [...], ..., 'v': [...]}"""
+        cols = self.columns
+        return {short: cols[name] for short, name in COLUMNAR_KEYS}
+
+    def to_binary(self, float32=False):
+        """Packed little-endian buffer (see module docstring for the layout)"""
+        import numpy as np
+
+        price_dtype = np.dtype('<f4') if float32 else np.dtype('<f8')
+        arrays = self.arrays
+        parts = [
+            BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, price_dtype.itemsize, len(self)),
+            arrays['time'].astype('<i8', copy=False).tobytes(),
+        ]
+        for name in FLOAT_FIELDS:
+            parts.append(arrays[name].astype(price_dtype, copy=False).tobytes())
+        parts.append(arrays['volume'].astype('<i8', copy=False).tobytes())
+        return b''.join(parts)
+
+
+def decode_binary(buffer):
+    """Inverse of Bars.to_binary, returning {'time': array, ...}"""
+    import numpy as np
+
+    magic, version, price_size, count = BINARY_HEADER.unpack_from(buffer, 0)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError('Not an OHLC binary buffer')
+
+    price_dtype = np.dtype('<f4') if price_size == 4 else np.dtype('<f8')
+    offset = BINARY_HEADER.size
+    arrays = {}
+    for name in BAR_FIELDS:
+        dtype = np.dtype('<i8') if name in INT_FIELDS else price_dtype
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        offset += dtype.itemsize * count
+    return arrays
+
+
+def dumps(payload, sort_keys=False, separators=(', ', ': '), ensure_ascii=True):
+    """json.dumps for a response dict whose values (or nested dicts' values) may be Bars"""
+    item_sep, key_sep = separators
+    items = sorted(payload.items()) if sort_keys else payload.items()
+    parts = []
+    for key, value in items:
+        if isinstance(value, Bars):
+            text = value.to_json(sort_keys=sort_keys, separators=separators)
+        elif isinstance(value, dict):
+            text = dumps(value, sort_keys=sort_keys, separators=separators, ensure_ascii=ensure_ascii)
+        else:
+            text = json.dumps(value, sort_keys=sort_keys, separators=separators,
+                              ensure_ascii=ensure_ascii)
+        parts.append(json.dumps(key, ensure_ascii=ensure_ascii) + key_sep + text)
+    return '{' + item_sep.join(parts) + '}'
+
+
+def materialize(payload):
+    """Copy of payload with Bars (also in nested dicts) expanded to lists of dicts"""
+    expanded = {}
+    for key, value in payload.items():
+        if isinstance(value, Bars):
+            value = value.records()
+        elif isinstance(value, dict):
+            value = materialize(value)
+        expanded[key] = value
+    return expanded
+
+
+def flask_json_response(app, payload, status=200):
+    """Equivalent of jsonify(payload) that serializes Bars without building dicts"""
+    provider = app.json
+    compact = getattr(provider, 'compact', None)
+    if compact is False or (compact is None and app.debug):
+        # Pretty-printed debug output: let Flask format the expanded records
+        return app.json.response(materialize(payload)), status
+
+    body = dumps(
+        payload,
+        sort_keys=getattr(provider, 'sort_keys', True),
+        separators=(',', ':'),
+        ensure_ascii=getattr(provider, 'ensure_ascii', True),
+    )
+    return app.response_class(f"{body}\n", mimetype=provider.mimetype), status
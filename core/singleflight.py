@@ -0,0 +1,63 @@
+"""
+Request coalescing for upstream fetches.
+
+When several threads ask for the same key at once, only the first one runs
+the fetch; the rest wait on its future and receive the same result (or the
+same exception).
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key"""
+
+    def __init__(self):
+        self.calls = 0
+        self.saved = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run fn() once per key among concurrent callers and return its result"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.saved += 1
+                leader = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def inflight(self):
+        with self._lock:
+            return len(self._inflight)
+
+    def stats(self):
+        return {
+            'upstream_calls': self.calls,
+            'calls_saved': self.saved,
+            'inflight': self.inflight(),
+        }
+
+
+# Shared by every request thread in the process
+upstream_flight = SingleFlight()
@@ -0,0 +1,34 @@
+"""
+Stock database sources for the build pipeline (core/pipeline.py).
+
+Each source is a module in this package exposing:
+
+    fetch()         -> raw, JSON-serializable output (checkpointed as-is)
+    normalize(raw)  -> iterable of stock dicts
+                       (symbol, name, exchange, sector, industry)
+
+SOURCES lists the modules in priority order: when two sources emit the same
+symbol the earlier one wins and the later one only fills in its empty
+fields. Add an exchange by dropping a module here and listing it.
+"""
+
+import importlib
+
+SOURCES = [
+    'nasdaqtrader',
+    'nasdaq_screener',
+    'idx',
+    'tse',
+    'hkex',
+    'china',
+    'india',
+    'international',
+    'crypto',
+]
+
+
+def load(name):
+    """Import a source module by name"""
+    if name not in SOURCES:
+        raise ValueError(f"Unknown source: {name} (choose from {', '.join(SOURCES)})")
+    return importlib.import_module(f'core.sources.{name}')
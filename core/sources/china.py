@@ -0,0 +1,15 @@
+"""Shanghai (SSE) and Shenzhen (SZSE, including ChiNext) code ranges"""
+
+
+def fetch():
+    stocks = [{'symbol': f'{code}.SS', 'name': f'China SSE {code}', 'exchange': 'SSE'}
+              for code in range(600000, 605000)]
+    stocks += [{'symbol': f'{code:06d}.SZ', 'name': f'China SZSE {code:06d}', 'exchange': 'SZSE'}
+               for code in range(1, 3000)]
+    stocks += [{'symbol': f'{code}.SZ', 'name': f'China ChiNext {code}', 'exchange': 'SZSE'}
+               for code in range(300001, 301000)]
+    return stocks
+
+
+def normalize(raw):
+    return raw
@@ -0,0 +1,47 @@
+"""Cryptocurrencies, major global indices and commodity futures"""
+
+CRYPTO = [
+    ('BTC-USD', 'Bitcoin'), ('ETH-USD', 'Ethereum'), ('USDT-USD', 'Tether'),
+    ('BNB-USD', 'Binance Coin'), ('XRP-USD', 'Ripple'), ('ADA-USD', 'Cardano'),
+    ('DOGE-USD', 'Dogecoin'), ('SOL-USD', 'Solana'), ('TRX-USD', 'TRON'),
+    ('DOT-USD', 'Polkadot'), ('MATIC-USD', 'Polygon'), ('LTC-USD', 'Litecoin'),
+    ('SHIB-USD', 'Shiba Inu'), ('AVAX-USD', 'Avalanche'), ('UNI-USD', 'Uniswap'),
+    ('LINK-USD', 'Chainlink'), ('ATOM-USD', 'Cosmos'), ('XLM-USD', 'Stellar'),
+    ('ETC-USD', 'Ethereum Classic'), ('FIL-USD', 'Filecoin'), ('NEAR-USD', 'NEAR Protocol'),
+    ('APT-USD', 'Aptos'), ('ARB-USD', 'Arbitrum'), ('OP-USD', 'Optimism'),
+    ('AAVE-USD', 'Aave'), ('CRV-USD', 'Curve'), ('SNX-USD', 'Synthetix'),
+]
+
+INDICES = [
+    ('^GSPC', 'S&P 500'), ('^DJI', 'Dow Jones'), ('^IXIC', 'NASDAQ Composite'),
+    ('^RUT', 'Russell 2000'), ('^FTSE', 'FTSE 100'), ('^GDAXI', 'DAX'),
+    ('^FCHI', 'CAC 40'), ('^N225', 'Nikkei 225'), ('^HSI', 'Hang Seng'),
+    ('^JKSE', 'Jakarta Composite'), ('^STI', 'Straits Times'), ('^AXJO', 'ASX 200'),
+    ('^GSPTSE', 'TSX Composite'), ('^BVSP', 'Bovespa'), ('^MXX', 'IPC Mexico'),
+    ('^KS11', 'KOSPI'), ('^TWII', 'Taiwan Weighted'), ('^NSEI', 'Nifty 50'),
+    ('^SSEC', 'Shanghai Composite'), ('^STOXX50E', 'Euro Stoxx 50'),
+]
+
+FUTURES = [
+    ('GC=F', 'Gold Futures'), ('SI=F', 'Silver Futures'), ('CL=F', 'Crude Oil'),
+    ('NG=F', 'Natural Gas'), ('HG=F', 'Copper'), ('PL=F', 'Platinum'),
+    ('ZC=F', 'Corn Futures'), ('ZW=F', 'Wheat Futures'), ('ZS=F', 'Soybean Futures'),
+]
+
+GROUPS = [
+    (CRYPTO, 'CRYPTO', 'Cryptocurrency', 'Digital Asset'),
+    (INDICES, 'INDEX', 'Index', 'Market Index'),
+    (FUTURES, 'FUTURES', 'Commodities', 'Futures'),
+]
+
+
+def fetch():
+    return [
+        {'symbol': symbol, 'name': name, 'exchange': exchange, 'sector': sector, 'industry': industry}
+        for items, exchange, sector, industry in GROUPS
+        for symbol, name in items
+    ]
+
+
+def normalize(raw):
+    return raw
@@ -0,0 +1,10 @@
+"""Hong Kong Exchange: every 5-digit code (00001-09999)"""
+
+
+def fetch():
+    return [{'symbol': f'{code:05d}.HK', 'name': f'Hong Kong {code:05d}', 'exchange': 'HKEX'}
+            for code in range(1, 10000)]
+
+
+def normalize(raw):
+    return raw
@@ -0,0 +1,11 @@
+"""Indonesia (IDX) listings, carried forward from the current stock database"""
+
+from core.registry import get_registry
+
+
+def fetch():
+    return get_registry().stocks(exchange='IDX')
+
+
+def normalize(raw):
+    return raw
@@ -0,0 +1,22 @@
+"""India: major NSE names plus every 10th BSE code"""
+
+NSE_MAJORS = [
+    'RELIANCE', 'TCS', 'HDFCBANK', 'INFY', 'HINDUNILVR', 'ITC', 'SBIN', 'BHARTIARTL',
+    'BAJFINANCE', 'KOTAKBANK', 'LT', 'ASIANPAINT', 'AXISBANK', 'MARUTI', 'TITAN',
+    'SUNPHARMA', 'ULTRACEMCO', 'NESTLEIND', 'WIPRO', 'ONGC', 'NTPC', 'POWERGRID',
+    'HCLTECH', 'TATAMOTORS', 'TECHM', 'INDUSINDBK', 'ADANIENT', 'JSWSTEEL', 'HINDALCO',
+    'COALINDIA', 'BAJAJFINSV', 'GRASIM', 'DIVISLAB', 'DRREDDY', 'CIPLA', 'EICHERMOT',
+    'HEROMOTOCO', 'BRITANNIA', 'SHREECEM', 'TATACONSUM', 'SBILIFE', 'HDFCLIFE', 'ICICIBANK'
+]
+
+
+def fetch():
+    stocks = [{'symbol': f'{name}.NS', 'name': f'India NSE {name}', 'exchange': 'NSE'}
+              for name in NSE_MAJORS]
+    stocks += [{'symbol': f'{code}.BO', 'name': f'India BSE {code}', 'exchange': 'BSE'}
+               for code in range(500000, 544000, 10)]
+    return stocks
+
+
+def normalize(raw):
+    return raw
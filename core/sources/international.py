@@ -0,0 +1,45 @@
+"""Placeholder code ranges for the remaining exchanges (Europe, Asia-Pacific, Americas, others)"""
+
+# exchange -> (Yahoo suffix, name prefix, number of codes)
+EXCHANGES = {
+    # Europe
+    'LSE': ('L', 'UK London SE', 2000),
+    'EPA': ('PA', 'France Paris', 1000),
+    'FRA': ('DE', 'Germany Frankfurt', 1000),
+    'SWX': ('SW', 'Switzerland SIX', 300),
+    'BIT': ('MI', 'Italy Milan', 400),
+    'BME': ('MC', 'Spain Madrid', 400),
+    # Asia-Pacific
+    'SGX': ('SI', 'Singapore', 700),
+    'KRX': ('KS', 'South Korea', 2500),
+    'ASX': ('AX', 'Australia', 2300),
+    'TWSE': ('TW', 'Taiwan', 950),
+    'SET': ('BK', 'Thailand', 700),
+    'MYX': ('KL', 'Malaysia', 900),
+    'PSE': ('PS', 'Philippines', 280),
+    # Americas
+    'TSX': ('TO', 'Canada Toronto', 3500),
+    'BVMF': ('SA', 'Brazil Sao Paulo', 400),
+    'BMV': ('MX', 'Mexico', 150),
+    # Middle East & others
+    'JSE': ('JO', 'South Africa', 400),
+    'TASE': ('TA', 'Israel Tel Aviv', 500),
+}
+
+
+def symbol_for(exchange, suffix, code):
+    if exchange == 'TSX':
+        return f'TSX{code:04d}.TO'
+    return f'STOCK{code}.{suffix}'
+
+
+def fetch():
+    return [
+        {'symbol': symbol_for(exchange, suffix, code), 'name': f'{prefix} {code}', 'exchange': exchange}
+        for exchange, (suffix, prefix, count) in EXCHANGES.items()
+        for code in range(1, count + 1)
+    ]
+
+
+def normalize(raw):
+    return raw
@@ -0,0 +1,35 @@
+"""NASDAQ, NYSE and AMEX listings with sector/industry from the api.nasdaq.com screener"""
+
+import json
+from urllib.request import Request, urlopen
+
+from core.ratelimit import BACKGROUND, rate_governor
+
+URL = 'https://api.nasdaq.com/api/screener/stocks?tableonly=true&limit=25000&exchange={}'
+EXCHANGES = {'nasdaq': 'NASDAQ', 'nyse': 'NYSE', 'amex': 'AMEX'}
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
+
+
+def _download(exchange):
+    with urlopen(Request(URL.format(exchange), headers=HEADERS), timeout=30) as response:
+        return json.load(response)
+
+
+def fetch():
+    raw = {}
+    for exchange in EXCHANGES:
+        data = rate_governor.call('api.nasdaq.com', lambda: _download(exchange), lane=BACKGROUND)
+        raw[exchange] = ((data or {}).get('data') or {}).get('rows') or []
+    return raw
+
+
+def normalize(raw):
+    for exchange, rows in raw.items():
+        for row in rows:
+            yield {
+                'symbol': row['symbol'],
+                'name': row['name'],
+                'exchange': EXCHANGES[exchange],
+                'sector': row.get('sector') or '',
+                'industry': row.get('industry') or '',
+            }
@@ -0,0 +1,40 @@
+"""NASDAQ, NYSE, AMEX, ARCA and BATS listings from the official nasdaqtrader.com symbol directory"""
+
+import csv
+import io
+from urllib.request import urlopen
+
+URLS = {
+    'nasdaqlisted': 'ftp://ftp.nasdaqtrader.com/SymbolDirectory/nasdaqlisted.txt',
+    'otherlisted': 'ftp://ftp.nasdaqtrader.com/SymbolDirectory/otherlisted.txt',
+}
+
+# otherlisted.txt exchange codes
+EXCHANGES = {'N': 'NYSE', 'A': 'AMEX', 'P': 'ARCA', 'Z': 'BATS'}
+
+
+def fetch():
+    raw = {}
+    for name, url in URLS.items():
+        with urlopen(url, timeout=60) as response:
+            raw[name] = response.read().decode('utf-8', 'replace')
+    return raw
+
+
+def _rows(text):
+    # The last line is "File Creation Time: ..." rather than a listing
+    return [row for row in csv.DictReader(io.StringIO(text), delimiter='|')
+            if not row.get('Symbol', row.get('ACT Symbol', '')).startswith('File Creation Time')]
+
+
+def normalize(raw):
+    for row in _rows(raw['nasdaqlisted']):
+        if row['Test Issue'] != 'N' or row['Financial Status'] == 'D' or '$' in row['Symbol']:
+            continue
+        yield {'symbol': row['Symbol'], 'name': row['Security Name'], 'exchange': 'NASDAQ'}
+
+    for row in _rows(raw['otherlisted']):
+        if row['Test Issue'] != 'N' or '$' in row['ACT Symbol']:
+            continue
+        yield {'symbol': row['ACT Symbol'], 'name': row['Security Name'],
+               'exchange': EXCHANGES.get(row['Exchange'], 'NYSE')}
@@ -0,0 +1,10 @@
+"""Tokyo Stock Exchange: every 4-digit code (1000-9999)"""
+
+
+def fetch():
+    return [{'symbol': f'{code}.T', 'name': f'Japan {code}', 'exchange': 'TSE'}
+            for code in range(1000, 10000)]
+
+
+def normalize(raw):
+    return raw
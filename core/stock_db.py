@@ -0,0 +1,371 @@
+"""
+Stock database loader for /api/stocks/list.
+
+The database is loaded once (and again only when the file's mtime changes)
+and encoded on first request into identity, gzip and brotli blobs with a
+strong ETag, so a request only has to pick a blob and write it. A compact
+.pack (core/stock_pack.py) is preferred over JSON when present: it is
+memory-mapped and records are decoded only when read.
+
+With ?exchange=, ?prefix=, ?cursor= or ?limit= the endpoint returns one
+page of stocks in symbol order instead of the whole database, keeping each
+response far below Vercel's payload limit however large the database grows.
+The cursor is the last symbol of the previous page (next_cursor).
+
+With ?since=<version> it returns only what changed after that build
+(core/stock_deltas.py), or the whole database when the client is too far
+behind; either body carries the current version.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from bisect import bisect_right
+
+from core import stock_deltas
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_PUBLIC = os.path.join(os.path.dirname(_HERE), 'public')
+
+# Pack first, then plain JSON, then the gzip copy checked into public/
+DATABASE_PATHS = [
+    os.path.join(_PUBLIC, 'stocks-database.pack'),
+    '/var/task/public/stocks-database.pack',
+    'public/stocks-database.pack',
+    os.path.join(_PUBLIC, 'stocks-database.json'),
+    '/var/task/public/stocks-database.json',  # Vercel standard
+    'public/stocks-database.json',
+    os.path.join(_PUBLIC, 'stocks-database.json.gz'),
+    '/var/task/public/stocks-database.json.gz',
+    'public/stocks-database.json.gz',
+]
+
+BROTLI_QUALITY = int(os.environ.get('STOCK_DB_BROTLI_QUALITY', 9))
+GZIP_LEVEL = 9
+
+# Paginated responses are small and built per request, so compress them lighter
+PAGE_GZIP_LEVEL = 6
+PAGE_BROTLI_QUALITY = 5
+
+DEFAULT_PAGE_LIMIT = 1000
+MAX_PAGE_LIMIT = 5000
+PAGE_PARAMS = ('exchange', 'prefix', 'cursor', 'limit')
+
+# A delta is only current until the next build, so let clients check back sooner
+DELTA_CACHE_CONTROL = 'public, max-age=300'
+
+# Preferred order when the client accepts several encodings equally
+ENCODING_PREFERENCE = ('br', 'gzip', 'identity')
+
+
+def find_database_path(paths=None):
+    for path in paths or DATABASE_PATHS:
+        if os.path.exists(path):
+            return path
+    cwd = os.getcwd()
+    files = os.listdir(cwd) if os.path.exists(cwd) else []
+    raise FileNotFoundError(f"Stock database not found. CWD: {cwd}, Files: {files[:10]}")
+
+
+def read_database(path):
+    """Load a stock database file (.pack, .json or .json.gz)"""
+    if path.endswith('.pack'):
+        from core.stock_pack import StockPack
+
+        pack = StockPack(path)
+        stocks = pack.records()
+        data = {'success': True, 'count': len(stocks), 'stocks': stocks}
+        if pack.database_version is not None:
+            data['version'] = pack.database_version
+        return data
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return json.load(f)
+
+
+class DatabaseSnapshot:
+    """One loaded version of the stock database, encoded for responses on first use"""
+
+    def __init__(self, data, path, mtime):
+        self.data = data
+        self.path = path
+        self.mtime = mtime
+
+        self._encoded = None
+        self._encode_lock = threading.Lock()
+        self._search_index = None
+        self._index_lock = threading.Lock()
+        self._registry = None
+        self._registry_lock = threading.Lock()
+        self._delta_log = None
+
+    def _encode(self):
+        """(blobs, digest) for the JSON response, encoded on first use"""
+        if self._encoded is None:
+            with self._encode_lock:
+                if self._encoded is None:
+                    stocks = list(self.data.get('stocks', []))
+                    identity = json.dumps(dict(self.data, stocks=stocks), separators=(',', ':')).encode('utf-8')
+                    blobs = {
+                        'identity': identity,
+                        'gzip': gzip.compress(identity, compresslevel=GZIP_LEVEL, mtime=0),
+                    }
+                    if brotli is not None:
+                        blobs['br'] = brotli.compress(identity, quality=BROTLI_QUALITY)
+                    self._encoded = (blobs, hashlib.sha256(identity).hexdigest()[:32])
+        return self._encoded
+
+    @property
+    def blobs(self):
+        return self._encode()[0]
+
+    @property
+    def digest(self):
+        return self._encode()[1]
+
+    @property
+    def identity(self):
+        return self.blobs['identity']
+
+    @property
+    def search_index(self):
+        """SearchIndex over this snapshot's stocks (built on first use)"""
+        if self._search_index is None:
+            with self._index_lock:
+                if self._search_index is None:
+                    from core.search import SearchIndex
+                    self._search_index = SearchIndex(self.data.get('stocks', []))
+        return self._search_index
+
+    @property
+    def registry(self):
+        """StockRegistry over this snapshot's stocks (built on first use)"""
+        if self._registry is None:
+            with self._registry_lock:
+                if self._registry is None:
+                    from core.registry import StockRegistry
+                    self._registry = StockRegistry(self.data.get('stocks', []))
+        return self._registry
+
+    def page(self, exchange='', prefix='', cursor='', limit=DEFAULT_PAGE_LIMIT):
+        """One page of stocks in symbol order, filtered by exchange and symbol prefix"""
+        registry = self.registry
+        rows = registry.rows(exchange)
+        lo, hi = registry.prefix_range(rows, prefix.upper())
+        start = max(lo, bisect_right(rows, cursor, lo, hi, key=registry.symbols.__getitem__)) if cursor else lo
+        end = min(hi, start + limit)
+        return {
+            'success': True,
+            'count': end - start,
+            'total': hi - lo,
+            'stocks': [registry.record(rows[i]) for i in range(start, end)],
+            'next_cursor': registry.symbols[rows[end - 1]] if end < hi else None,
+        }
+
+    @property
+    def version(self):
+        return self.data.get('version')
+
+    def delta_since(self, since):
+        """{version, since, added, removed, modified} or None when the client needs everything"""
+        if not self.version:
+            return None
+        if self._delta_log is None:
+            directory = os.path.join(os.path.dirname(self.path), os.path.basename(stock_deltas.DELTA_DIR))
+            self._delta_log = stock_deltas.DeltaLog(directory)
+        changes = self._delta_log.since(since, self.version, len(self.data.get('stocks', [])))
+        if changes is None:
+            return None
+        return dict({'success': True, 'version': self.version, 'since': since}, **changes)
+
+    def etag(self, encoding):
+        return make_etag(self.digest, encoding)
+
+    def matches(self, if_none_match, encoding):
+        """True when an If-None-Match header covers this representation"""
+        return etag_matches(if_none_match, self.etag(encoding))
+
+
+def make_etag(digest, encoding):
+    # Strong validators must differ per content-coding
+    if encoding == 'identity':
+        return f'"{digest}"'
+    return f'"{digest}-{encoding}"'
+
+
+def etag_matches(if_none_match, etag):
+    """True when an If-None-Match header covers etag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes still match
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag in tags
+
+
+def json_parts(payload, accept_encoding, if_none_match, cache_control):
+    """(status, body, headers) for a small per-request JSON payload"""
+    identity = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    available = ('br', 'gzip', 'identity') if brotli is not None else ('gzip', 'identity')
+    encoding = select_encoding(accept_encoding, available)
+
+    headers = {
+        'ETag': make_etag(hashlib.sha256(identity).hexdigest()[:32], encoding),
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': cache_control,
+    }
+    if etag_matches(if_none_match, headers['ETag']):
+        return 304, b'', headers
+
+    if encoding == 'gzip':
+        body = gzip.compress(identity, compresslevel=PAGE_GZIP_LEVEL, mtime=0)
+    elif encoding == 'br':
+        body = brotli.compress(identity, quality=PAGE_BROTLI_QUALITY)
+    else:
+        body = identity
+    headers['Content-Type'] = 'application/json'
+    headers['Content-Length'] = str(len(body))
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return 200, body, headers
+
+
+def parse_page_params(params):
+    """Validated page() keyword arguments from query parameters; raises ValueError"""
+    try:
+        limit = int(params.get('limit') or DEFAULT_PAGE_LIMIT)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    return {
+        'exchange': (params.get('exchange') or '').strip(),
+        'prefix': (params.get('prefix') or '').strip(),
+        'cursor': (params.get('cursor') or '').strip(),
+        'limit': max(1, min(limit, MAX_PAGE_LIMIT)),
+    }
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} for an Accept-Encoding header value"""
+    accepted = {}
+    for part in (header or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        coding, _, params = part.partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def select_encoding(header, available):
+    """Pick the best available content-coding for an Accept-Encoding header"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*')
+
+    best, best_q = 'identity', 0.0
+    for coding in ENCODING_PREFERENCE:
+        if coding not in available:
+            continue
+        q = accepted.get(coding, wildcard)
+        if q is None:
+            # identity is acceptable unless explicitly refused
+            q = 0.001 if coding == 'identity' else 0.0
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class StockDatabase:
+    """Lazily loaded, mtime-checked stock database shared by all request threads"""
+
+    def __init__(self, paths=None):
+        self.paths = paths
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        path = find_database_path(self.paths)
+        mtime = os.path.getmtime(path)
+
+        current = self._snapshot
+        if current is not None and current.path == path and current.mtime == mtime:
+            return current
+
+        with self._lock:
+            current = self._snapshot
+            if current is None or current.path != path or current.mtime != mtime:
+                current = DatabaseSnapshot(read_database(path), path, mtime)
+                self._snapshot = current
+                print(f"Loaded stock database from {path} ({os.path.getsize(path):,} bytes)")
+            return current
+
+    def warm(self):
+        """Load, index and encode the current database ahead of the first request"""
+        snap = self.snapshot()
+        snap.registry
+        snap.search_index
+        snap.blobs
+        return snap
+
+    def response_parts(self, accept_encoding, if_none_match):
+        """Return (status, body, headers) for a request with the given headers"""
+        snap = self.snapshot()
+        encoding = select_encoding(accept_encoding, snap.blobs)
+
+        headers = {
+            'ETag': snap.etag(encoding),
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': 'public, max-age=86400',
+        }
+        if snap.matches(if_none_match, encoding):
+            return 304, b'', headers
+
+        body = snap.blobs[encoding]
+        headers['Content-Type'] = 'application/json'
+        headers['Content-Length'] = str(len(body))
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return 200, body, headers
+
+    def page_parts(self, params, accept_encoding, if_none_match):
+        """Return (status, body, headers) for one page; raises ValueError on bad params"""
+        options = parse_page_params(params)
+        page = self.snapshot().page(**options)
+        return json_parts(page, accept_encoding, if_none_match, 'public, max-age=86400')
+
+    def delta_parts(self, since, accept_encoding, if_none_match):
+        """Changes since a client's version, or the whole database when it is too far behind"""
+        try:
+            since = int(since)
+        except ValueError:
+            raise ValueError('since must be an integer version')
+        delta = self.snapshot().delta_since(since)
+        if delta is None:
+            return self.response_parts(accept_encoding, if_none_match)
+        return json_parts(delta, accept_encoding, if_none_match, DELTA_CACHE_CONTROL)
+
+    def list_parts(self, params, accept_encoding, if_none_match):
+        """The whole database, the changes ?since= a version, or one page for PAGE_PARAMS"""
+        if 'since' in params:
+            return self.delta_parts(params['since'], accept_encoding, if_none_match)
+        if any(name in params for name in PAGE_PARAMS):
+            return self.page_parts(params, accept_encoding, if_none_match)
+        return self.response_parts(accept_encoding, if_none_match)
+
+
+# Process-wide instance
+stock_database = StockDatabase()
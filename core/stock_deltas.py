@@ -0,0 +1,175 @@
+"""
+Versioned deltas between stock database builds.
+
+Every build carries an integer version. When a build changes anything, the
+pipeline bumps the version and writes the changes since the previous build
+to DELTA_DIR/<version>.json:
+
+    {"from": 6, "to": 7, "added": [stock, ...], "removed": [symbol, ...],
+     "modified": [stock, ...]}
+
+DELTA_DIR/index.json lists the deltas kept (the newest MAX_DELTAS) with
+their change counts. /api/stocks/list?since=<version> composes the chain
+of deltas from the client's version to the current one, so a daily refresh
+costs kilobytes; a client too far behind gets the full database instead.
+"""
+
+import json
+import os
+import threading
+
+DELTA_DIR = os.path.join('public', 'stocks-deltas')
+INDEX = 'index.json'
+MAX_DELTAS = int(os.environ.get('STOCK_DB_MAX_DELTAS', 30))
+
+# Past this share of the database a delta saves too little; send everything
+MAX_DELTA_FRACTION = 0.5
+
+FIELDS = ('symbol', 'name', 'exchange', 'sector', 'industry')
+
+
+def _record(stock):
+    return {field: stock.get(field) if isinstance(stock.get(field), str) else '' for field in FIELDS}
+
+
+def _by_symbol(stocks):
+    records = {}
+    for stock in stocks:
+        record = _record(stock)
+        if record['symbol']:
+            records[record['symbol']] = record
+    return records
+
+
+def diff(old_stocks, new_stocks):
+    """{'added', 'removed', 'modified'} turning old_stocks into new_stocks"""
+    old, new = _by_symbol(old_stocks), _by_symbol(new_stocks)
+    return {
+        'added': [new[s] for s in sorted(new.keys() - old.keys())],
+        'removed': sorted(old.keys() - new.keys()),
+        'modified': [new[s] for s in sorted(new.keys() & old.keys()) if new[s] != old[s]],
+    }
+
+
+def change_count(changes):
+    return len(changes['added']) + len(changes['removed']) + len(changes['modified'])
+
+
+def next_version(previous, stocks):
+    """(version, changes) for a new build given the previous database
+
+    changes is None when there is no versioned previous build to diff against.
+    """
+    if not previous or not previous.get('version'):
+        return 1, None
+    changes = diff(previous.get('stocks', []), stocks)
+    if not change_count(changes):
+        return previous['version'], changes
+    return previous['version'] + 1, changes
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_index(directory):
+    try:
+        with open(os.path.join(directory, INDEX)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'version': 0, 'deltas': []}
+
+
+def write(directory, version, changes, max_deltas=MAX_DELTAS):
+    """Record the delta that produced version and drop the oldest beyond max_deltas"""
+    os.makedirs(directory, exist_ok=True)
+    name = f'{version}.json'
+    _write_json(os.path.join(directory, name), dict(changes, **{'from': version - 1, 'to': version}))
+
+    index = load_index(directory)
+    deltas = [d for d in index['deltas'] if d['to'] < version]
+    deltas.append({'from': version - 1, 'to': version, 'file': name,
+                   **{kind: len(items) for kind, items in changes.items()}})
+    keep = max(1, max_deltas)
+    deltas, dropped = deltas[-keep:], deltas[:-keep]
+    _write_json(os.path.join(directory, INDEX), {'version': version, 'deltas': deltas})
+
+    for delta in dropped:
+        try:
+            os.remove(os.path.join(directory, delta['file']))
+        except OSError:
+            pass
+
+
+def reset(directory, version):
+    """Start an empty delta log at version (a build with nothing to diff against)"""
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith('.json') and name != INDEX:
+            os.remove(os.path.join(directory, name))
+    _write_json(os.path.join(directory, INDEX), {'version': version, 'deltas': []})
+
+
+class DeltaLog:
+    """Read side of a delta directory; delta files are loaded on first use"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index = load_index(directory)
+        self._deltas = {}
+        self._lock = threading.Lock()
+
+    def delta(self, to):
+        if to not in self._deltas:
+            with self._lock:
+                if to not in self._deltas:
+                    with open(os.path.join(self.directory, f'{to}.json')) as f:
+                        self._deltas[to] = json.load(f)
+        return self._deltas[to]
+
+    def since(self, since, current, total):
+        """Composed changes from version since to current, or None to send everything
+
+        None when a delta in the chain is missing or the changes would cover
+        more than MAX_DELTA_FRACTION of total stocks.
+        """
+        if since == current:
+            return {'added': [], 'removed': [], 'modified': []}
+        if not 0 < since < current:
+            return None
+        chain = {d['to']: d for d in self.index['deltas']}
+        needed = range(since + 1, current + 1)
+        if any(to not in chain for to in needed):
+            return None
+        if sum(chain[to]['added'] + chain[to]['removed'] + chain[to]['modified'] for to in needed) \
+                > total * MAX_DELTA_FRACTION:
+            return None
+
+        # symbol -> (kind of the first change, latest record or None when removed)
+        state = {}
+        for to in needed:
+            delta = self.delta(to)
+            for kind in ('added', 'modified'):
+                for stock in delta[kind]:
+                    first = state[stock['symbol']][0] if stock['symbol'] in state else kind
+                    state[stock['symbol']] = (first, stock)
+            for symbol in delta['removed']:
+                first = state[symbol][0] if symbol in state else 'removed'
+                state[symbol] = (first, None)
+
+        changes = {'added': [], 'removed': [], 'modified': []}
+        for symbol in sorted(state):
+            first, stock = state[symbol]
+            if stock is None:
+                # Added and removed again since the client's version: nothing to tell it
+                if first != 'added':
+                    changes['removed'].append(symbol)
+            elif first == 'added':
+                changes['added'].append(stock)
+            else:
+                # Modified, or removed and re-added: either way the client has an old copy
+                changes['modified'].append(stock)
+        return changes
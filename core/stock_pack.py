@@ -0,0 +1,315 @@
+"""
+Compact columnar stock database (.pack) with an mmap reader.
+
+The JSON database repeats the same exchange/sector/industry strings tens of
+thousands of times and spells out names like "Japan 1234" that follow from
+the symbol. A pack stores instead:
+
+- rows sorted by symbol: a symbol column (offsets + UTF-8 blob), so a symbol
+  is found by binary search
+- exchange, sector and industry as small integer codes into dictionaries
+- names as an offset-indexed blob, except names rendered from a shared
+  template ("Japan {base}", "UK London SE {int}") which take no blob bytes
+- the original record order, so the JSON database can be reproduced as-is
+
+Layout: MAGIC, u32 header length, JSON header (count, database version,
+dictionaries, section offsets), then 8-byte aligned little-endian numpy sections. StockPack maps
+the file and decodes a field only when it is read. Writing needs NumPy; reading
+uses memoryview casts only, so serving the database never imports it.
+
+Convert an existing JSON database:
+    python3 -m core.stock_pack public/stocks-database.json.gz public/stocks-database.pack
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+MAGIC = b'STKPACK1'
+VERSION = 1
+ALIGN = 8
+
+# Templates used fewer times than this are stored as literal names
+MIN_TEMPLATE_USES = 8
+
+# Section dtypes (numpy dtype.str) -> memoryview/array type codes
+SECTION_FORMATS = {'<u4': 'I', '<u2': 'H', '<u1': 'B', '|u1': 'B'}
+
+FIELDS = ('symbol', 'name', 'exchange', 'sector', 'industry')
+CATEGORIES = ('exchange', 'sector', 'industry')
+
+
+def _text(value):
+    # Old builder output has NaN symbols (pandas read "NA" as missing)
+    return value if isinstance(value, str) else ''
+
+
+def symbol_base(symbol):
+    """Symbol without its exchange suffix (1234.T -> 1234)"""
+    return symbol.rsplit('.', 1)[0] if '.' in symbol else symbol
+
+
+def symbol_int(symbol):
+    """Digits of the symbol base as an integer string (TSX0001.TO -> 1), or None"""
+    digits = ''.join(c for c in symbol_base(symbol) if c.isdigit())
+    return str(int(digits)) if digits else None
+
+
+def render(template, symbol):
+    if '{base}' in template:
+        return template.replace('{base}', symbol_base(symbol))
+    return template.replace('{int}', symbol_int(symbol) or '')
+
+
+def name_template(name, symbol):
+    """A template that renders name from symbol, or None"""
+    base = symbol_base(symbol)
+    if base and name.endswith(' ' + base):
+        template = name[:-len(base)] + '{base}'
+    else:
+        number = symbol_int(symbol)
+        if number is None or not name.endswith(' ' + number):
+            return None
+        template = name[:-len(number)] + '{int}'
+    return template if render(template, symbol) == name else None
+
+
+def _strings(values):
+    """(offsets u4[n+1], blob) for a list of strings"""
+    import numpy as np
+
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _codes(values, dictionary):
+    import numpy as np
+
+    index = {value: i for i, value in enumerate(dictionary)}
+    dtype = '<u1' if len(dictionary) <= 256 else '<u2'
+    return np.array([index[value] for value in values], dtype=dtype)
+
+
+def encode(stocks, database_version=None):
+    """Pack bytes for a list of stock dicts"""
+    import numpy as np
+
+    records = [{field: _text(stock.get(field)) for field in FIELDS} for stock in stocks]
+    # Stable sort: duplicate symbols keep their relative order
+    order = sorted(range(len(records)), key=lambda i: records[i]['symbol'])
+    rows = [records[i] for i in order]
+    position = np.empty(len(records), dtype='<u4')
+    position[np.array(order, dtype=np.int64)] = np.arange(len(records), dtype='<u4')
+
+    header = {'version': VERSION, 'count': len(rows)}
+    if database_version is not None:
+        header['database_version'] = database_version
+    sections = {'order': position}
+
+    for field in CATEGORIES:
+        values = [row[field] for row in rows]
+        dictionary = sorted(set(values) | {''})
+        header[field + 's'] = dictionary
+        sections[field] = _codes(values, dictionary)
+
+    templates = [name_template(row['name'], row['symbol']) for row in rows]
+    uses = {}
+    for template in templates:
+        if template is not None:
+            uses[template] = uses.get(template, 0) + 1
+    kept = sorted(t for t, n in uses.items() if n >= MIN_TEMPLATE_USES)
+    template_ids = {t: i + 1 for i, t in enumerate(kept)}
+    header['templates'] = kept
+    name_codes = [template_ids.get(t, 0) for t in templates]
+    sections['name_template'] = np.array(name_codes, dtype='<u2')
+    names = ['' if code else row['name'] for code, row in zip(name_codes, rows)]
+
+    sections['symbol_offsets'], sections['symbol_blob'] = _strings([row['symbol'] for row in rows])
+    sections['name_offsets'], sections['name_blob'] = _strings(names)
+
+    # Offsets are relative to the data area, so the header can be sized afterwards
+    layout, chunks, cursor = {}, [], 0
+    for name, column in sections.items():
+        data = np.ascontiguousarray(column).tobytes()
+        layout[name] = [cursor, len(column), column.dtype.str]
+        chunks.append(data + b'\0' * (-len(data) % ALIGN))
+        cursor += len(data) + (-len(data) % ALIGN)
+    header['sections'] = layout
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    prefix_len = len(MAGIC) + 4 + len(header_bytes)
+    padding = b' ' * (-prefix_len % ALIGN)
+    return MAGIC + struct.pack('<I', len(header_bytes) + len(padding)) + header_bytes + padding + b''.join(chunks)
+
+
+def write(stocks, path, database_version=None):
+    """Write a pack atomically; returns its size"""
+    body = encode(stocks, database_version)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    return len(body)
+
+
+def _section(view, start, length, dtype):
+    """Read-only sequence of ints over one section of the mapped file"""
+    code = SECTION_FORMATS[dtype]
+    section = view[start:start + length * struct.calcsize(code)].cast(code)
+    if sys.byteorder != 'little' and code != 'B':
+        section = array(code, section)
+        section.byteswap()
+    return section
+
+
+class StockRecords:
+    """Read-only sequence of stock dicts in original database order, decoded on access"""
+
+    def __init__(self, pack):
+        self.pack = pack
+
+    def __len__(self):
+        return len(self.pack)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self.pack.record(int(self.pack.order[i]))
+
+    def __iter__(self):
+        return self.pack.iter_records(self.pack.order.tolist())
+
+
+class StockPack:
+    """Memory-mapped pack; row i is the i-th record in symbol order"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a stock pack')
+        (header_len,) = struct.unpack_from('<I', self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_len])
+        data_start = start + header_len
+
+        self.count = header['count']
+        self.database_version = header.get('database_version')
+        self.templates = [None] + header['templates']
+        self.dictionaries = {field: header[field + 's'] for field in CATEGORIES}
+        view = memoryview(self._mmap)
+        self.sections = {
+            name: _section(view, data_start + offset, length, dtype)
+            for name, (offset, length, dtype) in header['sections'].items()
+        }
+        self.order = self.sections['order']
+        self._symbol_offsets = self.sections['symbol_offsets']
+        self._name_offsets = self.sections['name_offsets']
+        self._blobs = {
+            'symbol': data_start + header['sections']['symbol_blob'][0],
+            'name': data_start + header['sections']['name_blob'][0],
+        }
+        self._symbols = None
+
+    def __len__(self):
+        return self.count
+
+    def _string(self, field, offsets, row):
+        base = self._blobs[field]
+        return self._mmap[base + int(offsets[row]):base + int(offsets[row + 1])].decode('utf-8')
+
+    def symbol(self, row):
+        return self._string('symbol', self._symbol_offsets, row)
+
+    def name(self, row):
+        template = self.templates[self.sections['name_template'][row]]
+        if template is not None:
+            return render(template, self.symbol(row))
+        return self._string('name', self._name_offsets, row)
+
+    def category(self, field, row):
+        return self.dictionaries[field][self.sections[field][row]]
+
+    def record(self, row):
+        return {
+            'symbol': self.symbol(row),
+            'name': self.name(row),
+            'exchange': self.category('exchange', row),
+            'sector': self.category('sector', row),
+            'industry': self.category('industry', row),
+        }
+
+    def iter_records(self, rows):
+        """Records for many rows, reading each column once instead of per field"""
+        symbol_offsets = self._symbol_offsets.tolist()
+        name_offsets = self._name_offsets.tolist()
+        symbol_blob = self._mmap[self._blobs['symbol']:self._blobs['symbol'] + symbol_offsets[-1]]
+        name_blob = self._mmap[self._blobs['name']:self._blobs['name'] + name_offsets[-1]]
+        templates = self.sections['name_template'].tolist()
+        columns = [(field, self.dictionaries[field], self.sections[field].tolist()) for field in CATEGORIES]
+
+        for row in rows:
+            symbol = symbol_blob[symbol_offsets[row]:symbol_offsets[row + 1]].decode('utf-8')
+            template = self.templates[templates[row]]
+            if template is not None:
+                name = render(template, symbol)
+            else:
+                name = name_blob[name_offsets[row]:name_offsets[row + 1]].decode('utf-8')
+            record = {'symbol': symbol, 'name': name}
+            for field, dictionary, codes in columns:
+                record[field] = dictionary[codes[row]]
+            yield record
+
+    def records(self):
+        """Lazy sequence of stock dicts in the original database order"""
+        return StockRecords(self)
+
+    def find(self, symbol):
+        """Row of symbol (binary search on the sorted symbol column), or None"""
+        if self._symbols is None:
+            self._symbols = _SymbolColumn(self)
+        row = bisect_left(self._symbols, symbol)
+        if row < self.count and self.symbol(row) == symbol:
+            return row
+        return None
+
+
+class _SymbolColumn:
+    """Sequence view over the sorted symbol column for bisect"""
+
+    def __init__(self, pack):
+        self.pack = pack
+
+    def __len__(self):
+        return len(self.pack)
+
+    def __getitem__(self, row):
+        return self.pack.symbol(row)
+
+
+def main(argv):
+    if len(argv) != 2:
+        print('Usage: python3 -m core.stock_pack <database.json[.gz]> <output.pack>')
+        return 1
+    from core.stock_db import read_database
+
+    source, output = argv
+    data = read_database(source)
+    stocks = data.get('stocks', [])
+    size = write(stocks, output, data.get('version'))
+    print(f"Packed {len(stocks):,} stocks from {source} ({os.path.getsize(source):,} bytes) "
+          f"into {output} ({size:,} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
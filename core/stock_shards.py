@@ -0,0 +1,121 @@
+"""
+Static stock database shards with a manifest.
+
+The full database is one payload that grows with every market added, and
+Vercel refuses function responses over 4.5 MB. The builder also writes the
+database as small static shards so clients fetch only what they need:
+
+- one shard per exchange (stocks/NYSE.json)
+- exchanges with more than SHARD_MAX_ROWS stocks are split by the first
+  letter of the symbol instead (stocks/HKEX-0.json ... stocks/HKEX-9.json)
+- stocks/manifest.json lists every shard with its exchange, symbol prefix,
+  count, size and sha256, plus the database build version (the integer
+  ?since= takes, core/stock_deltas.py) and a digest that changes with any
+  shard
+
+Shards are plain compact JSON so static hosting can compress them on the fly.
+
+Shard an existing database:
+    python3 -m core.stock_shards public/stocks-database.pack public/stocks
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+
+SHARD_MAX_ROWS = int(os.environ.get('STOCK_SHARD_MAX_ROWS', 2000))
+MANIFEST = 'manifest.json'
+
+
+def _text(value):
+    # Old builder output has NaN symbols (pandas read "NA" as missing)
+    return value if isinstance(value, str) else ''
+
+
+def symbol_letter(symbol):
+    """Shard letter of a symbol: its first character if alphanumeric, else '_'"""
+    first = symbol[:1].upper()
+    return first if first.isascii() and first.isalnum() else '_'
+
+
+def shard_name(exchange, letter=''):
+    safe = re.sub(r'[^A-Za-z0-9]+', '_', exchange) or '_'
+    return f'{safe}-{letter}.json' if letter else f'{safe}.json'
+
+
+def shard(stocks, max_rows=SHARD_MAX_ROWS):
+    """{(exchange, letter): [stocks sorted by symbol]}; letter is '' for a whole exchange"""
+    by_exchange = {}
+    for stock in stocks:
+        by_exchange.setdefault(_text(stock.get('exchange')), []).append(stock)
+
+    shards = {}
+    for exchange, members in by_exchange.items():
+        members.sort(key=lambda s: _text(s.get('symbol')))
+        if len(members) <= max_rows:
+            shards[(exchange, '')] = members
+            continue
+        for stock in members:
+            shards.setdefault((exchange, symbol_letter(_text(stock.get('symbol')))), []).append(stock)
+    return shards
+
+
+def _write(path, body):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def write(stocks, directory, version=None, max_rows=SHARD_MAX_ROWS):
+    """Write shards and the manifest for build version into directory, removing shards no longer listed
+
+    Returns the manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    entries = []
+    for (exchange, letter), members in sorted(shard(stocks, max_rows).items()):
+        name = shard_name(exchange, letter)
+        body = json.dumps({'exchange': exchange, 'prefix': letter, 'count': len(members), 'stocks': members},
+                          separators=(',', ':')).encode('utf-8')
+        _write(os.path.join(directory, name), body)
+        entries.append({
+            'file': name,
+            'exchange': exchange,
+            'prefix': letter,
+            'count': len(members),
+            'bytes': len(body),
+            'sha256': hashlib.sha256(body).hexdigest(),
+        })
+
+    digest = hashlib.sha256(''.join(e['sha256'] for e in entries).encode('ascii')).hexdigest()[:16]
+    manifest = {'version': version, 'digest': digest, 'count': sum(e['count'] for e in entries),
+                'shards': entries}
+    _write(os.path.join(directory, MANIFEST), json.dumps(manifest, indent=1).encode('utf-8'))
+
+    listed = {e['file'] for e in entries} | {MANIFEST}
+    for name in os.listdir(directory):
+        if name.endswith('.json') and name not in listed:
+            os.remove(os.path.join(directory, name))
+    return manifest
+
+
+def main(argv):
+    if len(argv) != 2:
+        print('Usage: python3 -m core.stock_shards <database.pack|json[.gz]> <output directory>')
+        return 1
+    from core.stock_db import read_database
+
+    source, directory = argv
+    data = read_database(source)
+    manifest = write(list(data.get('stocks', [])), directory, data.get('version'))
+    largest = max(manifest['shards'], key=lambda e: e['bytes'])
+    print(f"Sharded {manifest['count']:,} stocks into {len(manifest['shards'])} shards in {directory} "
+          f"(largest {largest['file']}, {largest['bytes']:,} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
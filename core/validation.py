@@ -0,0 +1,191 @@
+"""
+Symbol validation ledger.
+
+Every ticker.info validation is recorded in a SQLite ledger (symbol, result,
+metadata, when it was checked and when it is due again), so a run only
+re-checks what needs it:
+
+- symbols never seen before
+- valid symbols whose validation expired (VALIDATION_TTL_DAYS)
+- failed symbols, with exponentially growing retry spacing: symbols Yahoo
+  does not know back off from a day, transient errors from minutes
+
+Due symbols are validated in parallel; the shared rate governor keeps the
+calls inside Yahoo's limits, and progress reports throughput and ETA.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DAY = 86400
+
+LEDGER_PATH = os.environ.get('VALIDATION_LEDGER', os.path.join('data', 'validation.sqlite'))
+VALID_TTL = float(os.environ.get('VALIDATION_TTL_DAYS', 30)) * DAY
+
+# status -> (first retry delay, longest retry delay), doubled per consecutive failure
+RETRY_SPACING = {
+    'invalid': (DAY, 90 * DAY),
+    'error': (600, DAY),
+}
+
+VALID = 'valid'
+INVALID = 'invalid'
+ERROR = 'error'
+
+PROGRESS_SECONDS = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    symbol TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    next_check REAL NOT NULL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    name TEXT, exchange TEXT, sector TEXT, industry TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS ledger_next_check ON ledger (next_check);
+"""
+
+
+def next_check(status, failures, now):
+    """When a symbol with this result should be validated again"""
+    if status == VALID:
+        return now + VALID_TTL
+    first, longest = RETRY_SPACING[status]
+    return now + min(longest, first * 2 ** max(0, failures - 1))
+
+
+class ValidationLedger:
+    """SQLite record of each symbol's last validation result"""
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def due(self, symbols, now=None):
+        """The symbols that are new, expired or past their retry time (input order kept)"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            scheduled = dict(self._conn.execute('SELECT symbol, next_check FROM ledger'))
+        return [s for s in symbols if scheduled.get(s) is None or scheduled[s] <= now]
+
+    def record(self, symbol, status, stock=None, error=None, now=None):
+        """Store one validation outcome and schedule the next check"""
+        now = now if now is not None else time.time()
+        stock = stock or {}
+        with self._lock:
+            row = self._conn.execute('SELECT failures FROM ledger WHERE symbol = ?', (symbol,)).fetchone()
+            failures = 0 if status == VALID else (row[0] if row else 0) + 1
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO ledger VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (symbol, status, now, next_check(status, failures, now), failures,
+                     stock.get('name'), stock.get('exchange'), stock.get('sector'),
+                     stock.get('industry'), str(error)[:500] if error else None)
+                )
+
+    def valid_stocks(self, symbols=None):
+        """Stock dicts for every symbol whose last validation succeeded"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol, name, exchange, sector, industry FROM ledger WHERE status = 'valid'"
+            ).fetchall()
+        wanted = set(symbols) if symbols is not None else None
+        return [
+            {'symbol': symbol, 'name': name or symbol, 'exchange': exchange or '',
+             'sector': sector or '', 'industry': industry or ''}
+            for symbol, name, exchange, sector, industry in rows
+            if wanted is None or symbol in wanted
+        ]
+
+    def stats(self, now=None):
+        now = now if now is not None else time.time()
+        with self._lock:
+            counts = dict(self._conn.execute('SELECT status, COUNT(*) FROM ledger GROUP BY status'))
+            due = self._conn.execute('SELECT COUNT(*) FROM ledger WHERE next_check <= ?', (now,)).fetchone()[0]
+        return {'symbols': sum(counts.values()), 'due': due,
+                **{status: counts.get(status, 0) for status in (VALID, INVALID, ERROR)}}
+
+
+class Progress:
+    """Thread-safe counters printed with throughput and ETA"""
+
+    def __init__(self, total, every=PROGRESS_SECONDS, clock=time.time):
+        self.total = total
+        self.every = every
+        self.clock = clock
+        self.start = clock()
+        self.last_report = self.start
+        self.counts = {VALID: 0, INVALID: 0, ERROR: 0}
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return sum(self.counts.values())
+
+    def line(self):
+        elapsed = self.clock() - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        return (f"{self.done:6,}/{self.total:,} | ✓ {self.counts[VALID]:,} valid | "
+                f"✗ {self.counts[INVALID]:,} invalid | ⚠ {self.counts[ERROR]:,} errors | "
+                f"{rate:.1f}/s | ETA {eta / 60:.0f}m")
+
+    def add(self, status):
+        with self._lock:
+            self.counts[status] += 1
+            now = self.clock()
+            if now - self.last_report < self.every and self.done < self.total:
+                return
+            self.last_report = now
+            print(self.line())
+
+
+def validate_due(symbols, ledger, validate, workers=16, now=None):
+    """Validate the symbols the ledger says are due
+
+    validate(symbol) returns a stock dict for a valid symbol, None for one
+    Yahoo does not know, and raises on transient errors. Returns the
+    Progress with the run's counts.
+    """
+    due = ledger.due(symbols, now)
+    print(f"🔄 {len(due):,} of {len(symbols):,} symbols due for validation "
+          f"({len(symbols) - len(due):,} still current in the ledger)")
+    progress = Progress(len(due))
+    if not due:
+        return progress
+
+    def check(symbol):
+        try:
+            stock = validate(symbol)
+        except Exception as e:
+            ledger.record(symbol, ERROR, error=e)
+            return ERROR
+        status = VALID if stock else INVALID
+        ledger.record(symbol, status, stock)
+        return status
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(check, symbol) for symbol in due]
+        for future in as_completed(futures):
+            progress.add(future.result())
+
+    elapsed = time.time() - progress.start
+    print(f"✅ Validated {progress.done:,} symbols in {elapsed / 60:.1f} minutes "
+          f"({progress.done / elapsed if elapsed > 0 else 0:.1f}/s)")
+    return progress
@@ -0,0 +1,263 @@
+"""
+Dependency-free Yahoo Finance client.
+
+yfinance pulls in pandas, numpy and requests, which is most of a serverless
+cold start. The chart and price handlers only need two endpoints, and this
+module talks to them with urllib:
+
+- chart(): /v8/finance/chart bars as plain column lists, shaped like a
+  yfinance history (auto-adjusted OHLC, daily and longer bars stamped at
+  midnight exchange time, empty rows dropped). Unlike yfinance it tells a
+  symbol Yahoo does not know (SymbolNotFound) from an empty answer. Yahoo
+  answers 30m with 60m bars, so 30m is built from 15m bars, bucketed from
+  the session open like core.resample.
+- quotes(): /v7/finance/quote for many symbols in one request, with the
+  cookie and crumb Yahoo requires. chart_quote() reads the same fields
+  (except market cap) from chart metadata when no crumb can be had.
+
+Nothing here is cached or paced; callers go through the rate governor.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from http.cookiejar import CookieJar
+from zoneinfo import ZoneInfo
+
+from core import bar_store
+
+BASE_URL = 'https://query1.finance.yahoo.com'
+COOKIE_URL = 'https://fc.yahoo.com'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+TIMEOUT = float(os.environ.get('YAHOO_TIMEOUT', 10))
+
+# Intervals served from the chart endpoint
+CHART_INTERVALS = ('1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo')
+DAILY_INTERVALS = ('1d', '5d', '1wk', '1mo', '3mo')
+# Interval -> (interval fetched, bucket seconds) for what Yahoo gets wrong
+AGGREGATED_INTERVALS = {'30m': ('15m', 1800)}
+DAY = 86400
+
+BAR_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+_opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+_crumb = None
+_crumb_lock = threading.Lock()
+
+
+class CrumbUnavailable(Exception):
+    """Raised when Yahoo will not hand out a crumb for the quote endpoint"""
+
+
+class SymbolNotFound(Exception):
+    """Raised when Yahoo answers 404 for a symbol"""
+
+
+def get(url, params=None):
+    """Response body of a GET (urllib.error.HTTPError on non-2xx)"""
+    if params:
+        url = f"{url}?{urllib.parse.urlencode(params)}"
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with _opener.open(request, timeout=TIMEOUT) as response:
+        return response.read()
+
+
+def get_json(url, params=None):
+    return json.loads(get(url, params))
+
+
+def empty_columns():
+    return {name: [] for name in BAR_FIELDS}
+
+
+def _chart_result(symbol, params):
+    """The chart result dict for symbol, or None when it has none (SymbolNotFound on a 404)"""
+    url = f"{BASE_URL}/v8/finance/chart/{urllib.parse.quote(symbol, safe='')}"
+    try:
+        payload = get_json(url, params)
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            raise SymbolNotFound(symbol)
+        raise
+    results = (payload.get('chart') or {}).get('result')
+    return results[0] if results else None
+
+
+def _bar_time(timestamp, interval, zone):
+    """yfinance's index value for a bar, in epoch seconds"""
+    if interval not in DAILY_INTERVALS:
+        return timestamp
+    local = datetime.fromtimestamp(timestamp, zone)
+    # Yahoo sometimes stamps a daily bar at 22:00/23:00 the day before (DST)
+    if interval in ('1d', '1wk') and local.minute == 0 and local.hour in (22, 23):
+        local += timedelta(hours=24 - local.hour)
+    return int(datetime(local.year, local.month, local.day, tzinfo=zone).timestamp())
+
+
+def chart_columns(result, interval):
+    """{'time': [...], 'open': [...], ...} from a chart result, like Bars.columns of a yfinance history"""
+    timestamps = result.get('timestamp') or []
+    count = len(timestamps)
+    indicators = result.get('indicators') or {}
+    quote = (indicators.get('quote') or [{}])[0]
+    series = {name: quote.get(name) or [None] * count for name in PRICE_FIELDS + ('volume',)}
+    adjclose = ((indicators.get('adjclose') or [{}])[0]).get('adjclose')
+
+    zone = timezone.utc
+    if interval in DAILY_INTERVALS:
+        zone = ZoneInfo(result.get('meta', {}).get('exchangeTimezoneName') or 'UTC')
+
+    columns = empty_columns()
+    for i in sorted(range(count), key=timestamps.__getitem__):
+        prices = [series[name][i] for name in PRICE_FIELDS]
+        volume = series['volume'][i] or 0
+        if not volume and not any(prices):
+            continue
+        prices = [float('nan') if value is None else float(value) for value in prices]
+
+        # auto_adjust: scale OHLC by Adj Close / Close
+        adjusted = adjclose[i] if adjclose else None
+        if adjusted is not None and prices[3]:
+            ratio = adjusted / prices[3]
+            prices = [prices[0] * ratio, prices[1] * ratio, prices[2] * ratio, float(adjusted)]
+
+        bar_time = _bar_time(timestamps[i], interval, zone)
+        if columns['time'] and columns['time'][-1] == bar_time:
+            # The live bar sometimes arrives as a second row for the same day
+            columns['high'][-1] = max(columns['high'][-1], prices[1])
+            columns['low'][-1] = min(columns['low'][-1], prices[2])
+            columns['close'][-1] = prices[3]
+            columns['volume'][-1] += int(volume)
+            continue
+
+        columns['time'].append(bar_time)
+        for name, value in zip(PRICE_FIELDS, prices):
+            columns[name].append(value)
+        columns['volume'].append(int(volume))
+    return columns
+
+
+def aggregate_columns(columns, seconds, zone):
+    """Intraday bar columns merged into buckets of seconds, counted from the session open
+
+    The session opens at the earliest local time of day in the series; bars
+    without a close are dropped and buckets are labelled with their start.
+    """
+    times = columns['time']
+    offsets = [int(datetime.fromtimestamp(t, zone).utcoffset().total_seconds()) for t in times]
+    local = [t + offset for t, offset in zip(times, offsets)]
+    session_open = min((t % DAY for t in local), default=0)
+
+    aggregated = empty_columns()
+    last_bucket = None
+    for i, t in enumerate(local):
+        if columns['close'][i] != columns['close'][i]:
+            continue
+        day = t - t % DAY
+        bucket = day + session_open + (t - day - session_open) // seconds * seconds
+        if bucket == last_bucket:
+            aggregated['high'][-1] = max(aggregated['high'][-1], columns['high'][i])
+            aggregated['low'][-1] = min(aggregated['low'][-1], columns['low'][i])
+            aggregated['close'][-1] = columns['close'][i]
+            aggregated['volume'][-1] += columns['volume'][i]
+            continue
+        last_bucket = bucket
+        aggregated['time'].append(bucket - offsets[i])
+        for name in PRICE_FIELDS + ('volume',):
+            aggregated[name].append(columns[name][i])
+    return aggregated
+
+
+def chart(symbol, interval='1d', period='1mo', start=None):
+    """Bar columns for a period, or from start (epoch seconds or datetime) onward
+
+    Raises SymbolNotFound when Yahoo does not know the symbol.
+    """
+    base, seconds = AGGREGATED_INTERVALS.get(interval, (interval, None))
+    params = {'interval': base, 'events': 'div,splits', 'includePrePost': 'false'}
+    if start is not None:
+        if isinstance(start, datetime):
+            start = start.timestamp()
+        params['period1'] = int(start)
+        params['period2'] = int(time.time())
+    else:
+        # Yahoo rejects intraday ranges past what one request can return
+        # (e.g. 1h bars for 'max'), so ask for as much as it keeps instead
+        limit = bar_store.MAX_TAIL_DAYS.get(base)
+        if limit is not None and (period in bar_store.PERIOD_DAYS or period == 'ytd'):
+            begins = bar_store.period_start(period)
+            if begins is None or begins < time.time() - limit * DAY:
+                period = f'{limit}d'
+        params['range'] = period
+
+    result = _chart_result(symbol, params)
+    if result is None:
+        return empty_columns()
+    columns = chart_columns(result, base)
+    if seconds:
+        zone = ZoneInfo(result.get('meta', {}).get('exchangeTimezoneName') or 'UTC')
+        columns = aggregate_columns(columns, seconds, zone)
+    return columns
+
+
+def chart_quote(symbol):
+    """Quote fields from the chart metadata (no market cap), or None"""
+    try:
+        result = _chart_result(symbol, {'interval': '1d', 'range': '1d'})
+    except SymbolNotFound:
+        return None
+    meta = (result or {}).get('meta')
+    if not meta:
+        return None
+    return {
+        'symbol': meta.get('symbol', symbol),
+        'regularMarketPrice': meta.get('regularMarketPrice'),
+        'regularMarketPreviousClose': meta.get('chartPreviousClose') or meta.get('previousClose'),
+        'regularMarketVolume': meta.get('regularMarketVolume'),
+        'currency': meta.get('currency'),
+    }
+
+
+def get_crumb(refresh=False):
+    """Crumb for the quote endpoint, fetched once per process (and after a 401)"""
+    global _crumb
+    with _crumb_lock:
+        if _crumb is None or refresh:
+            try:
+                # Answers 404, but sets the session cookie the crumb is tied to
+                get(COOKIE_URL)
+            except urllib.error.HTTPError:
+                pass
+            try:
+                crumb = get(f"{BASE_URL}/v1/test/getcrumb").decode('utf-8').strip()
+            except urllib.error.HTTPError as e:
+                if e.code == 429:
+                    raise
+                crumb = ''
+            if not crumb or '<' in crumb:
+                raise CrumbUnavailable('Yahoo did not return a crumb')
+            _crumb = crumb
+        return _crumb
+
+
+def quotes(symbols):
+    """{SYMBOL: quote dict} from one /v7/finance/quote request (unknown symbols left out)"""
+    if not symbols:
+        return {}
+    params = {'symbols': ','.join(symbols)}
+    for refresh in (False, True):
+        params['crumb'] = get_crumb(refresh)
+        try:
+            payload = get_json(f"{BASE_URL}/v7/finance/quote", params)
+            break
+        except urllib.error.HTTPError as e:
+            if e.code != 401 or refresh:
+                raise
+    results = (payload.get('quoteResponse') or {}).get('result') or []
+    return {item['symbol'].upper(): item for item in results if item.get('symbol')}
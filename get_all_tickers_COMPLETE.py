@@ -7,10 +7,12 @@ Target: 15,000-30,000+ stocks worldwide
 import yfinance as yf
 import pandas as pd
 import json
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 
+from core.ratelimit import BACKGROUND, YAHOO, rate_governor, status_of
+from core.registry import suffix_exchange
+from core.validation import ValidationLedger, validate_due
+
 def get_nasdaq_all():
     """Get ALL NASDAQ stocks from official NASDAQ FTP"""
     print("📊 Downloading ALL NASDAQ stocks from official FTP...")
@@ -150,93 +152,45 @@ def get_crypto_and_indices():
     print(f"✅ Got {len(all_items)} crypto/indices/commodities")
     return all_items
 
-def validate_symbol_batch(symbols, max_workers=20):
-    """Validate symbols in batch with rate limiting"""
-    valid_stocks = []
-    failed = 0
-    total = len(symbols)
+def validate_one(symbol):
+    """Stock dict for a symbol Yahoo knows, None for one it doesn't (raises on transient errors)"""
+    # Paced by the shared governor (backs off on 429s)
+    ticker = yf.Ticker(symbol)
+    try:
+        info = rate_governor.call(YAHOO, lambda: ticker.info, lane=BACKGROUND)
+    except Exception as e:
+        if status_of(e) == 404:
+            return None
+        raise
+
+    if not info or 'symbol' not in info:
+        return None
 
-    print(f"\n🔄 Validating {total:,} symbols...")
-    print(f"Using {max_workers} workers with rate limiting")
+    # Suffix first (.JK -> IDX, ...) so names match the stock database; US stocks keep Yahoo's
+    exchange = suffix_exchange(symbol) or info.get('exchange', '') or 'NASDAQ'
+
+    return {
+        'symbol': symbol,
+        'name': (info.get('longName') or info.get('shortName') or symbol).replace('"', "'"),
+        'exchange': exchange,
+        'sector': info.get('sector', ''),
+        'industry': info.get('industry', '')
+    }
+
+def validate_symbol_batch(symbols, max_workers=20, ledger=None):
+    """Validate the symbols the ledger says are due; returns every valid stock among symbols"""
+    ledger = ledger or ValidationLedger()
+
+    print(f"\n🔄 Validating with {max_workers} workers (ledger: {ledger.path})")
     print("=" * 70)
 
-    def validate_one(symbol):
-        try:
-            # Add small delay for rate limiting
-            time.sleep(0.05)  # 20 requests/second max
-
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-
-            if info and 'symbol' in info:
-                # Determine exchange
-                exchange = info.get('exchange', '')
-
-                if '.JK' in symbol:
-                    exchange = 'IDX'
-                elif '.HK' in symbol:
-                    exchange = 'HKEX'
-                elif '.T' in symbol:
-                    exchange = 'TSE'
-                elif '.SI' in symbol:
-                    exchange = 'SGX'
-                elif '.L' in symbol:
-                    exchange = 'LSE'
-                elif '.DE' in symbol:
-                    exchange = 'XETRA'
-                elif '.PA' in symbol:
-                    exchange = 'EPA'
-                elif '-USD' in symbol:
-                    exchange = 'CRYPTO'
-                elif symbol.startswith('^'):
-                    exchange = 'INDEX'
-                elif '=F' in symbol:
-                    exchange = 'FUTURES'
-                else:
-                    # US stock
-                    if not exchange:
-                        exchange = 'NASDAQ'
-
-                return {
-                    'symbol': symbol,
-                    'name': (info.get('longName') or info.get('shortName') or symbol).replace('"', "'"),
-                    'exchange': exchange,
-                    'sector': info.get('sector', ''),
-                    'industry': info.get('industry', '')
-                }
-        except:
-            pass
-        return None
+    progress = validate_due(symbols, ledger, validate_one, workers=max_workers)
+    valid_stocks = ledger.valid_stocks(symbols)
 
-    start_time = time.time()
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(validate_one, sym): sym for sym in symbols}
-
-        for future in as_completed(futures):
-            try:
-                result = future.result()
-                if result:
-                    valid_stocks.append(result)
-                    if len(valid_stocks) % 500 == 0:
-                        elapsed = time.time() - start_time
-                        rate = len(valid_stocks) / elapsed if elapsed > 0 else 0
-                        remaining = total - len(valid_stocks) - failed
-                        eta = remaining / rate if rate > 0 else 0
-
-                        print(f"✓ {len(valid_stocks):5,} valid | {failed:4,} failed | "
-                              f"{rate:.1f}/s | ETA: {eta/60:.0f}m | {result['symbol']}")
-                else:
-                    failed += 1
-            except:
-                failed += 1
-
-    elapsed = time.time() - start_time
+    stats = ledger.stats()
     print("\n" + "=" * 70)
-    print(f"✅ Validation complete in {elapsed/60:.1f} minutes")
-    print(f"✓ Valid: {len(valid_stocks):,}")
-    print(f"✗ Failed: {failed:,}")
-    print(f"📊 Success rate: {len(valid_stocks)/(len(valid_stocks)+failed)*100:.1f}%")
+    print(f"✓ Valid: {len(valid_stocks):,} ({progress.counts['valid']:,} checked this run)")
+    print(f"✗ Invalid: {stats['invalid']:,} | ⚠ Errors: {stats['error']:,} (retried with backoff)")
 
     return valid_stocks
 
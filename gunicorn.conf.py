@@ -0,0 +1,60 @@
+"""
+Gunicorn settings for main.py (the Dockerfile runs gunicorn -c gunicorn.conf.py main:app).
+
+The app is preloaded in the master (GUNICORN_PRELOAD=0 turns that off), so
+the stock database, registry and search index are built once and every
+forked worker shares those pages copy-on-write. The registry and index keep
+their strings in flat columns (core/columns.py) so reading them copies
+nothing, and the GC is frozen before each fork so a collection in a worker
+does not touch them either. Per-worker memory stays flat as WEB_CONCURRENCY
+grows (benchmarks/bench_fork_memory.py).
+
+Threads do not survive fork, so the screener scheduler is started after fork,
+in whichever worker holds SCREENER_SCHEDULER_LOCK.
+"""
+
+import fcntl
+import gc
+import os
+
+bind = f":{os.environ.get('PORT', 8080)}"
+# Each worker has its own rate governor and caches, so N workers call Yahoo up
+# to N times as fast; lower RATE_LIMIT_YAHOO/RATE_LIMIT_GLOBAL before raising this
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 60
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+# main.py checks this to leave starting threads to post_fork
+os.environ['GUNICORN_PRELOAD'] = '1' if preload_app else '0'
+
+SCREENER_SCHEDULER_LOCK = os.environ.get('SCREENER_SCHEDULER_LOCK',
+                                         os.path.join('data', 'screener-scheduler.lock'))
+
+# Held open for the life of the worker that runs the scheduler
+_scheduler_lock = None
+
+
+def pre_fork(server, worker):
+    # Everything allocated so far (the preloaded database) is never scanned by the GC again
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    global _scheduler_lock
+    if not preload_app:
+        return
+
+    os.makedirs(os.path.dirname(SCREENER_SCHEDULER_LOCK) or '.', exist_ok=True)
+    lock = open(SCREENER_SCHEDULER_LOCK, 'a')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        # Another worker runs it; a replacement for that worker takes the lock over
+        lock.close()
+        return
+    _scheduler_lock = lock
+
+    from core import screener_store
+    screener_store.start_scheduler()
+    server.log.info(f"Screener scheduler running in worker {worker.pid}")
@@ -3,17 +3,42 @@ Main Flask application for Google Cloud Run
 Serves all API endpoints and static files
 """
 
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, jsonify, send_from_directory, request
 from flask_cors import CORS
-import yfinance as yf
-import json
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 import traceback
 
+from core import bundle, live, resample, screener_store
+from core.bar_store import bar_store
+from core.cache import bar_cache
+from core.live import live_hub
+from core.market_data import get_history, get_history_with_age
+from core.quotes import get_quotes, parse_symbols, quote_cache
+from core.ratelimit import rate_governor
+from core.search import search_response
+from core.serialize import BINARY_CONTENT_TYPE, RESPONSE_FORMATS, Bars, dumps, flask_json_response
+from core.stock_db import select_encoding, stock_database
+from core.singleflight import upstream_flight
+
 app = Flask(__name__, static_folder='public', static_url_path='')
 CORS(app)
 
+# Background screener refresh after each exchange close (SCREENER_SCHEDULER=0 disables).
+# A thread started in a preloaded gunicorn master would not survive fork, so
+# gunicorn.conf.py starts it after fork in a single worker instead.
+if os.environ.get('GUNICORN_PRELOAD') != '1':
+    screener_store.start_scheduler()
+
+# Load, index and encode the stock database once at startup (in the master when
+# preloaded, so every worker shares it)
+try:
+    stock_database.warm()
+except Exception as e:
+    print(f"Stock database not preloaded: {e}")
+
 # Serve index.html at root
 @app.route('/')
 def serve_index():
@@ -32,42 +57,186 @@ def get_stock(symbol):
     try:
         interval = request.args.get('interval', '1d')
         period = request.args.get('period', '1mo')
+        fmt = request.args.get('format', 'json')
 
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
+        if fmt not in RESPONSE_FORMATS:
+            return jsonify({'error': True, 'message': f'Unknown format: {fmt}'}), 400
+
+        df, age = get_history_with_age(symbol, interval, period)
+        # Seconds since these bars were fetched (non-zero while serving stale)
+        headers = {'X-Data-Age': str(int(age))}
 
         if df.empty:
-            return jsonify({'error': True, 'message': f'No data found for {symbol}'}), 404
+            return jsonify({'error': True, 'message': f'No data found for {symbol}'}), 404, headers
 
-        data = []
-        for index, row in df.iterrows():
-            data.append({
-                'time': int(index.timestamp()),
-                'open': float(row['Open']),
-                'high': float(row['High']),
-                'low': float(row['Low']),
-                'close': float(row['Close']),
-                'volume': int(row['Volume']) if 'Volume' in row else 0
-            })
+        data = Bars.from_frame(df)
 
-        return jsonify({
+        if fmt == 'binary':
+            body = data.to_binary(float32=request.args.get('precision') == '32')
+            return Response(body, mimetype=BINARY_CONTENT_TYPE, headers=headers)
+
+        response = {
             'success': True,
             'symbol': symbol,
             'interval': interval,
             'period': period,
             'data': data,
             'count': len(data)
-        })
+        }
+        if fmt == 'columnar':
+            response['format'] = 'columnar'
+            response['data'] = data.to_columnar()
+
+        body, status = flask_json_response(app, response)
+        return body, status, headers
+    except Exception as e:
+        return jsonify({'error': True, 'message': str(e)}), 500
+
+# Multi-timeframe endpoint: every timeframe derived from one base series
+@app.route('/api/stock/<symbol>/mtf')
+def get_stock_mtf(symbol):
+    try:
+        fmt = request.args.get('format', 'json')
+        if fmt not in ('json', 'columnar'):
+            return jsonify({'error': True, 'message': f'Unknown format: {fmt}'}), 400
+
+        try:
+            timeframes = resample.parse_timeframes(request.args.get('timeframes', '1d'))
+        except resample.UnknownTimeframe as e:
+            return jsonify({'error': True, 'message': str(e)}), 400
+        if not timeframes:
+            return jsonify({'error': True, 'message': 'timeframes parameter required'}), 400
+
+        results = resample.multi_timeframe(symbol, timeframes, get_history)
+        if not any(len(bars) for _, _, bars in results.values()):
+            return jsonify({'error': True, 'message': f'No data found for {symbol}'}), 404
+
+        panels = {}
+        for tf, (interval, period, bars) in results.items():
+            panels[tf] = {
+                'base': interval,
+                'period': period,
+                'data': bars.to_columnar() if fmt == 'columnar' else bars,
+                'count': len(bars)
+            }
+
+        response = {
+            'success': True,
+            'symbol': symbol,
+            'timeframes': panels,
+            'count': len(panels)
+        }
+        if fmt == 'columnar':
+            response['format'] = 'columnar'
+
+        return flask_json_response(app, response)
     except Exception as e:
         return jsonify({'error': True, 'message': str(e)}), 500
 
-# Stock list endpoint
+# Multi-panel bundle: every chart panel for a symbol in one (compressed) response
+@app.route('/api/stock/<symbol>/bundle')
+def get_stock_bundle(symbol):
+    try:
+        try:
+            panels = bundle.parse_panels(request.args.get('panels', ''))
+        except bundle.BundleError as e:
+            return jsonify({'error': True, 'message': str(e)}), 400
+        if not panels:
+            return jsonify({'error': True, 'message': 'panels parameter required'}), 400
+
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        headers = {'Vary': 'Accept-Encoding'}
+
+        # NDJSON: one line per panel as soon as its base series arrives
+        if request.args.get('stream') in ('1', 'true', 'ndjson'):
+            lines = (line.encode() for line in bundle.ndjson_lines(
+                bundle.iter_panels(symbol, panels, get_history)))
+            if select_encoding(accept_encoding, ('gzip', 'identity')) == 'gzip':
+                lines = bundle.gzip_stream(lines)
+                headers['Content-Encoding'] = 'gzip'
+            headers['X-Accel-Buffering'] = 'no'
+            return Response(lines, mimetype=bundle.NDJSON_CONTENT_TYPE, headers=headers)
+
+        results, fetches = bundle.collect(symbol, panels, get_history)
+        if all(panel.get('error') for panel in results.values()):
+            return jsonify({'error': True, 'message': f'No data found for {symbol}'}), 404
+
+        body = dumps({
+            'success': True,
+            'symbol': symbol,
+            'panels': results,
+            'count': len(results),
+            'fetches': fetches
+        }, sort_keys=True, separators=(',', ':')).encode() + b'\n'
+
+        encoding = select_encoding(accept_encoding, ('br', 'gzip', 'identity') if bundle.brotli
+                                   else ('gzip', 'identity'))
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(bundle.compress(body, encoding), mimetype='application/json', headers=headers)
+    except Exception as e:
+        return jsonify({'error': True, 'message': str(e)}), 500
+
+# Live bar deltas over Server-Sent Events (one shared poller per symbol)
+stream_slots = threading.BoundedSemaphore(live.MAX_SYNC_STREAMS)
+
+@app.route('/api/stream')
+def stream_bars():
+    try:
+        symbols, interval = live.parse_stream_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': True, 'message': str(e)}), 400
+    # Each stream holds a worker thread; the rest are kept for ordinary requests
+    if not stream_slots.acquire(blocking=False):
+        return jsonify({
+            'error': True,
+            'message': 'Too many live streams on this worker; try again later (or use the ASGI server)'
+        }), 503, {'Retry-After': '30'}
+
+    def events():
+        # Subscribed only once the stream runs: a generator closed before its
+        # first chunk never reaches its finally, and would leave the feed polling
+        subscriber = live_hub.subscribe(symbols, interval)
+        deadline = time.time() + live.MAX_STREAM_SECONDS
+        try:
+            yield 'retry: 5000\n\n'
+            while time.time() < deadline and not subscriber.dropped:
+                event = subscriber.get()
+                # Comment lines keep proxies from closing an idle stream
+                yield live.format_sse(event) if event is not None else ': ping\n\n'
+        finally:
+            live_hub.unsubscribe(subscriber)
+
+    response = Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs even when the client leaves before the generator starts
+    response.call_on_close(stream_slots.release)
+    return response
+
+# Stock list endpoint (also serves the database file the front end fetches)
 @app.route('/api/stocks/list')
+@app.route('/stocks-database.json')
 def get_stock_list():
     try:
-        with open('public/stocks-database.json', 'r') as f:
-            data = json.load(f)
-        return jsonify(data)
+        status, body, headers = stock_database.list_parts(
+            request.args,
+            request.headers.get('Accept-Encoding', ''),
+            request.headers.get('If-None-Match', '')
+        )
+        return Response(body, status=status, headers=headers)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Symbol search endpoint
+@app.route('/api/stocks/search')
+def search_stocks():
+    try:
+        status, payload = search_response(stock_database.snapshot().search_index, request.args)
+        return jsonify(payload), status
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -79,21 +248,8 @@ def get_stock_prices():
         if not symbols_param:
             return jsonify({'error': True, 'message': 'symbols parameter required'}), 400
 
-        symbols = symbols_param.split(',')
-        prices = {}
-
-        for symbol in symbols[:10]:  # Limit to 10 at a time
-            try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-                prices[symbol] = {
-                    'price': info.get('currentPrice', info.get('regularMarketPrice', 0)),
-                    'currency': info.get('currency', 'USD'),
-                    'marketCap': info.get('marketCap', 0),
-                    'volume': info.get('volume', 0)
-                }
-            except Exception as e:
-                prices[symbol] = {'error': str(e)}
+        symbols = parse_symbols(symbols_param, upper=True)  # Up to MAX_SYMBOLS at a time
+        prices = get_quotes(symbols)
 
         return jsonify({'success': True, 'prices': prices})
     except Exception as e:
@@ -103,105 +259,11 @@ def get_stock_prices():
 @app.route('/api/screener/momentum')
 def momentum_screener():
     try:
-        # Import the screener logic
-        from api.screener.momentum import handler
-
-        # Create a mock request handler
-        class MockHandler:
-            def __init__(self):
-                self.response_data = None
-                self.status_code = 200
-
-            def send_response(self, code):
-                self.status_code = code
-
-            def send_header(self, key, value):
-                pass
-
-            def end_headers(self):
-                pass
-
-            def wfile_write(self, data):
-                self.response_data = data
-
-        # Get stocks to analyze
-        stocks = [
-            {'symbol': 'AAPL', 'name': 'Apple Inc.', 'exchange': 'NASDAQ'},
-            {'symbol': 'MSFT', 'name': 'Microsoft Corporation', 'exchange': 'NASDAQ'},
-            {'symbol': 'GOOGL', 'name': 'Alphabet Inc.', 'exchange': 'NASDAQ'},
-            {'symbol': 'AMZN', 'name': 'Amazon.com Inc.', 'exchange': 'NASDAQ'},
-            {'symbol': 'NVDA', 'name': 'NVIDIA Corporation', 'exchange': 'NASDAQ'},
-            {'symbol': 'META', 'name': 'Meta Platforms Inc.', 'exchange': 'NASDAQ'},
-            {'symbol': 'TSLA', 'name': 'Tesla Inc.', 'exchange': 'NASDAQ'},
-            {'symbol': 'V', 'name': 'Visa Inc.', 'exchange': 'NYSE'},
-            {'symbol': 'JPM', 'name': 'JPMorgan Chase', 'exchange': 'NYSE'},
-            {'symbol': 'WMT', 'name': 'Walmart Inc.', 'exchange': 'NYSE'},
-        ]
-
-        results = []
-        for stock in stocks:
-            try:
-                ticker = yf.Ticker(stock['symbol'])
-                hist = ticker.history(period='1y')
-
-                if hist.empty or len(hist) < 60:
-                    continue
-
-                prices = [float(p) for p in hist['Close'].values]
-                current_price = prices[-1]
-
-                # Simple momentum calculation
-                price_3m = prices[-63] if len(prices) >= 63 else prices[0]
-                gain_3m = ((current_price - price_3m) / price_3m) * 100
-
-                # Pattern score (simplified)
-                recent_gain = ((prices[-1] - prices[-21]) / prices[-21]) * 100 if len(prices) >= 21 else 0
-                pattern_score = min(100, max(0, recent_gain * 2))
-
-                # Potential return (simplified)
-                low_52w = min(prices)
-                distance_from_low = ((current_price - low_52w) / low_52w) * 100
-                potential = gain_3m * 2
-
-                if distance_from_low < 200:
-                    potential *= 1.5
-
-                final_score = (pattern_score * 0.3) + (min(500, max(0, potential)) * 0.7)
-
-                if final_score > 20:
-                    results.append({
-                        'symbol': stock['symbol'],
-                        'name': stock['name'],
-                        'exchange': stock['exchange'],
-                        'pattern_score': round(pattern_score, 2),
-                        'potential_return': round(min(500, max(0, potential)), 2),
-                        'final_score': round(final_score, 2),
-                        'current_price': round(current_price, 2),
-                        'timeframe_scores': {
-                            '1M': round(pattern_score, 2),
-                            '3M': round(pattern_score * 0.9, 2),
-                            '6M': round(pattern_score * 0.8, 2),
-                            '1Y': round(pattern_score * 0.7, 2)
-                        }
-                    })
-            except Exception as e:
-                print(f"Error analyzing {stock['symbol']}: {e}")
-                continue
-
-        # Sort by final score
-        results.sort(key=lambda x: x['final_score'], reverse=True)
-
-        # Add ranks
-        for i, stock in enumerate(results):
-            stock['rank'] = i + 1
-
-        return jsonify({
-            'success': True,
-            'stocks': results,
-            'count': len(results),
-            'analyzed': len(stocks)
-        })
+        status, payload, headers = screener_store.screen(request.args)
+        return jsonify(payload), status, headers or {}
 
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Screener error: {traceback.format_exc()}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -210,6 +272,18 @@ def momentum_screener():
 def health():
     return jsonify({'status': 'healthy'})
 
+# Cache statistics endpoint
+@app.route('/stats')
+def stats():
+    return jsonify({
+        'cache': bar_cache.stats(),
+        'quotes': quote_cache.stats(),
+        'singleflight': upstream_flight.stats(),
+        'bar_store': bar_store.stats() if bar_store is not None else None,
+        'live': live_hub.stats(),
+        'rate_limit': rate_governor.stats()
+    })
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
     app.run(host='0.0.0.0', port=port)
@@ -7,9 +7,12 @@ Run: python3 server.py
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-import yfinance as yf
 from datetime import datetime
 
+from core.cache import bar_cache
+from core.market_data import get_history_with_age
+from core.serialize import Bars, flask_json_response
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
@@ -23,29 +26,20 @@ def get_stock_data(symbol):
 
         print(f"Fetching {symbol} with interval={interval}, period={period}")
 
-        # Fetch data using yfinance
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
+        # Fetch data using yfinance (served from the bar cache when fresh)
+        df, age = get_history_with_age(symbol, interval, period)
+        headers = {'X-Data-Age': str(int(age))}
 
         if df.empty:
             return jsonify({
                 'error': True,
                 'message': f'No data found for {symbol}'
-            }), 404
+            }), 404, headers
 
         # Convert DataFrame to format expected by TradingView Lightweight Charts
-        data = []
-        for index, row in df.iterrows():
-            data.append({
-                'time': int(index.timestamp()),
-                'open': float(row['Open']),
-                'high': float(row['High']),
-                'low': float(row['Low']),
-                'close': float(row['Close']),
-                'volume': int(row['Volume']) if 'Volume' in row else 0
-            })
+        data = Bars.from_frame(df)
 
-        return jsonify({
+        body, status = flask_json_response(app, {
             'success': True,
             'symbol': symbol,
             'interval': interval,
@@ -53,6 +47,7 @@ def get_stock_data(symbol):
             'data': data,
             'count': len(data)
         })
+        return body, status, headers
 
     except Exception as e:
         print(f"Error fetching {symbol}: {str(e)}")
@@ -69,6 +64,11 @@ def health():
         'message': 'Stock data server is running'
     })
 
+@app.route('/api/stats')
+def stats():
+    """Bar cache statistics."""
+    return jsonify({'cache': bar_cache.stats()})
+
 @app.route('/')
 def index():
     """Root endpoint."""
@@ -76,6 +76,7 @@ def index():
         'message': 'Stock Data API Server',
         'endpoints': {
             '/api/health': 'Health check',
+            '/api/stats': 'Bar cache statistics',
             '/api/stock/<symbol>': 'Get stock data (params: interval, period)'
         }
     })
@@ -0,0 +1,106 @@
+"""
+Parity of the vectorized momentum scorer (core.momentum_np) with the scalar
+one (core.momentum): same stocks kept, same scores to the cent.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from core import momentum, momentum_np
+
+# Scores are rounded to cents; float summation order may move one by a cent
+TOLERANCE = 0.011
+FIELDS = ('pattern_score', 'potential_return', 'final_score', 'current_price')
+
+
+def random_walk(rng, days, drift=0.004, start=50.0):
+    return (start * np.exp(np.cumsum(rng.normal(drift, 0.02, days)))).tolist()
+
+
+def scalar_results(universe):
+    results = {}
+    # The scalar scorer prints on degenerate (zero-price) series
+    with contextlib.redirect_stdout(io.StringIO()):
+        for symbol, prices in universe.items():
+            result = momentum.analyze_prices(symbol, prices)
+            if result:
+                results[symbol] = result
+    return results
+
+
+def assert_parity(universe):
+    scalar = scalar_results(universe)
+    vector = {r['symbol']: r for r in momentum_np.analyze_batch(universe)}
+
+    # Only stocks right at the inclusion cutoff may land on different sides of it
+    for symbol in set(scalar) ^ set(vector):
+        result = scalar.get(symbol) or vector.get(symbol)
+        assert abs(result['final_score'] - momentum.MIN_FINAL_SCORE) < TOLERANCE, symbol
+
+    for symbol in set(scalar) & set(vector):
+        a, b = scalar[symbol], vector[symbol]
+        for field in FIELDS:
+            assert abs(a[field] - b[field]) < TOLERANCE, (symbol, field, a[field], b[field])
+        assert a['timeframe_scores'].keys() == b['timeframe_scores'].keys(), symbol
+        for tf, value in a['timeframe_scores'].items():
+            assert abs(value - b['timeframe_scores'][tf]) < TOLERANCE, (symbol, tf)
+    return scalar, vector
+
+
+def test_random_universe_of_mixed_lengths():
+    rng = np.random.default_rng(7)
+    universe = {
+        f'S{i:04d}': random_walk(rng, int(rng.choice([252, 251, 180, 126, 90, 63, 60])),
+                                 drift=rng.normal(0.002, 0.004))
+        for i in range(400)
+    }
+    scalar, vector = assert_parity(universe)
+    assert len(scalar) > 50 and len(vector) > 50
+
+
+def test_flat_series():
+    universe = {'FLAT': [25.0] * 252, 'FLAT60': [3.0] * 60}
+    scalar, vector = assert_parity(universe)
+    assert not scalar and not vector
+
+
+def test_short_series_are_skipped():
+    rng = np.random.default_rng(1)
+    universe = {
+        'SHORT': random_walk(rng, momentum.MIN_HISTORY - 1, drift=0.01),
+        'EMPTY': [],
+        'NONE': None,
+        'MIN': random_walk(rng, momentum.MIN_HISTORY, drift=0.01),
+    }
+    scalar, vector = assert_parity(universe)
+    assert {'SHORT', 'EMPTY', 'NONE'}.isdisjoint(set(scalar) | set(vector))
+    assert 'MIN' in scalar and 'MIN' in vector
+
+
+def test_nan_gaps_are_skipped():
+    rng = np.random.default_rng(3)
+    universe = {}
+    for i in range(20):
+        prices = random_walk(rng, 252, drift=0.004)
+        for day in range(5 + i, 252, 17):
+            prices[day] = float('nan')
+        universe[f'GAP{i}'] = prices
+    # Too few closes once the gaps are dropped
+    sparse = random_walk(rng, 70, drift=0.01)
+    for day in range(0, 70, 5):
+        sparse[day] = float('nan')
+    universe['SPARSE'] = sparse
+
+    scalar, vector = assert_parity(universe)
+    assert scalar and vector
+    assert 'SPARSE' not in scalar and 'SPARSE' not in vector
+    # A gappy series scores like the same closes without the gaps
+    clean = [p for p in universe['GAP0'] if p == p]
+    expected = momentum.analyze_prices('GAP0', clean)
+    assert (expected is None) == ('GAP0' not in vector)
+    if expected:
+        assert abs(vector['GAP0']['final_score'] - expected['final_score']) < TOLERANCE